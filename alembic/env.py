@@ -31,6 +31,9 @@ from matches.models.matches import Match
 # noinspection PyUnresolvedReferences
 from comments.models.comments import Comment
 
+# noinspection PyUnresolvedReferences
+from messaging.models.outbox import OutboxMessage
+
 from shared.database import Base
 target_metadata = Base.metadata
 
@@ -0,0 +1,31 @@
+"""Adds the composite index used by keyset pagination of chat messages.
+
+Revision ID: b7c8d9e0f1a2
+Revises: a1b2c3d4e5f6
+Create Date: 2025-08-12 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c8d9e0f1a2'
+down_revision: Union[str, None] = 'a1b2c3d4e5f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Creates the (chat_id, created_at, id) index on messages."""
+    op.create_index(
+        'ix_messages_chat_id_created_at_id',
+        'messages',
+        ['chat_id', 'created_at', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Drops the (chat_id, created_at, id) index on messages."""
+    op.drop_index('ix_messages_chat_id_created_at_id', table_name='messages')
@@ -0,0 +1,51 @@
+"""Adds updated_at/deleted_at to comments for delta sync and scrollback indexes.
+
+Revision ID: c8d9e0f1a2b3
+Revises: b7c8d9e0f1a2
+Create Date: 2025-08-12 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8d9e0f1a2b3'
+down_revision: Union[str, None] = 'b7c8d9e0f1a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Adds the change-tracking columns and the indexes used by the comment feed."""
+    op.add_column(
+        'comments',
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False)
+    )
+    op.add_column(
+        'comments',
+        sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True)
+    )
+    op.execute("UPDATE comments SET updated_at = created_at")
+
+    op.create_index(
+        'ix_comments_match_id_created_at_id',
+        'comments',
+        ['match_id', 'created_at', 'id'],
+        unique=False
+    )
+    op.create_index(
+        'ix_comments_match_id_updated_at_id',
+        'comments',
+        ['match_id', 'updated_at', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Removes the change-tracking columns and indexes from comments."""
+    op.drop_index('ix_comments_match_id_updated_at_id', table_name='comments')
+    op.drop_index('ix_comments_match_id_created_at_id', table_name='comments')
+    op.drop_column('comments', 'deleted_at')
+    op.drop_column('comments', 'updated_at')
@@ -0,0 +1,47 @@
+"""Creates the transactional outbox table.
+
+Revision ID: d9e0f1a2b3c4
+Revises: c8d9e0f1a2b3
+Create Date: 2025-08-13 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9e0f1a2b3c4'
+down_revision: Union[str, None] = 'c8d9e0f1a2b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Creates the outbox_messages table."""
+    op.create_table(
+        'outbox_messages',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('exchange', sa.String(length=255), nullable=False),
+        sa.Column('exchange_type', sa.String(length=20), nullable=False),
+        sa.Column('routing_key', sa.String(length=255), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.String(length=500), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('available_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_outbox_messages_available_at',
+        'outbox_messages',
+        ['available_at'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Removes the outbox_messages table."""
+    op.drop_index('ix_outbox_messages_available_at', table_name='outbox_messages')
+    op.drop_table('outbox_messages')
@@ -0,0 +1,30 @@
+"""Adds the optimistic-locking version column to matches.
+
+Revision ID: e0f1a2b3c4d5
+Revises: d9e0f1a2b3c4
+Create Date: 2025-08-14 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e0f1a2b3c4d5'
+down_revision: Union[str, None] = 'd9e0f1a2b3c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Adds matches.version, starting existing rows at 1."""
+    op.add_column(
+        'matches',
+        sa.Column('version', sa.Integer(), nullable=False, server_default='1')
+    )
+
+
+def downgrade() -> None:
+    """Removes matches.version."""
+    op.drop_column('matches', 'version')
@@ -1,15 +1,98 @@
+import os
+
 import socketio
-import asyncio
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 
-from messaging.consumers import main_consumer
+from messaging.audit_publisher import audit_pipeline
+from messaging.broker import rabbitmq_publisher, RABBITMQ_URL
+from messaging.outbox_relay import outbox_relay
+from messaging.consumers import consumer_supervisor
+from realtime.emitters import ScoreEmitCoalescer, ChatMessageBatcher, CompetitionDeltaBatcher
+from realtime.presence import RoomPresence
+from services.message_buffer import message_buffer
+from shared.invalidation_bus import invalidation_bus
+from shared.metrics import register_status_provider
+
+# "false" quando o consumidor roda em réplicas próprias (python -m messaging.worker)
+RUN_CONSUMER_IN_APP = os.getenv("RUN_CONSUMER_IN_APP", "true").lower() == "true"
+
+# Fila para distribuir eventos do Socket.IO entre processos/nós: "" (processo único), "amqp" ou "redis"
+SOCKETIO_MESSAGE_QUEUE = os.getenv("SOCKETIO_MESSAGE_QUEUE", "").lower()
+SOCKETIO_MESSAGE_QUEUE_URL = os.getenv("SOCKETIO_MESSAGE_QUEUE_URL")
+SOCKETIO_CHANNEL = os.getenv("SOCKETIO_CHANNEL", "match_comments_socketio")
+
+
+def build_socketio_client_manager():
+    """
+    Cria o client manager do Socket.IO. Com uma fila configurada, `emit(..., room=...)`
+    alcança os clientes conectados em qualquer processo ou nó do serviço.
+    """
+    if SOCKETIO_MESSAGE_QUEUE == "amqp":
+        print(f"INFO: [socketio] Usando RabbitMQ como fila de mensagens (canal '{SOCKETIO_CHANNEL}').")
+        return socketio.AsyncAioPikaManager(
+            SOCKETIO_MESSAGE_QUEUE_URL or RABBITMQ_URL,
+            channel=SOCKETIO_CHANNEL
+        )
+
+    if SOCKETIO_MESSAGE_QUEUE == "redis":
+        # Requer o pacote opcional `redis`
+        print(f"INFO: [socketio] Usando Redis como fila de mensagens (canal '{SOCKETIO_CHANNEL}').")
+        return socketio.AsyncRedisManager(
+            SOCKETIO_MESSAGE_QUEUE_URL or "redis://redis:6379/0",
+            channel=SOCKETIO_CHANNEL
+        )
+
+    return None
+
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await rabbitmq_publisher.start()
+    except Exception as e:
+        print(f"AVISO: [publisher] Não foi possível conectar ao RabbitMQ na inicialização: {e}. "
+              f"A conexão será tentada novamente na primeira publicação.")
+
+    audit_pipeline.start()
+    outbox_relay.start()
+    invalidation_bus.start()
+    await message_buffer.start()
+    presence.start()
+
+    if RUN_CONSUMER_IN_APP:
+        consumer_supervisor.start()
+
+    yield
+
+    await presence.stop()
+    await score_emitter.flush_all()
+    await competition_emitter.flush_all()
+    await message_broadcaster.flush_all()
+    await message_buffer.stop()
+    await consumer_supervisor.stop()
+    await outbox_relay.stop()
+    await invalidation_bus.stop()
+    await audit_pipeline.stop()
+    await rabbitmq_publisher.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 
 socket_manager = socketio.AsyncServer(
     async_mode='asgi',
+    client_manager=build_socketio_client_manager(),
     cors_allowed_origins="*",
     logger=True,
     engineio_logger=True
-)
\ No newline at end of file
+)
+
+score_emitter = ScoreEmitCoalescer(socket_manager)
+competition_emitter = CompetitionDeltaBatcher(socket_manager)
+message_broadcaster = ChatMessageBatcher(socket_manager)
+presence = RoomPresence(socket_manager)
+
+register_status_provider("score_emitter", score_emitter.status)
+register_status_provider("competition_emitter", competition_emitter.status)
+register_status_provider("message_broadcaster", message_broadcaster.status)
+register_status_provider("presence", presence.status)
\ No newline at end of file
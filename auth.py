@@ -2,20 +2,51 @@ from fastapi import Depends, HTTPException, status
 from jose import JWTError, jwt
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from collections import OrderedDict
 from typing import List
 
+import hashlib
 import os
+import time
+
+from shared.metrics import register_status_provider
 
 SECRET_KEY = os.environ.get('JWT_SECRET_KEY')
 ALGORITHM = "HS256"
 
+JWT_CACHE_MAX_SIZE = int(os.environ.get('JWT_CACHE_MAX_SIZE', '10000'))
+JWT_CACHE_TTL = float(os.environ.get('JWT_CACHE_TTL', '300'))
+
 security = HTTPBearer()
 
-def get_current_user(
-        credentials: HTTPAuthorizationCredentials = Depends(security)
-    ):
+# hash do token -> (usuário, instante de expiração da entrada)
+_token_cache: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+token_cache_stats = {"hits": 0, "misses": 0}
+
+
+def _copy_user(user: dict) -> dict:
+    return {**user, "groups": list(user["groups"]) if user["groups"] is not None else None}
+
+
+def decode_token(token: str) -> dict:
+    """
+    Valida o JWT e retorna os dados do usuário.
+
+    Tokens já verificados ficam em um cache LRU limitado, indexado pelo hash do token,
+    por no máximo `JWT_CACHE_TTL` segundos e nunca além do `exp` do próprio token.
+    """
+    key = hashlib.sha256(token.encode()).hexdigest()
+    now = time.time()
+
+    cached = _token_cache.get(key)
+    if cached is not None:
+        if cached[1] > now:
+            _token_cache.move_to_end(key)
+            token_cache_stats["hits"] += 1
+            return _copy_user(cached[0])
+        del _token_cache[key]
 
-    token = credentials.credentials
+    token_cache_stats["misses"] += 1
 
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -27,7 +58,7 @@ def get_current_user(
         if user_matricula is None or campus is None:
             raise ValueError("Dados incompletos no token")
 
-        return {
+        user = {
             "user_matricula": user_matricula,
             "campus": campus,
             "groups": groups,
@@ -37,4 +68,25 @@ def get_current_user(
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token inválido ou expirado",
-        )
\ No newline at end of file
+        )
+
+    expires_at = now + JWT_CACHE_TTL
+    if payload.get("exp") is not None:
+        expires_at = min(expires_at, float(payload["exp"]))
+
+    if expires_at > now:
+        _token_cache[key] = (user, expires_at)
+        if len(_token_cache) > JWT_CACHE_MAX_SIZE:
+            _token_cache.popitem(last=False)
+
+    return _copy_user(user)
+
+
+def get_current_user(
+        credentials: HTTPAuthorizationCredentials = Depends(security)
+    ):
+
+    return decode_token(credentials.credentials)
+
+
+register_status_provider("jwt_cache", lambda: {**token_cache_stats, "size": len(_token_cache)})
\ No newline at end of file
@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, UUID, String, ForeignKey, DateTime
+from sqlalchemy import Column, UUID, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 
 from shared.database import Base
@@ -10,6 +10,9 @@ import uuid
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        Index("ix_messages_chat_id_created_at_id", "chat_id", "created_at", "id"),
+    )
 
     id: uuid.UUID = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     body: str = Column(String, nullable=False)
@@ -1,11 +1,13 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+import uuid
+
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from chats.models.chats import Chat
 from chats.schemas.chats import ChatResponse
+from services.messages import read_chat_for_match
 
-from shared.exceptions import NotFound, Conflict
-from shared.dependencies import get_db
+from shared.dependencies import get_async_db
+from shared.http_cache import conditional_get
 
 router = APIRouter(
     prefix='/api/v1/matches/{match_id}/chat',
@@ -14,8 +16,10 @@ router = APIRouter(
 
 
 @router.get('/', response_model=ChatResponse, status_code=200)
-def chat_details(match_id: str,
-                 db: Session = Depends(get_db)):
+async def chat_details(match_id: uuid.UUID,
+                       request: Request,
+                       response: Response,
+                       db: AsyncSession = Depends(get_async_db)):
     """
     Get Chat Details by Match
 
@@ -33,10 +37,8 @@ def chat_details(match_id: str,
          "finished_at": null
        }
     """
-    chat: Chat = db.query(Chat).filter(
-        Chat.match_id == match_id).first()  # type: ignore
-
-    if not chat:
-        raise NotFound("Chat")
+    not_modified = conditional_get(request, response, "chat", match_id)
+    if not_modified:
+        return not_modified
 
-    return chat
+    return await read_chat_for_match(db, match_id)
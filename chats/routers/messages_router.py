@@ -1,20 +1,19 @@
 import uuid
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from fastapi import Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from typing import List
+from typing import List, Optional
 
 from auth import get_current_user
-from chats.models.messages import Message
 
-from chats.models.chats import Chat
 from chats.schemas.messages import MessageCreateRequest, MessageResponse
-from app import socket_manager
-from shared.auth_utils import has_role
-from shared.dependencies import get_db
-from shared.exceptions import NotFound
+from services.messages import create_chat_message, list_chat_messages
+from shared.admission import admit_chat_message
+from shared.dependencies import get_async_db
+from shared.http_cache import conditional_get
+from shared.pagination import encode_cursor
 
 router = APIRouter(
     prefix='/api/v1/chat/{chat_id}/messages',
@@ -23,12 +22,33 @@ router = APIRouter(
 
 
 @router.get('/', response_model=List[MessageResponse], status_code=200)
-def get_messages(chat_id: uuid.UUID,
-                 db: Session = Depends(get_db)):
+async def get_messages(chat_id: uuid.UUID,
+                       request: Request,
+                       response: Response,
+                       before: Optional[str] = Query(
+                           None, description="Cursor: retorna as mensagens anteriores a este ponto"),
+                       after: Optional[str] = Query(
+                           None, description="Cursor: retorna as mensagens posteriores a este ponto"),
+                       limit: int = Query(
+                           50, ge=1, le=200, description="Número máximo de mensagens por página"),
+                       db: AsyncSession = Depends(get_async_db)):
     """
     List Messages in a Chat
 
-    Lista todas as mensagens de uma sala de chat específica.
+    Lista as mensagens de uma sala de chat específica, em ordem cronológica,
+    usando paginação por cursor (keyset) sobre `(created_at, id)`.
+
+    - Sem cursor: retorna as `limit` mensagens mais recentes.
+    - `before`: retorna as `limit` mensagens imediatamente anteriores ao cursor.
+    - `after`: retorna as `limit` mensagens imediatamente posteriores ao cursor.
+
+    Os cabeçalhos `X-Prev-Cursor` (primeira mensagem da página, para usar em `before`)
+    e `X-Next-Cursor` (última mensagem da página, para usar em `after`) são retornados
+    quando a página não está vazia. A resposta traz um `ETag` que muda a cada mensagem
+    nova; com `If-None-Match` igual, a rota responde 304 sem corpo.
+
+    As mensagens mais recentes de cada chat ativo ficam em memória, e páginas cobertas
+    por elas são respondidas sem consultar o banco.
 
     **Exemplo de Resposta:**
 
@@ -51,23 +71,33 @@ def get_messages(chat_id: uuid.UUID,
          }
        ]
     """
-    chat: Chat = db.query(Chat).filter(
-        Chat.id == chat_id, Chat.finished_at.is_(None)).first()  # type: ignore
+    if before and after:
+        raise HTTPException(
+            status_code=400,
+            detail="Informe apenas um dos cursores: 'before' ou 'after'."
+        )
 
-    if not chat:
-        raise NotFound("Chat")
+    not_modified = conditional_get(request, response, "messages", chat_id)
+    if not_modified:
+        return not_modified
 
-    messages = db.query(Message).filter(
-        Message.chat_id == chat.id)  # type: ignore
+    messages = await list_chat_messages(db, chat_id, before, after, limit)
 
-    return messages.all()
+    if messages:
+        response.headers["X-Prev-Cursor"] = encode_cursor(messages[0].created_at, messages[0].id)
+        response.headers["X-Next-Cursor"] = encode_cursor(messages[-1].created_at, messages[-1].id)
+    elif after:
+        response.headers["X-Next-Cursor"] = after
+
+    return messages
 
 
 @router.post('/', response_model=MessageResponse, status_code=201)
 async def create_message(chat_id: uuid.UUID,
                          message_request: MessageCreateRequest,
-                         db: Session = Depends(get_db),
-                         current_user: dict = Depends(get_current_user)):
+                         db: AsyncSession = Depends(get_async_db),
+                         current_user: dict = Depends(get_current_user),
+                         admission: dict = Depends(admit_chat_message)):
     """
     Create a Message
 
@@ -75,6 +105,10 @@ async def create_message(chat_id: uuid.UUID,
     - A ação é restrita a usuários com o papel 'Organizador' ou 'Jogador'.
     - Após o envio, um evento WebSocket (`new_message`) é emitido para a sala da partida
       associada ao chat, permitindo a atualização em tempo real para os clientes.
+      Com o modo em lote ativo (`CHAT_BATCH_WINDOW_MS`), as mensagens da janela são
+      entregues juntas no evento `new_messages` (lista).
+    - Sob sobrecarga, o envio passa por controle de admissão (por chat, por usuário e
+      global) e pode ser recusado com `429` e `Retry-After`. Organizadores nunca são recusados.
 
     **Exemplo de Corpo da Requisição (Payload):**
 
@@ -96,39 +130,4 @@ async def create_message(chat_id: uuid.UUID,
          "created_at": "2025-08-10T10:05:00Z"
        }
     """
-    groups = current_user["groups"]
-    user_id = current_user["user_matricula"]
-
-    message = Message(**message_request.model_dump())
-
-    if has_role(groups, "Organizador", "Jogador"):
-        message.chat_id = chat_id
-        message.user_id = user_id
-
-        chat: Chat = db.query(Chat).filter(
-            Chat.id == chat_id, Chat.finished_at.is_(None)).first()  # type: ignore
-
-        if not chat:
-            raise NotFound("Chat")
-
-        db.add(message)
-        db.commit()
-        db.refresh(message)
-
-        message_data = {
-            'chat_id': str(message.chat_id),
-            'message_id': str(message.id),
-            'body': message.body,
-            'user_id': message.user_id,
-            'created_at': message.created_at.isoformat() if message.created_at else None,
-        }
-
-        await socket_manager.emit('new_message', message_data, room=str(chat.match_id))
-
-        return message
-
-    else:
-        raise HTTPException(
-            status_code=403,
-            detail="Você não tem permissão para criar uma mensagem."
-        )
+    return await create_chat_message(db, chat_id, message_request.body, current_user, admission)
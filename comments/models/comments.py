@@ -6,11 +6,15 @@ from sqlalchemy.orm import relationship
 
 from shared.database import Base
 
-from sqlalchemy import Column, UUID, String, DateTime, ForeignKey
+from sqlalchemy import Column, UUID, String, DateTime, ForeignKey, Index
 
 
 class Comment(Base):
     __tablename__ = "comments"
+    __table_args__ = (
+        Index("ix_comments_match_id_created_at_id", "match_id", "created_at", "id"),
+        Index("ix_comments_match_id_updated_at_id", "match_id", "updated_at", "id"),
+    )
 
     id: uuid.UUID = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     body: str = Column(String(50), nullable=False)
@@ -20,5 +24,14 @@ class Comment(Base):
         default=lambda: datetime.now(timezone.utc),
         nullable=False
     )
+    updated_at: datetime = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False
+    )
+    deleted_at: datetime = Column(
+        DateTime(timezone=True),
+        nullable=True
+    )
 
     match_obj = relationship("Match", back_populates="comments")
\ No newline at end of file
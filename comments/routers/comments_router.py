@@ -1,19 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Query, Response
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 import uuid
 
-from typing import List
+from datetime import datetime, timezone
+from typing import List, Optional
 
 from auth import get_current_user
 from comments.models.comments import Comment
 from comments.schemas.comments import CommentResponse, CommentRequest
+from services.comments import create_match_comment, list_match_comments
 from app import socket_manager
 from shared.auth_utils import has_role
-from shared.dependencies import get_db
+from shared.dependencies import get_async_db
+from shared.http_cache import conditional_get
+from shared.invalidation_bus import invalidation_bus
 
 from shared.exceptions import NotFound
-from messaging.audit_publisher import generate_log_payload, run_async_audit
 
 router = APIRouter(
     prefix='/api/v1/matches/{match_id}/comments',
@@ -22,12 +26,36 @@ router = APIRouter(
 
 
 @router.get('/', response_model=List[CommentResponse], status_code=200)
-def get_comments(match_id: uuid.UUID,
-                 db: Session = Depends(get_db)):
+async def get_comments(match_id: uuid.UUID,
+                       request: Request,
+                       response: Response,
+                       since: Optional[str] = Query(
+                           None, description="Cursor de sincronização: retorna apenas as alterações após este ponto"),
+                       before: Optional[str] = Query(
+                           None, description="Cursor: retorna os comentários anteriores a este ponto"),
+                       limit: Optional[int] = Query(
+                           None, ge=1, le=200,
+                           description="Número máximo de comentários por página (50 com `before`/`since`)"),
+                       db: AsyncSession = Depends(get_async_db)):
     """
     List Comments by Match
 
-    Lista todos os comentários associados a uma partida específica, identificada pelo `match_id`.
+    Lista os comentários associados a uma partida específica, identificada pelo `match_id`.
+    Sem parâmetros, retorna todos os comentários em ordem cronológica. Os outros modos
+    são opcionais:
+
+    - **Scrollback** (`limit` ou `before`): retorna os `limit` comentários mais recentes,
+      do mais novo para o mais antigo. Use o cabeçalho `X-Before-Cursor` no parâmetro
+      `before` para carregar a página seguinte.
+    - **Sincronização** (`since`): retorna, em ordem cronológica de alteração, apenas os
+      comentários criados, editados ou excluídos após o cursor. Comentários excluídos
+      são retornados com `deleted_at` preenchido. As alterações dos últimos segundos antes
+      do cursor são reenviadas, para cobrir gravações confirmadas fora de ordem; aplique-as
+      pelo `id`.
+
+    Em ambos os modos o cabeçalho `X-Sync-Cursor` contém o cursor a ser usado no próximo
+    `since`, permitindo que clientes reconectados busquem apenas o que perderam.
+    A resposta traz um `ETag`; com `If-None-Match` igual, a rota responde 304 sem corpo.
 
     **Exemplo de Resposta:**
 
@@ -38,18 +66,32 @@ def get_comments(match_id: uuid.UUID,
            "id": "a1b2c3d4-e5f6-a7b8-c9d0-e1f2a3b4c5d6",
            "match_id": "c1d2e3f4-a5b6-7890-1234-567890abcdef",
            "body": "Que golaço do time da casa!",
-           "created_at": "2025-08-10T14:15:30Z"
+           "created_at": "2025-08-10T14:15:30Z",
+           "updated_at": "2025-08-10T14:15:30Z",
+           "deleted_at": null
          },
          {
            "id": "b2c3d4e5-f6a7-b8c9-d0e1-f2a3b4c5d6e7",
            "match_id": "c1d2e3f4-a5b6-7890-1234-567890abcdef",
            "body": "Juiz marcou falta, mas não pareceu.",
-           "created_at": "2025-08-10T14:18:05Z"
+           "created_at": "2025-08-10T14:18:05Z",
+           "updated_at": "2025-08-10T14:18:05Z",
+           "deleted_at": null
          }
        ]
     """
-    comments: Comment = db.query(Comment).filter(
-        Comment.match_id == match_id).all()  # type: ignore
+    if since and before:
+        raise HTTPException(
+            status_code=400,
+            detail="Informe apenas um dos cursores: 'since' ou 'before'."
+        )
+
+    not_modified = conditional_get(request, response, "comments", match_id)
+    if not_modified:
+        return not_modified
+
+    comments, headers = await list_match_comments(db, match_id, since, before, limit)
+    response.headers.update(headers)
 
     return comments
 
@@ -58,7 +100,7 @@ def get_comments(match_id: uuid.UUID,
 async def create_comment(match_id: uuid.UUID,
                          comment_request: CommentRequest,
                          request: Request,
-                         db: Session = Depends(get_db),
+                         db: AsyncSession = Depends(get_async_db),
                          current_user: dict = Depends(get_current_user)):
     """
     Create a Comment
@@ -86,56 +128,15 @@ async def create_comment(match_id: uuid.UUID,
          "created_at": "2025-08-10T14:25:10Z"
        }
     """
-    groups = current_user["groups"]
-
-    comment = Comment(**comment_request.model_dump())
-
-    if has_role(groups, "Organizador"):
-        comment.match_id = match_id
-
-        db.add(comment)
-        db.commit()
-        db.refresh(comment)
-
-        comment_data = {
-            'match_id': str(comment.match_id),
-            'comment_id': str(comment.id),
-            'body': comment.body,
-            'created_at': comment.created_at.isoformat() if comment.created_at else None,
-        }
-
-        # Gera o de log de auditoria (comment.created)
-        log_payload = generate_log_payload(
-            event_type="comment.created",
-            service_origin="match_comments_service",
-            entity_type="comment",
-            entity_id=comment.id,
-            operation_type="CREATE",
-            campus_code=current_user.get("campus"),
-            user_registration=current_user.get("user_matricula"),
-            request_object=request,
-            new_data=comment_data,
-        )
-
-        # Publica o log de auditoria
-        run_async_audit(log_payload)
-
-        await socket_manager.emit('create_comment', comment_data, room=str(comment.match_id))
-
-        return comment
-
-    else:
-        raise HTTPException(
-            status_code=403,
-            detail="Você não tem permissão para criar um comentário."
-        )
+    return await create_match_comment(db, match_id, comment_request.body, current_user,
+                                      request_object=request)
 
 
 @router.get('/{comment_id}', response_model=CommentResponse, status_code=200)
-def comment_details(match_id: uuid.UUID,
-                    comment_id: uuid.UUID,
-                    db: Session = Depends(get_db),
-                    current_user: dict = Depends(get_current_user)):
+async def comment_details(match_id: uuid.UUID,
+                          comment_id: uuid.UUID,
+                          db: AsyncSession = Depends(get_async_db),
+                          current_user: dict = Depends(get_current_user)):
     """
     Get Comment Details
 
@@ -155,8 +156,10 @@ def comment_details(match_id: uuid.UUID,
     """
     groups = current_user["groups"]
 
-    comment: Comment = db.query(Comment).filter(
-        Comment.match_id == match_id, Comment.id == comment_id).first()  # type: ignore
+    result = await db.execute(select(Comment).filter(
+        Comment.match_id == match_id, Comment.id == comment_id,
+        Comment.deleted_at.is_(None)))  # type: ignore
+    comment: Comment = result.scalars().first()
 
     if not comment:
         raise NotFound("Comentário")
@@ -175,7 +178,7 @@ def comment_details(match_id: uuid.UUID,
 async def update_comment(match_id: uuid.UUID,
                          comment_id: uuid.UUID,
                          comment_request: CommentRequest,
-                         db: Session = Depends(get_db),
+                         db: AsyncSession = Depends(get_async_db),
                          current_user: dict = Depends(get_current_user)):
     """
     Update a Comment
@@ -194,73 +197,84 @@ async def update_comment(match_id: uuid.UUID,
     """
     groups = current_user["groups"]
 
-    comment_in = Comment(**comment_request.model_dump())
+    if not has_role(groups, "Organizador"):
+        raise HTTPException(
+            status_code=403,
+            detail="Você não tem permissão para atualizar um comentário."
+        )
 
-    comment: Comment = db.query(Comment).filter(
-        Comment.match_id == match_id, Comment.id == comment_id).first()  # type: ignore
+    result = await db.execute(
+        update(Comment)
+        .where(Comment.match_id == match_id, Comment.id == comment_id,
+               Comment.deleted_at.is_(None))  # type: ignore
+        .values(body=comment_request.body, updated_at=datetime.now(timezone.utc))
+        .returning(Comment.id, Comment.match_id, Comment.body, Comment.created_at)
+    )
+    comment = result.first()
 
     if not comment:
         raise NotFound("Comentário")
 
-    if has_role(groups, "Organizador"):
-        comment.body = comment_in.body
-        db.commit()
+    await invalidation_bus.publish(db, "comments", match_id=comment.match_id)
+    await db.commit()
 
-        comment_data = {
-            'match_id': str(comment.match_id),
-            'comment_id': str(comment.id),
-            'body': comment.body,
-            'created_at': comment.created_at.isoformat() if comment.created_at else None,
-        }
+    comment_data = {
+        'match_id': str(comment.match_id),
+        'comment_id': str(comment.id),
+        'body': comment.body,
+        'created_at': comment.created_at.isoformat() if comment.created_at else None,
+    }
 
-        await socket_manager.emit('update_comment', comment_data, room=str(comment.match_id))
+    await socket_manager.emit('update_comment', comment_data, room=str(comment.match_id))
 
-        return
-
-    else:
-        raise HTTPException(
-            status_code=403,
-            detail="Você não tem permissão para atualizar um comentário."
-        )
+    return
 
 
 @router.delete('/{comment_id}', status_code=204)
 async def delete_comment(match_id: uuid.UUID,
                          comment_id: uuid.UUID,
-                         db: Session = Depends(get_db),
+                         db: AsyncSession = Depends(get_async_db),
                          current_user: dict = Depends(get_current_user)):
     """
     Delete a Comment
 
-    Exclui um comentário existente.
+    Exclui um comentário existente. A exclusão é lógica (`deleted_at`), para que clientes
+    sincronizando via `since` recebam a remoção.
     Após a exclusão, um evento WebSocket (`delete_comment`) é emitido para a sala da partida.
     Ação restrita a usuários com o papel 'Organizador'. A rota não retorna conteúdo.
     """
     groups = current_user["groups"]
 
-    comment: Comment = db.query(Comment).filter(
-        Comment.match_id == match_id, Comment.id == comment_id).first()  # type: ignore
+    if not has_role(groups, "Organizador"):
+        raise HTTPException(
+            status_code=403,
+            detail="Você não tem permissão para excluir um comentário."
+        )
+
+    now = datetime.now(timezone.utc)
+
+    result = await db.execute(
+        update(Comment)
+        .where(Comment.match_id == match_id, Comment.id == comment_id,
+               Comment.deleted_at.is_(None))  # type: ignore
+        .values(deleted_at=now, updated_at=now)
+        .returning(Comment.id, Comment.match_id, Comment.body, Comment.created_at)
+    )
+    comment = result.first()
 
     if not comment:
         raise NotFound("Comentário")
 
-    if has_role(groups, "Organizador"):
-        db.delete(comment)
-        db.commit()
-
-        comment_data = {
-            'match_id': str(comment.match_id),
-            'comment_id': str(comment.id),
-            'body': comment.body,
-            'created_at': comment.created_at.isoformat() if comment.created_at else None,
-        }
+    await invalidation_bus.publish(db, "comments", match_id=comment.match_id)
+    await db.commit()
 
-        await socket_manager.emit('delete_comment', comment_data, room=str(comment.match_id))
+    comment_data = {
+        'match_id': str(comment.match_id),
+        'comment_id': str(comment.id),
+        'body': comment.body,
+        'created_at': comment.created_at.isoformat() if comment.created_at else None,
+    }
 
-        return
+    await socket_manager.emit('delete_comment', comment_data, room=str(comment.match_id))
 
-    else:
-        raise HTTPException(
-            status_code=403,
-            detail="Você não tem permissão para excluir um comentário."
-        )
+    return
@@ -3,6 +3,7 @@ from pydantic import BaseModel
 import uuid
 
 from datetime import datetime
+from typing import Optional
 
 
 class CommentResponse(BaseModel):
@@ -10,6 +11,8 @@ class CommentResponse(BaseModel):
     body: str
     match_id: uuid.UUID
     created_at: datetime
+    updated_at: Optional[datetime] = None
+    deleted_at: Optional[datetime] = None
 
     model_config = {
         "from_attributes": True
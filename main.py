@@ -1,16 +1,34 @@
+import os
+import uuid
+
 import uvicorn
 import socketio
 import models
-from app import app, socket_manager
+from app import app, socket_manager, presence
 
+from fastapi import HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from socketio.exceptions import ConnectionRefusedError
+
+from auth import decode_token
 
 from chats.routers import chats_router, messages_router
 from comments.routers import comments_router
 from matches.routers import matches_router
+from monitoring.routers import status_router
 
+from chats.schemas.messages import MessageCreateRequest
+from comments.schemas.comments import CommentRequest
+from realtime.acks import ack_ok, ack_error
+from realtime.emitters import competition_room
+from services.comments import create_match_comment, list_match_comments
+from services.match_cache import list_competition_matches, read_match
+from services.messages import create_chat_message, list_chat_messages, read_chat_for_match
+from shared.admission import chat_admission
+from shared.database import AsyncSessionLocal
 from shared.exceptions_handler import not_found_exception_handler, conflict_exception_handler
 from shared.exceptions import NotFound, Conflict
+from shared.pagination import encode_cursor
 
 app.add_middleware(
     CORSMiddleware,
@@ -20,32 +38,233 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Quantidade máxima de mensagens e de comentários enviados no snapshot do `join_chat`
+SNAPSHOT_LIMIT = int(os.getenv("JOIN_SNAPSHOT_LIMIT", "50"))
+# Quantidade máxima de partidas no ack do `join_competition`
+COMPETITION_SNAPSHOT_LIMIT = int(os.getenv("JOIN_COMPETITION_SNAPSHOT_LIMIT", "100"))
+
+
+def _socket_token(environ, auth) -> str | None:
+    if isinstance(auth, dict) and auth.get('token'):
+        return auth['token']
+
+    header = environ.get('HTTP_AUTHORIZATION', '')
+    if header.lower().startswith('bearer '):
+        return header[7:]
+    return None
+
+
 @socket_manager.on('connect')
-async def connect(sid, environ):
+async def connect(sid, environ, auth=None):
+    """
+    Conexões anônimas continuam permitidas (somente leitura). Quando um token é enviado
+    em `auth.token` ou no header Authorization, ele é validado e guardado na sessão
+    para os eventos `send_message`/`send_comment`, que o validam de novo a cada envio
+    (um token expirado deixa de permitir escrita, como nas rotas HTTP).
+    """
+    user = None
+    token = _socket_token(environ, auth)
+
+    if token:
+        try:
+            user = decode_token(token)
+        except HTTPException:
+            raise ConnectionRefusedError('Token inválido')
+
+    await socket_manager.save_session(sid, {'user': user, 'token': token if user else None,
+                                            'ip': environ.get('REMOTE_ADDR')})
+
     print(f"Cliente conectado: {sid}")
     await socket_manager.emit('connection_status', {'status': 'connected', 'sid': sid}, room=sid)
 
 @socket_manager.on('disconnect')
 async def disconnect(sid):
+    presence.leave(sid)
     print(f"Cliente desconectado: {sid}")
 
 @socket_manager.on('join_chat')
 async def handle_join_chat(sid, data):
     """
-    Evento para entrar em uma room de chat específica
-    data = {'match_id': 'uuid-do-match'}
+    Evento para entrar em uma room de chat específica e receber o estado atual da partida
+    data = {'match_id': 'uuid-do-match', 'messages_after': 'cursor opcional', 'comments_since': 'cursor opcional'}
+    Retorna (ack) um snapshot compacto com placar, comentários e mensagens recentes
+    (apenas as posteriores aos cursores informados), no lugar de três chamadas REST:
+    {'status': 'ok', 'match', 'chat_id', 'messages', 'messages_cursor', 'comments', 'comments_cursor'}
+    ou {'status': 'error', 'code', 'detail'}
+    A room recebe periodicamente `presence` com o total de espectadores; `user_joined`
+    individual só é enviado para as primeiras entradas de cada intervalo.
     """
-    match_id = str(data.get('match_id'))
+    data = data if isinstance(data, dict) else {}
+    try:
+        match_id = uuid.UUID(str(data.get('match_id')))
+    except Exception as exc:
+        return ack_error(exc)
+
     user_id = data.get('user_id', None)
+    room = str(match_id)
+
+    # Entra na room antes do snapshot para não perder eventos emitidos durante a leitura
+    await socket_manager.enter_room(sid, room)
+
+    try:
+        snapshot = await _join_snapshot(match_id, data.get('messages_after'), data.get('comments_since'))
+    except Exception as exc:
+        # Partida inexistente ou falha na leitura: a conexão não fica na room nem na contagem
+        await socket_manager.leave_room(sid, room)
+        return ack_error(exc)
+
+    print(f"Cliente {sid} (user: {user_id}) entrou no chat {room}")
+
+    # Notificar outros usuários na room; o total de espectadores segue no `presence` periódico
+    if presence.join(sid, room, await _viewer_key(sid, user_id)):
+        await socket_manager.emit('user_joined', {
+            'user_id': user_id,
+            'message': f'Usuário {user_id} entrou no chat'
+        }, room=room, skip_sid=sid)
+
+    return snapshot
+
+
+@socket_manager.on('join_competition')
+async def handle_join_competition(sid, data):
+    """
+    Evento para acompanhar todas as partidas de uma competição com uma única room
+    data = {'competition_id': 'uuid-da-competicao'}
+    A room recebe `competition_updated` com deltas compactos (placar, início e fim) de
+    qualquer partida da competição.
+    Retorna (ack) {'status': 'ok', 'competition_id', 'matches'} com o estado atual das
+    partidas, ou {'status': 'error', 'code', 'detail'}
+    """
+    data = data if isinstance(data, dict) else {}
+    try:
+        competition_id = uuid.UUID(str(data.get('competition_id')))
+    except Exception as exc:
+        return ack_error(exc)
+
+    room = competition_room(competition_id)
+    await socket_manager.enter_room(sid, room)
+
+    try:
+        async with AsyncSessionLocal() as db:
+            matches = await list_competition_matches(db, competition_id, COMPETITION_SNAPSHOT_LIMIT, 0)
+    except Exception as exc:
+        await socket_manager.leave_room(sid, room)
+        return ack_error(exc)
+
+    print(f"Cliente {sid} entrou na competição {competition_id}")
+
+    return ack_ok(
+        competition_id=str(competition_id),
+        matches=[match.model_dump(mode='json') for match in matches],
+    )
+
+
+@socket_manager.on('leave_competition')
+async def handle_leave_competition(sid, data):
+    """
+    Sai da room da competição (ex.: ao trocar de competição no placar)
+    data = {'competition_id': 'uuid-da-competicao'}
+    """
+    data = data if isinstance(data, dict) else {}
+    try:
+        competition_id = uuid.UUID(str(data.get('competition_id')))
+        await socket_manager.leave_room(sid, competition_room(competition_id))
+        return ack_ok()
+    except Exception as exc:
+        return ack_error(exc)
+
+
+async def _viewer_key(sid, user_id) -> str:
+    # Usuário autenticado > user_id informado pelo cliente > a própria conexão (anônimo)
+    session = await socket_manager.get_session(sid)
+    user = session.get('user') or {}
+
+    if user.get('user_matricula'):
+        return f"user:{user['user_matricula']}"
+    if user_id:
+        return f"user:{user_id}"
+    return f"sid:{sid}"
+
+
+async def _join_snapshot(match_id: uuid.UUID, messages_after: str | None, comments_since: str | None) -> dict:
+    messages_after = messages_after or None
+    comments_since = comments_since or None
+
+    async with AsyncSessionLocal() as db:
+        match = await read_match(db, match_id)
+
+        chat_id, messages, messages_cursor = None, [], messages_after
+        try:
+            chat = await read_chat_for_match(db, match_id)
+            chat_id = str(chat.id)
+            messages = await list_chat_messages(db, chat.id, None, messages_after, SNAPSHOT_LIMIT)
+        except NotFound:
+            pass
+
+        if messages:
+            messages_cursor = encode_cursor(messages[-1].created_at, messages[-1].id)
+
+        comments, headers = await list_match_comments(db, match_id, comments_since, None, SNAPSHOT_LIMIT)
+
+    return ack_ok(
+        match=match.model_dump(mode='json'),
+        chat_id=chat_id,
+        messages=[message.model_dump(mode='json') for message in messages],
+        messages_cursor=messages_cursor,
+        comments=[comment.model_dump(mode='json') for comment in comments],
+        comments_cursor=headers.get('X-Sync-Cursor', comments_since),
+    )
+
+async def _session_user(sid) -> tuple[dict, str | None]:
+    session = await socket_manager.get_session(sid)
+    user = session.get('user')
+
+    if not user:
+        raise HTTPException(status_code=401, detail="Conexão não autenticada.")
+    return decode_token(session['token']), session.get('ip')
+
+
+@socket_manager.on('send_message')
+async def handle_send_message(sid, data):
+    """
+    Envia uma mensagem de chat pela própria conexão, sem abrir uma requisição HTTP.
+    data = {'chat_id': 'uuid-do-chat', 'body': '...'}
+    Retorna (ack) {'status': 'ok', 'id', 'created_at'} ou {'status': 'error', 'code', 'detail'}
+    """
+    data = data if isinstance(data, dict) else {}
+    try:
+        user, _ = await _session_user(sid)
+        chat_id = uuid.UUID(str(data.get('chat_id')))
+        message_request = MessageCreateRequest(body=data.get('body'))
+
+        with chat_admission.admission_for(str(chat_id), user) as admission:
+            async with AsyncSessionLocal() as db:
+                message = await create_chat_message(db, chat_id, message_request.body, user, admission)
+
+        return ack_ok(id=str(message.id), created_at=message.created_at.isoformat())
+    except Exception as exc:
+        return ack_error(exc)
+
+
+@socket_manager.on('send_comment')
+async def handle_send_comment(sid, data):
+    """
+    Publica um comentário da partida pela própria conexão (somente organizadores).
+    data = {'match_id': 'uuid-do-match', 'body': '...'}
+    Retorna (ack) {'status': 'ok', 'id', 'created_at'} ou {'status': 'error', 'code', 'detail'}
+    """
+    data = data if isinstance(data, dict) else {}
+    try:
+        user, ip = await _session_user(sid)
+        match_id = uuid.UUID(str(data.get('match_id')))
+        comment_request = CommentRequest(body=data.get('body'))
 
-    await socket_manager.enter_room(sid, match_id)
-    print(f"Cliente {sid} (user: {user_id}) entrou no chat {match_id}")
+        async with AsyncSessionLocal() as db:
+            comment = await create_match_comment(db, match_id, comment_request.body, user, ip_address=ip)
 
-    # Notificar outros usuários na room
-    await socket_manager.emit('user_joined', {
-        'user_id': user_id,
-        'message': f'Usuário {user_id} entrou no chat'
-    }, room=match_id, skip_sid=sid)
+        return ack_ok(id=str(comment.id), created_at=comment.created_at.isoformat())
+    except Exception as exc:
+        return ack_error(exc)
 
 @socket_manager.on('ping')
 async def handle_ping(sid, data):
@@ -58,6 +277,7 @@ app.include_router(chats_router.router)
 app.include_router(messages_router.router)
 app.include_router(comments_router.router)
 app.include_router(matches_router.router)
+app.include_router(status_router.router)
 
 app.add_exception_handler(NotFound, not_found_exception_handler)
 app.add_exception_handler(Conflict, conflict_exception_handler)
@@ -22,6 +22,8 @@ class Match(Base):
         nullable=True
     )
     status: str = Column(String(50), nullable=False)
+    # Incrementada a cada escrita; permite detectar atualizações concorrentes do placar.
+    version: int = Column(Integer, nullable=False, default=1, server_default="1")
 
     comments = relationship("Comment", back_populates="match_obj", cascade="all, delete-orphan")
     chat = relationship("Chat", back_populates="match", cascade="all, delete-orphan")
\ No newline at end of file
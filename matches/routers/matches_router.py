@@ -1,18 +1,25 @@
 import uuid
 from typing import Optional, List
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app import socket_manager
+from app import score_emitter, competition_emitter
 from auth import get_current_user
+from chats.models.chats import Chat
 from matches.models.matches import Match
 from matches.schemas.matches import MatchRequestUpdateScore, MatchResponse
-from messaging.publisher_end_match import publish_match_finished_request
+from messaging.outbox_relay import outbox_relay
+from messaging.publisher_end_match import add_match_finished_to_outbox
+from services.match_cache import list_competition_matches, read_match
+from services.recent_messages import recent_messages
+from shared.invalidation_bus import invalidation_bus
 from shared.auth_utils import has_role
-from shared.dependencies import get_db
+from shared.dependencies import get_async_db
 
-from shared.exceptions import NotFound
+from shared.exceptions import NotFound, Conflict
+from shared.http_cache import conditional_get
 
 router = APIRouter(
     prefix='/api/v1/matches',
@@ -21,18 +28,22 @@ router = APIRouter(
 
 
 @router.get("/", response_model=List[MatchResponse])
-def get_matches(competition_id: str = Query(..., description="Filtrar partidas por competição"),
-                limit: int = Query(
-                    6, ge=1, le=100, description="Número máximo de partidas por página"),
-                offset: int = Query(
-                    0, ge=0, description="Número de partidas a pular"),
-                db: Session = Depends(get_db)):
+async def get_matches(request: Request,
+                      response: Response,
+                      competition_id: uuid.UUID = Query(..., description="Filtrar partidas por competição"),
+                      limit: int = Query(
+                          6, ge=1, le=100, description="Número máximo de partidas por página"),
+                      offset: int = Query(
+                          0, ge=0, description="Número de partidas a pular"),
+                      db: AsyncSession = Depends(get_async_db)):
     """
     List Matches by Competition
 
     Lista as partidas de uma competição específica. O parâmetro `competition_id` é obrigatório.
     A lista é ordenada para mostrar primeiro as partidas "em progresso" e depois por data de início.
     A rota suporta paginação através dos parâmetros `limit` e `offset`.
+    As páginas ficam em cache por alguns segundos e são invalidadas a cada escrita na competição.
+    A resposta traz um `ETag`; com `If-None-Match` igual, a rota responde 304 sem corpo.
 
     **Exemplo de Resposta:**
 
@@ -69,24 +80,23 @@ def get_matches(competition_id: str = Query(..., description="Filtrar partidas p
             detail="O ID da competição deve ser informado!"
         )
 
-    query = db.query(Match).filter(Match.competition_id == competition_id)
-    query = query.order_by(
-        (Match.status == "in-progress").desc(),
-        Match.start_time.asc()
-    )
-
-    matches = query.offset(offset).limit(limit).all()
+    not_modified = conditional_get(request, response, "competition", competition_id)
+    if not_modified:
+        return not_modified
 
-    return matches
+    return await list_competition_matches(db, competition_id, limit, offset)
 
 
 @router.get('/{match_id}', response_model=MatchResponse, status_code=200)
-def get_match_details(match_id: uuid.UUID,
-                      db: Session = Depends(get_db)):
+async def get_match_details(match_id: uuid.UUID,
+                            request: Request,
+                            response: Response,
+                            db: AsyncSession = Depends(get_async_db)):
     """
     Get Match Details
 
     Busca os detalhes de uma partida específica pelo seu ID.
+    Suporta GET condicional (`ETag`/`If-None-Match`), respondendo 304 quando o placar não mudou.
 
     **Exemplo de Resposta:**
 
@@ -101,72 +111,80 @@ def get_match_details(match_id: uuid.UUID,
          "score_away": 0,
          "status": "in-progress",
          "start_time": "2025-08-10T14:00:00Z",
-         "round": 1
+         "round": 1,
+         "version": 4
        }
     """
-    match: Match = db.query(Match).filter(
-        Match.match_id == match_id).first()  # type: ignore
-
-    if not match:
-        raise NotFound("Partida")
+    not_modified = conditional_get(request, response, "match", match_id)
+    if not_modified:
+        return not_modified
 
-    return match
+    return await read_match(db, match_id)
 
 
 @router.patch('/{match_id}/start-match', status_code=204)
-def start_match(match_id: uuid.UUID,
-                db: Session = Depends(get_db),
-                current_user: dict = Depends(get_current_user)):
+async def start_match(match_id: uuid.UUID,
+                      db: AsyncSession = Depends(get_async_db),
+                      current_user: dict = Depends(get_current_user)):
     """
     Start a Match
 
     Inicia uma partida, alterando seu status para 'in-progress'.
+    A transição é enviada à room da competição (`competition_updated`).
     Esta é uma ação restrita a usuários com o papel 'Organizador'.
     A rota não retorna conteúdo no corpo da resposta.
     """
     groups = current_user["groups"]
 
-    match: Match = db.query(Match).filter(
-        Match.match_id == match_id).first()  # type: ignore
+    if not has_role(groups, "Organizador"):
+        raise HTTPException(
+            status_code=403,
+            detail="Você não tem permissão para iniciar uma partida."
+        )
 
-    if not match:
-        raise NotFound("Partida")
+    result = await db.execute(
+        update(Match)
+        .where(Match.match_id == match_id)  # type: ignore
+        .values(status="in-progress", version=Match.version + 1)
+        .returning(Match.competition_id, Match.version)
+    )
+    match = result.first()
 
-    if has_role(groups, "Organizador"):
-        match.status = "in-progress"
+    if match is None:
+        raise NotFound("Partida")
 
-        db.add(match)
-        db.commit()
-        db.refresh(match)
+    await invalidation_bus.publish(db, "match", match_id=match_id, competition_id=match.competition_id)
+    await db.commit()
 
-        return
+    await competition_emitter.submit_delta(match.competition_id, match_id,
+                                           status="in-progress", version=match.version)
 
-    else:
-        raise HTTPException(
-            status_code=403,
-            detail="Você não tem permissão para iniciar uma partida."
-        )
+    return
 
 
 @router.delete("/{match_id}/end-match", status_code=204)
 async def end_match(match_id: uuid.UUID,
-                    db: Session = Depends(get_db),
+                    db: AsyncSession = Depends(get_async_db),
                     current_user: dict = Depends(get_current_user)):
     """
     End a Match
 
-    Finaliza uma partida. Esta ação:
+    Finaliza uma partida. Esta ação, em uma única transação:
     1. Altera o status da partida para 'finished'.
-    2. Publica uma mensagem para notificar outros serviços sobre o resultado.
+    2. Registra no outbox a mensagem que notifica outros serviços sobre o resultado
+       (publicada de forma assíncrona pelo relay do outbox, com garantia at-least-once).
     3. Remove o registro da partida da tabela de partidas ativas.
 
+    O placar final e o status 'finished' são enviados à room da competição (`competition_updated`).
+
     Esta é uma ação restrita a usuários com o papel 'Organizador'.
     A rota não retorna conteúdo no corpo da resposta.
     """
     groups = current_user["groups"]
 
-    match: Match = db.query(Match).filter(
-        Match.match_id == match_id).first()  # type: ignore
+    result = await db.execute(select(Match).filter(
+        Match.match_id == match_id))  # type: ignore
+    match: Match = result.scalars().first()
 
     if not match:
         raise NotFound("Partida")
@@ -183,10 +201,24 @@ async def end_match(match_id: uuid.UUID,
             "status": match.status
         }
 
-        await publish_match_finished_request(match_message_data)
+        add_match_finished_to_outbox(db, match_message_data)
 
-        db.delete(match)
-        db.commit()
+        chat_id = (await db.execute(select(Chat.id).filter(
+            Chat.match_id == match_id))).scalar()  # type: ignore
+
+        await db.delete(match)
+        await invalidation_bus.publish(db, "match", match_id=match_id,
+                                       competition_id=match.competition_id)
+        if chat_id:
+            await invalidation_bus.publish(db, "messages", chat_id=chat_id)
+        await db.commit()
+
+        outbox_relay.wake()
+        await competition_emitter.submit_delta(match.competition_id, match_id, status="finished",
+                                               score_home=match.score_home,
+                                               score_away=match.score_away)
+        if chat_id:
+            recent_messages.evict(chat_id)
 
         return
 
@@ -200,7 +232,7 @@ async def end_match(match_id: uuid.UUID,
 @router.patch("/{match_id}/update-score", status_code=204)
 async def update_match_score(match_id: uuid.UUID,
                              match_request: MatchRequestUpdateScore,
-                             db: Session = Depends(get_db),
+                             db: AsyncSession = Depends(get_async_db),
                              current_user: dict = Depends(get_current_user)):
     """
     Update Match Score
@@ -208,48 +240,75 @@ async def update_match_score(match_id: uuid.UUID,
     Atualiza o placar de uma partida em andamento.
     Após a atualização, um evento WebSocket (`score_updated`) é emitido para a sala
     correspondente ao `match_id`, permitindo que clientes atualizem a UI em tempo real.
+    Correções feitas em sequência dentro de uma janela curta são agrupadas em um único
+    evento com o placar mais recente; `seq` é a `version` da partida, que ordena os eventos
+    mesmo quando vêm de nós diferentes.
+    O novo placar também segue, de forma compacta, para a room da competição (`competition_updated`).
     Esta é uma ação restrita a usuários com o papel 'Organizador'.
 
+    Se `version` (retornada nos detalhes da partida) for enviada e a partida tiver sido
+    alterada desde então, por exemplo por outro organizador, a rota retorna 409 em vez
+    de sobrescrever o placar.
+
     **Exemplo de Corpo da Requisição (Payload):**
 
     .. code-block:: json
 
        {
          "score_home": 2,
-         "score_away": 1
+         "score_away": 1,
+         "version": 4
        }
     """
     groups = current_user["groups"]
 
-    match: Match = db.query(Match).filter(
-        Match.match_id == match_id).first()  # type: ignore
-
-    if not match:
-        raise NotFound("Partida")
-
-    if has_role(groups, "Organizador"):
-        match.score_home = match_request.score_home
-        match.score_away = match_request.score_away
-
-        db.add(match)
-        db.commit()
-        db.refresh(match)
-
-        match_data = {
-            "match_id": str(match.match_id),
-            "team_home_id": str(match.team_home_id),
-            "team_away_id": str(match.team_away_id),
-            "score_home": match.score_home,
-            "score_away": match.score_away,
-            "status": match.status
-        }
-
-        await socket_manager.emit('score_updated', match_data, room=str(match.match_id))
-
-        return
-
-    else:
+    if not has_role(groups, "Organizador"):
         raise HTTPException(
             status_code=403,
             detail="Você não tem permissão para atualizar o placar de uma partida."
         )
+
+    statement = update(Match).where(Match.match_id == match_id)  # type: ignore
+    if match_request.version is not None:
+        statement = statement.where(Match.version == match_request.version)
+
+    result = await db.execute(
+        statement
+        .values(score_home=match_request.score_home,
+                score_away=match_request.score_away,
+                version=Match.version + 1)
+        .returning(Match.match_id, Match.competition_id, Match.team_home_id, Match.team_away_id,
+                   Match.score_home, Match.score_away, Match.status, Match.version)
+    )
+    match = result.first()
+
+    if match is None:
+        if match_request.version is not None:
+            exists = await db.execute(select(Match.match_id).filter(
+                Match.match_id == match_id))  # type: ignore
+            if exists.first():
+                raise Conflict("Placar alterado por outro organizador")
+        raise NotFound("Partida")
+
+    await invalidation_bus.publish(db, "match", match_id=match.match_id,
+                                   competition_id=match.competition_id)
+    await db.commit()
+
+    match_data = {
+        "match_id": str(match.match_id),
+        "team_home_id": str(match.team_home_id),
+        "team_away_id": str(match.team_away_id),
+        "score_home": match.score_home,
+        "score_away": match.score_away,
+        "status": match.status,
+        "version": match.version
+    }
+
+    await score_emitter.submit(str(match.match_id), match_data)
+    await competition_emitter.submit_delta(match.competition_id, match.match_id,
+                                           score_home=match.score_home,
+                                           score_away=match.score_away,
+                                           status=match.status,
+                                           version=match.version)
+
+    return
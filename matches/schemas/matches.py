@@ -1,4 +1,5 @@
 import uuid
+from typing import Optional
 
 from pydantic import BaseModel
 
@@ -6,6 +7,8 @@ from pydantic import BaseModel
 class MatchRequestUpdateScore(BaseModel):
     score_home: int
     score_away: int
+    # Versão lida pelo cliente; se informada e desatualizada, a atualização é recusada (409).
+    version: Optional[int] = None
 
 class MatchResponse(BaseModel):
     match_id: uuid.UUID
@@ -14,4 +17,9 @@ class MatchResponse(BaseModel):
     team_away_id: uuid.UUID
     score_home: int
     score_away: int
-    status: str
\ No newline at end of file
+    status: str
+    version: int
+
+    model_config = {
+        "from_attributes": True
+    }
\ No newline at end of file
@@ -5,32 +5,9 @@ import os
 import uuid
 from datetime import datetime, timezone
 
-RABBITMQ_USER_DEFAULT = "guest"
-RABBITMQ_PASSWORD_DEFAULT = "guest"
-RABBITMQ_HOST_DEFAULT = "rabbitmq"
-RABBITMQ_PORT_DEFAULT = "5672"
-RABBITMQ_VHOST_DEFAULT = "/"
-
-RABBITMQ_URL = os.getenv("RABBITMQ_URL")
-
-if not RABBITMQ_URL:
-    user = os.getenv("RABBITMQ_USER", RABBITMQ_USER_DEFAULT)
-    password = os.getenv("RABBITMQ_PASSWORD", RABBITMQ_PASSWORD_DEFAULT)
-    host = os.getenv("RABBITMQ_HOST", RABBITMQ_HOST_DEFAULT)
-    port = os.getenv("RABBITMQ_PORT", RABBITMQ_PORT_DEFAULT)
-    vhost = os.getenv("RABBITMQ_VHOST", RABBITMQ_VHOST_DEFAULT)
-
-    if not vhost or vhost == "/":
-        vhost_path = ""
-    elif not vhost.startswith("/"):
-        vhost_path = "/" + vhost
-    else:
-        vhost_path = vhost
+from messaging.broker import rabbitmq_publisher
+from shared.metrics import register_status_provider
 
-    RABBITMQ_URL = f"amqp://{user}:{password}@{host}:{port}{vhost_path}"
-    print(f"INFO: RABBITMQ_URL não estava definida no ambiente. URL montada: {RABBITMQ_URL}")
-else:
-    print(f"INFO: Usando RABBITMQ_URL definida no ambiente: {RABBITMQ_URL}")
 
 def generate_log_payload(
     event_type: str,
@@ -43,6 +20,7 @@ def generate_log_payload(
     request_object,
     old_data: dict | None = None,
     new_data: dict | None = None,
+    ip_address: str | None = None,
 ) -> dict:
     """
     Gera um payload de log estruturado com old_data e new_data
@@ -52,7 +30,10 @@ def generate_log_payload(
     new_data_value = convert_values(new_data)
     old_data_value = convert_values(old_data)
 
-    ip = request_object.client.host if request_object and request_object.client else "127.0.0.1"
+    if ip_address:
+        ip = ip_address
+    else:
+        ip = request_object.client.host if request_object and request_object.client else "127.0.0.1"
 
 
     #if request_object.correlation_id:
@@ -79,65 +60,203 @@ def generate_log_payload(
 
 AUDIT_EXCHANGE = "events_exchange"
 
+def build_audit_message(log_payload: dict) -> aio_pika.Message:
+    """
+    Monta a mensagem aio_pika no formato de tarefa do Celery para um log de auditoria.
+    """
+    # 1. Montar o corpo no formato Celery: (args, kwargs, options)
+    celery_body = (
+        [log_payload],  # args: seu payload vai aqui
+        {},             # kwargs: vazio neste caso
+        {"callbacks": None, "errbacks": None, "chain": None, "chord": None},
+    )
+
+    # 2. Definir os cabeçalhos (headers) essenciais do Celery
+    task_id = str(uuid.uuid4())
+    celery_headers = {
+        'lang': 'py',
+        'task': 'process_audit_log', # O nome exato da sua tarefa
+        'id': task_id,
+        'root_id': task_id,
+        'parent_id': None,
+        'group': None,
+    }
+
+    # 3. Criar a mensagem aio_pika com todas as propriedades
+    return aio_pika.Message(
+        body=json.dumps(celery_body).encode('utf-8'),
+        headers=celery_headers,
+        content_type='application/json',  # Celery usa JSON por padrão
+        content_encoding='utf-8',
+        delivery_mode=aio_pika.DeliveryMode.PERSISTENT
+    )
+
+
 async def publish_audit_log(log_payload: dict):
     """
     Publica uma mensagem de log de auditoria no RabbitMQ com uma routing key específica.
 
     :param log_payload: Dados de log a serem publicados.
     """
-    connection = None
     try:
-        connection = await aio_pika.connect_robust(RABBITMQ_URL)
-
-        async with connection:
-            channel = await connection.channel()
-
-            exchange = await channel.declare_exchange(
-                AUDIT_EXCHANGE,
-                aio_pika.ExchangeType.TOPIC,
-                durable=True
-            )
-
-             # 1. Montar o corpo no formato Celery: (args, kwargs, options)
-            celery_body = (
-                [log_payload],  # args: seu payload vai aqui
-                {},             # kwargs: vazio neste caso
-                {"callbacks": None, "errbacks": None, "chain": None, "chord": None},
-            )
-
-            # 2. Definir os cabeçalhos (headers) essenciais do Celery
-            task_id = str(uuid.uuid4())
-            celery_headers = {
-                'lang': 'py',
-                'task': 'process_audit_log', # O nome exato da sua tarefa
-                'id': task_id,
-                'root_id': task_id,
-                'parent_id': None,
-                'group': None,
-            }
-
-            # 3. Criar a mensagem aio_pika com todas as propriedades
-            message = aio_pika.Message(
-                body=json.dumps(celery_body).encode('utf-8'),
-                headers=celery_headers,
-                content_type='application/json',  # Celery usa JSON por padrão
-                content_encoding='utf-8',
-                delivery_mode=aio_pika.DeliveryMode.PERSISTENT
-            )
-
-            routing_key = f'{log_payload["event_type"]}'
-
-            # A routing_key agora é o parâmetro recebido pela função
-            await exchange.publish(message, routing_key=routing_key)
-
-            print(f"[audit_service] Log enviado para exchange '{AUDIT_EXCHANGE}' com routing key '{routing_key}'")
-            print(f"[audit_service] Log payload: {log_payload}")
+        await publish_audit_logs([log_payload])
 
     except aio_pika.exceptions.AMQPConnectionError as e:
         print(f"Erro de conexão com RabbitMQ: {e}")
     except Exception as e:
         print(f"Erro ao publicar mensagem de auditoria: {e}")
 
+
+async def publish_audit_logs(log_payloads: list[dict]):
+    """
+    Publica um lote de logs de auditoria em um único canal. Erros são propagados.
+
+    :param log_payloads: Lista de dados de log a serem publicados.
+    """
+    # A routing key de cada mensagem é o tipo do evento
+    messages = [
+        (build_audit_message(log_payload), f'{log_payload["event_type"]}')
+        for log_payload in log_payloads
+    ]
+
+    await rabbitmq_publisher.publish_many(
+        AUDIT_EXCHANGE,
+        aio_pika.ExchangeType.TOPIC,
+        messages
+    )
+
+    print(f"[audit_service] {len(messages)} log(s) enviado(s) para exchange '{AUDIT_EXCHANGE}'")
+
+
+# --- Pipeline de Auditoria (fila limitada + micro-lotes) ---
+
+AUDIT_QUEUE_MAXSIZE = int(os.getenv("AUDIT_QUEUE_MAXSIZE", "1000"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "50"))
+AUDIT_BATCH_INTERVAL_MS = int(os.getenv("AUDIT_BATCH_INTERVAL_MS", "200"))
+AUDIT_QUEUE_FULL_POLICY = os.getenv("AUDIT_QUEUE_FULL_POLICY", "drop")  # "drop" ou "block"
+AUDIT_SHUTDOWN_TIMEOUT = float(os.getenv("AUDIT_SHUTDOWN_TIMEOUT", "10"))
+
+
+class AuditPipeline:
+    """
+    Pipeline de logs de auditoria em processo.
+
+    Os logs entram em uma fila limitada e uma única tarefa consumidora os publica
+    em lotes, fechados por tamanho (`batch_size`) ou por tempo (`batch_interval_ms`).
+    Com a fila cheia, a política `drop` descarta o log e `block` faz o chamador
+    aguardar espaço (backpressure). No encerramento a fila é drenada.
+    """
+
+    def __init__(self,
+                 maxsize: int = AUDIT_QUEUE_MAXSIZE,
+                 batch_size: int = AUDIT_BATCH_SIZE,
+                 batch_interval_ms: int = AUDIT_BATCH_INTERVAL_MS,
+                 full_policy: str = AUDIT_QUEUE_FULL_POLICY):
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval_ms / 1000
+        self.full_policy = full_policy
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._task: asyncio.Task | None = None
+        self.stats = {
+            "enqueued": 0,
+            "dropped": 0,
+            "blocked": 0,
+            "published": 0,
+            "failed": 0,
+            "batches": 0,
+        }
+
+    @property
+    def queue_size(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            if self._queue.empty():
+                # Fila nova para o loop atual (ex.: reinício da aplicação).
+                self._queue = asyncio.Queue(maxsize=self.maxsize)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = AUDIT_SHUTDOWN_TIMEOUT) -> None:
+        if self._task is None:
+            return
+
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            print(f"CRITICAL: [audit_service] Encerramento sem drenar a fila: {self._queue.qsize()} log(s) perdido(s).")
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def submit(self, log_payload: dict) -> None:
+        """
+        Enfileira um log respeitando a política configurada para fila cheia.
+        """
+        self.start()
+
+        if self.full_policy == "block":
+            if self._queue.full():
+                self.stats["blocked"] += 1
+            await self._queue.put(log_payload)
+            self.stats["enqueued"] += 1
+        else:
+            self.submit_nowait(log_payload)
+
+    def submit_nowait(self, log_payload: dict) -> None:
+        """
+        Enfileira um log sem aguardar; com a fila cheia o log é descartado.
+        """
+        self.start()
+
+        try:
+            self._queue.put_nowait(log_payload)
+            self.stats["enqueued"] += 1
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            print(f"AVISO: [audit_service] Fila de auditoria cheia. Log '{log_payload.get('event_type')}' descartado.")
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_interval
+
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._publish_batch(batch)
+
+    async def _publish_batch(self, batch: list[dict]) -> None:
+        try:
+            await publish_audit_logs(batch)
+            self.stats["published"] += len(batch)
+            self.stats["batches"] += 1
+        except Exception as e:
+            self.stats["failed"] += len(batch)
+            print(f"Erro ao publicar lote de {len(batch)} log(s) de auditoria: {e}")
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+
+audit_pipeline = AuditPipeline()
+
+register_status_provider("audit_pipeline", lambda: {**audit_pipeline.stats, "queue_size": audit_pipeline.queue_size})
+
+
 def model_to_dict(model_instance):
     if not model_instance:
         return {}
@@ -155,8 +274,17 @@ def convert_values(obj):
     else:
         return obj
 
+async def submit_audit_log(log_payload: dict):
+    """
+    Envia o log para o pipeline de auditoria, aplicando backpressure se configurado.
+    """
+    try:
+        await audit_pipeline.submit(log_payload)
+    except Exception as e:
+        print(f"CRITICAL: Falha ao publicar log de auditoria! Erro: {e}")
+
 def run_async_audit(log_payload: dict):
     try:
-        asyncio.ensure_future(publish_audit_log(log_payload))
+        audit_pipeline.submit_nowait(log_payload)
     except Exception as e:
         print(f"CRITICAL: Falha ao publicar log de auditoria! Erro: {e}")
\ No newline at end of file
@@ -0,0 +1,135 @@
+import asyncio
+import aio_pika
+import os
+
+from aio_pika.pool import Pool
+
+from shared.metrics import register_status_provider
+
+RABBITMQ_USER_DEFAULT = "guest"
+RABBITMQ_PASSWORD_DEFAULT = "guest"
+RABBITMQ_HOST_DEFAULT = "rabbitmq"
+RABBITMQ_PORT_DEFAULT = "5672"
+RABBITMQ_VHOST_DEFAULT = "/"
+
+RABBITMQ_URL = os.getenv("RABBITMQ_URL")
+
+if not RABBITMQ_URL:
+    user = os.getenv("RABBITMQ_USER", RABBITMQ_USER_DEFAULT)
+    password = os.getenv("RABBITMQ_PASSWORD", RABBITMQ_PASSWORD_DEFAULT)
+    host = os.getenv("RABBITMQ_HOST", RABBITMQ_HOST_DEFAULT)
+    port = os.getenv("RABBITMQ_PORT", RABBITMQ_PORT_DEFAULT)
+    vhost = os.getenv("RABBITMQ_VHOST", RABBITMQ_VHOST_DEFAULT)
+
+    if not vhost or vhost == "/":
+        vhost_path = ""
+    elif not vhost.startswith("/"):
+        vhost_path = "/" + vhost
+    else:
+        vhost_path = vhost
+
+    RABBITMQ_URL = f"amqp://{user}:{password}@{host}:{port}{vhost_path}"
+    print(f"INFO: RABBITMQ_URL não estava definida no ambiente. URL montada: {RABBITMQ_URL}")
+else:
+    print(f"INFO: Usando RABBITMQ_URL definida no ambiente: {RABBITMQ_URL}")
+
+
+RABBITMQ_CHANNEL_POOL_SIZE = int(os.getenv("RABBITMQ_CHANNEL_POOL_SIZE", "4"))
+
+
+class RabbitMQPublisher:
+    """
+    Publicador compartilhado pelo processo.
+
+    Mantém uma única conexão robusta com o RabbitMQ, um pool pequeno de canais
+    e o registro das exchanges já declaradas, de modo que cada publicação custe
+    apenas o envio do frame (e a confirmação do broker), sem handshake.
+    """
+
+    def __init__(self, url: str, channel_pool_size: int = RABBITMQ_CHANNEL_POOL_SIZE):
+        self.url = url
+        self.channel_pool_size = channel_pool_size
+        self._connection: aio_pika.abc.AbstractRobustConnection | None = None
+        self._channel_pool: Pool | None = None
+        self._declared_exchanges: set[str] = set()
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed
+
+    async def start(self) -> None:
+        async with self._lock:
+            if self.is_connected:
+                return
+
+            self._connection = await aio_pika.connect_robust(self.url)
+            self._channel_pool = Pool(self._create_channel, max_size=self.channel_pool_size)
+            self._declared_exchanges.clear()
+
+            print(f"INFO: [publisher] Conexão compartilhada com RabbitMQ aberta ({self.channel_pool_size} canais no pool).")
+
+    async def stop(self) -> None:
+        async with self._lock:
+            if self._channel_pool is not None and not self._channel_pool.is_closed:
+                await self._channel_pool.close()
+
+            if self._connection is not None and not self._connection.is_closed:
+                await self._connection.close()
+
+            self._channel_pool = None
+            self._connection = None
+            self._declared_exchanges.clear()
+
+            print("INFO: [publisher] Conexão compartilhada com RabbitMQ encerrada.")
+
+    async def _create_channel(self) -> aio_pika.abc.AbstractChannel:
+        return await self._connection.channel()
+
+    async def _get_exchange(self,
+                            channel: aio_pika.abc.AbstractChannel,
+                            exchange_name: str,
+                            exchange_type: aio_pika.ExchangeType) -> aio_pika.abc.AbstractExchange:
+        if exchange_name in self._declared_exchanges:
+            return await channel.get_exchange(exchange_name, ensure=False)
+
+        exchange = await channel.declare_exchange(exchange_name, exchange_type, durable=True)
+        self._declared_exchanges.add(exchange_name)
+
+        return exchange
+
+    async def publish(self,
+                      exchange_name: str,
+                      exchange_type: aio_pika.ExchangeType,
+                      message: aio_pika.Message,
+                      routing_key: str) -> None:
+        """
+        Publica uma mensagem usando um canal do pool. Erros são propagados para o chamador.
+        """
+        await self.publish_many(exchange_name, exchange_type, [(message, routing_key)])
+
+    async def publish_many(self,
+                           exchange_name: str,
+                           exchange_type: aio_pika.ExchangeType,
+                           messages: list[tuple[aio_pika.Message, str]]) -> None:
+        """
+        Publica várias mensagens em um único canal, aguardando as confirmações em paralelo.
+        """
+        if not self.is_connected:
+            await self.start()
+
+        async with self._channel_pool.acquire() as channel:
+            if channel.is_closed:
+                await channel.reopen()
+
+            exchange = await self._get_exchange(channel, exchange_name, exchange_type)
+
+            await asyncio.gather(*(
+                exchange.publish(message, routing_key=routing_key)
+                for message, routing_key in messages
+            ))
+
+
+rabbitmq_publisher = RabbitMQPublisher(RABBITMQ_URL)
+
+register_status_provider("rabbitmq_publisher", lambda: {"connected": rabbitmq_publisher.is_connected})
@@ -1,36 +1,17 @@
 import asyncio
 import aio_pika
 import json
+import math
 import os
 
-from services.crud import create_match_comments_in_db
+from sqlalchemy.exc import DataError, IntegrityError
 
-RABBITMQ_USER_DEFAULT = "guest"
-RABBITMQ_PASSWORD_DEFAULT = "guest"
-RABBITMQ_HOST_DEFAULT = "rabbitmq"
-RABBITMQ_PORT_DEFAULT = "5672"
-RABBITMQ_VHOST_DEFAULT = "/"
-
-RABBITMQ_URL = os.getenv("RABBITMQ_URL")
-
-if not RABBITMQ_URL:
-    user = os.getenv("RABBITMQ_USER", RABBITMQ_USER_DEFAULT)
-    password = os.getenv("RABBITMQ_PASSWORD", RABBITMQ_PASSWORD_DEFAULT)
-    host = os.getenv("RABBITMQ_HOST", RABBITMQ_HOST_DEFAULT)
-    port = os.getenv("RABBITMQ_PORT", RABBITMQ_PORT_DEFAULT)
-    vhost = os.getenv("RABBITMQ_VHOST", RABBITMQ_VHOST_DEFAULT)
-
-    if not vhost or vhost == "/":
-        vhost_path = ""
-    elif not vhost.startswith("/"):
-        vhost_path = "/" + vhost
-    else:
-        vhost_path = vhost
-
-    RABBITMQ_URL = f"amqp://{user}:{password}@{host}:{port}{vhost_path}"
-    print(f"INFO: RABBITMQ_URL não estava definida no ambiente. URL montada: {RABBITMQ_URL}")
-else:
-    print(f"INFO: Usando RABBITMQ_URL definida no ambiente: {RABBITMQ_URL}")
+from messaging.broker import RABBITMQ_URL
+from messaging.supervisor import ConsumerSupervisor
+from services.crud import create_matches_in_db_batch, parse_match_message
+from shared.database import DB_POOL_SIZE
+from shared.db_executor import BoundedDBExecutor
+from shared.metrics import register_status_provider
 
 
 MATCHES_EXCHANGE = "matches_commands_exchange"
@@ -39,92 +20,183 @@ MATCHES_CREATION_QUEUE = "match_comments_service.queue.match_creation"
 ROUTING_KEY_MATCHES_CREATION= "match_created"
 
 
-async def on_message(message: aio_pika.IncomingMessage) -> None:
-    async with message.process():
+MATCH_INGEST_BATCH_SIZE = int(os.getenv("MATCH_INGEST_BATCH_SIZE", "100"))
+MATCH_INGEST_BATCH_INTERVAL_MS = int(os.getenv("MATCH_INGEST_BATCH_INTERVAL_MS", "200"))
+MATCH_INGEST_PREFETCH_COUNT = int(os.getenv("MATCH_INGEST_PREFETCH_COUNT", str(max(10, MATCH_INGEST_BATCH_SIZE))))
+
+# Lotes em voo ao mesmo tempo: o que o prefetch permite, limitado a 1/4 do pool
+# de conexões para que as requisições HTTP sempre tenham conexões livres.
+CONSUMER_DB_MAX_CONCURRENCY = int(os.getenv(
+    "CONSUMER_DB_MAX_CONCURRENCY",
+    str(max(1, min(DB_POOL_SIZE // 4, math.ceil(MATCH_INGEST_PREFETCH_COUNT / MATCH_INGEST_BATCH_SIZE))))
+))
+
+consumer_db_executor = BoundedDBExecutor("consumer_db", CONSUMER_DB_MAX_CONCURRENCY)
+
+
+class MatchIngestionBatcher:
+    """
+    Acumula mensagens `match_created` e as grava em lote.
+
+    O lote é gravado quando atinge `batch_size` mensagens ou quando `batch_interval_ms`
+    se passa desde a primeira mensagem pendente. A gravação roda no
+    `consumer_db_executor`, que limita quantos lotes usam o banco ao mesmo tempo.
+    Todas as mensagens do lote são confirmadas (ack) juntas após o commit; se a
+    gravação falhar por um erro transitório, voltam para a fila. Mensagens inválidas são
+    rejeitadas individualmente, sem reenfileirar: se o banco recusar o lote
+    (`IntegrityError`/`DataError`), as mensagens são gravadas uma a uma para isolar as
+    que o banco não aceita, sem impedir a gravação das demais.
+    """
+
+    def __init__(self,
+                 batch_size: int = MATCH_INGEST_BATCH_SIZE,
+                 batch_interval_ms: int = MATCH_INGEST_BATCH_INTERVAL_MS):
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval_ms / 1000
+        self._pending: list[tuple[aio_pika.IncomingMessage, dict]] = []
+        self._flush_timer: asyncio.TimerHandle | None = None
+        self._flush_tasks: set[asyncio.Task] = set()
+
+    async def add(self, message: aio_pika.IncomingMessage) -> None:
         try:
             data = json.loads(message.body.decode())
-            print(f" [requests_service] Received message: {data}")
-            print(f" [requests_service] Routing Key: {message.routing_key}")
+            parse_match_message(data)
+        except json.JSONDecodeError as e:
+            print(f" [requests_service] Erro ao decodificar JSON: {e}. Mensagem será rejeitada.")
+            await message.reject(requeue=False)
+            return
+        except ValueError as e:
+            print(f" [requests_service] Mensagem inválida: {e}. Mensagem será rejeitada.")
+            await message.reject(requeue=False)
+            return
+
+        print(f" [requests_service] Received message: {data}")
+        print(f" [requests_service] Routing Key: {message.routing_key}")
+
+        self._pending.append((message, data))
+
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+        elif self._flush_timer is None:
+            loop = asyncio.get_running_loop()
+            self._flush_timer = loop.call_later(self.batch_interval, self._schedule_flush)
+
+    def _schedule_flush(self) -> None:
+        task = asyncio.create_task(self.flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def stop(self) -> None:
+        """
+        Espera os flushes disparados pelo timer e grava o que ainda estiver pendente.
+        """
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+        await self.flush()
+
+    async def flush(self) -> None:
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+        batch, self._pending = self._pending, []
+
+        if not batch:
+            return
 
-            if hasattr(asyncio, 'to_thread'):
-                db_result = await asyncio.to_thread(create_match_comments_in_db, data)
+        try:
+            db_results = await consumer_db_executor.run(
+                create_matches_in_db_batch, [data for _, data in batch])
+        except (IntegrityError, DataError) as e:
+            print(f" [requests_service] Lote de {len(batch)} mensagem(ns) recusado pelo banco: {e}. Gravando uma a uma.")
+            await self._flush_one_by_one(batch)
+            return
+        except Exception as e:
+            print(f" [requests_service] Erro inesperado ao gravar lote de {len(batch)} mensagem(ns): {e}. Mensagens serão reenfileiradas.")
+            await asyncio.gather(*(message.nack(requeue=True) for message, _ in batch),
+                                 return_exceptions=True)
+            return
+
+        await asyncio.gather(*(message.ack() for message, _ in batch),
+                             return_exceptions=True)
+
+        print(f" [requests_service] Lote de {len(db_results)} partida(s) processado e confirmado.")
+
+    async def _flush_one_by_one(self, batch: list[tuple[aio_pika.IncomingMessage, dict]]) -> None:
+        settlements = []
+
+        for message, data in batch:
+            try:
+                await consumer_db_executor.run(create_matches_in_db_batch, [data])
+            except (IntegrityError, DataError) as e:
+                print(f" [requests_service] Mensagem recusada pelo banco: {e}. Mensagem será rejeitada.")
+                settlements.append(message.reject(requeue=False))
+            except Exception as e:
+                print(f" [requests_service] Erro inesperado ao gravar mensagem: {e}. Mensagem será reenfileirada.")
+                settlements.append(message.nack(requeue=True))
             else:
-                loop = asyncio.get_event_loop()
-                db_result = await loop.run_in_executor(None, create_match_comments_in_db, data)
+                settlements.append(message.ack())
 
-            print(f" [requests_service] Resultado do processamento do DB: {db_result}")
+        await asyncio.gather(*settlements, return_exceptions=True)
 
-        except json.JSONDecodeError as e:
-            print(f" [requests_service] Erro ao decodificar JSON: {e}. Mensagem será rejeitada.")
-            raise
-        except Exception as e:
-            print(f" [requests_service] Erro inesperado ao processar mensagem ou DB: {e}")
-            raise
 
+match_batcher = MatchIngestionBatcher()
 
-async def main_consumer():
-    retry_delay = 10
-    while True:
-        connection = None
-        try:
-            print(f"INFO: [requests_service] Consumidor: Tentando conectar ao RabbitMQ em {RABBITMQ_URL}...")
-            connection = await aio_pika.connect_robust(RABBITMQ_URL, timeout=15)
 
-            async with connection:
-                channel = await connection.channel()
-                await channel.set_qos(prefetch_count=10)
+async def on_message(message: aio_pika.IncomingMessage) -> None:
+    await match_batcher.add(message)
+
 
-                exchange = await channel.declare_exchange(
-                    MATCHES_EXCHANGE,
-                    aio_pika.ExchangeType.DIRECT,
-                    durable=True
-                )
+async def consume_match_creation() -> None:
+    """
+    Conecta ao RabbitMQ e consome a fila de criação de partidas até ser cancelado.
+    Falhas de conexão são propagadas para o `ConsumerSupervisor`, que reinicia o consumo.
+    """
+    print(f"INFO: [requests_service] Consumidor: Tentando conectar ao RabbitMQ em {RABBITMQ_URL}...")
+    connection = await aio_pika.connect_robust(RABBITMQ_URL, timeout=15)
 
+    async with connection:
+        try:
+            channel = await connection.channel()
+            await channel.set_qos(prefetch_count=MATCH_INGEST_PREFETCH_COUNT)
 
-                # Fila para criar match
-                team_creation_queue = await channel.declare_queue(
-                    MATCHES_CREATION_QUEUE,
-                    durable=True
-                )
+            exchange = await channel.declare_exchange(
+                MATCHES_EXCHANGE,
+                aio_pika.ExchangeType.DIRECT,
+                durable=True
+            )
 
-                await team_creation_queue.bind(exchange, routing_key=ROUTING_KEY_MATCHES_CREATION)
 
-                print(f"INFO: [requests_service] Consumidor: Conectado! '{MATCHES_CREATION_QUEUE}' esperando por mensagens com routing key '{ROUTING_KEY_MATCHES_CREATION}'. Para sair pressione CTRL+C")
+            # Fila para criar match
+            team_creation_queue = await channel.declare_queue(
+                MATCHES_CREATION_QUEUE,
+                durable=True
+            )
 
-                await team_creation_queue.consume(on_message)
+            await team_creation_queue.bind(exchange, routing_key=ROUTING_KEY_MATCHES_CREATION)
 
+            print(f"INFO: [requests_service] Consumidor: Conectado! '{MATCHES_CREATION_QUEUE}' esperando por mensagens com routing key '{ROUTING_KEY_MATCHES_CREATION}'.")
 
-                await asyncio.Future()
+            await team_creation_queue.consume(on_message)
 
-        except aio_pika.exceptions.AMQPConnectionError as e:
-            print(
-                f"AVISO: [requests_service] Consumidor: Falha na conexão com RabbitMQ (AMQPConnectionError): {e}. Tentando novamente em {retry_delay} segundos...")
-        except ConnectionRefusedError as e:
-            print(
-                f"AVISO: [requests_service] Consumidor: Conexão recusada (ConnectionRefusedError): {e}. Provavelmente o RabbitMQ não está totalmente pronto. Tentando novamente em {retry_delay} segundos...")
-        except asyncio.CancelledError:
-            print("INFO: [requests_service] Consumidor: Tarefa cancelada. Encerrando consumidor.")
-            break
-        except Exception as e:
-            print(
-                f"ERRO: [requests_service] Consumidor: Erro inesperado: {e}. Tentando novamente em {retry_delay} segundos...")
+
+            await asyncio.Future()
         finally:
-            if connection and not connection.is_closed:
-                print("INFO: [requests_service] Consumidor: Fechando conexão RabbitMQ no finally do loop.")
-                await connection.close()
+            # Grava e confirma o lote pendente antes de fechar a conexão
+            await match_batcher.stop()
+            print("INFO: [requests_service] Consumidor: Fechando conexão RabbitMQ.")
 
-            current_task = asyncio.current_task()
-            if current_task and current_task.cancelled():
-                print(
-                    "INFO: [requests_service] Consumidor: Saindo do loop de reconexão devido ao cancelamento (detectado no finally).")
-                break
 
-        print(f"INFO: [requests_service] Consumidor: Aguardando {retry_delay}s antes da próxima tentativa de conexão.")
-        await asyncio.sleep(retry_delay)
+consumer_supervisor = ConsumerSupervisor("match_creation_consumer", consume_match_creation)
+
+register_status_provider("match_creation_consumer", consumer_supervisor.status)
+register_status_provider("consumer_db_executor", consumer_db_executor.status)
 
 
 if __name__ == "__main__":
+    from messaging.worker import run_worker
+
     try:
-        asyncio.run(main_consumer())
+        asyncio.run(run_worker())
     except KeyboardInterrupt:
         print("Programa encerrado.")
\ No newline at end of file
@@ -0,0 +1,31 @@
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, UUID, String, DateTime, Integer, JSON, Index
+
+from shared.database import Base
+
+
+class OutboxMessage(Base):
+    __tablename__ = "outbox_messages"
+    __table_args__ = (
+        Index("ix_outbox_messages_available_at", "available_at"),
+    )
+
+    id: uuid.UUID = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    exchange: str = Column(String(255), nullable=False)
+    exchange_type: str = Column(String(20), nullable=False)
+    routing_key: str = Column(String(255), nullable=False)
+    payload: dict = Column(JSON, nullable=False)
+    attempts: int = Column(Integer, nullable=False, default=0)
+    last_error: str = Column(String(500), nullable=True)
+    created_at: datetime = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False
+    )
+    available_at: datetime = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False
+    )
\ No newline at end of file
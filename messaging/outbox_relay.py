@@ -0,0 +1,186 @@
+import asyncio
+import aio_pika
+import json
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select, update
+
+from messaging.broker import rabbitmq_publisher
+from messaging.models.outbox import OutboxMessage
+from shared.database import AsyncSessionLocal
+from shared.metrics import register_status_provider
+
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "5"))
+OUTBOX_RETRY_BASE_DELAY = float(os.getenv("OUTBOX_RETRY_BASE_DELAY", "1"))
+OUTBOX_RETRY_MAX_DELAY = float(os.getenv("OUTBOX_RETRY_MAX_DELAY", "300"))
+# Por quanto tempo um lote reivindicado fica invisível para as outras réplicas
+OUTBOX_CLAIM_TIMEOUT = float(os.getenv("OUTBOX_CLAIM_TIMEOUT", "60"))
+
+
+class OutboxRelay:
+    """
+    Drena a tabela `outbox_messages` para o RabbitMQ.
+
+    Cada mensagem é publicada com confirmação do broker (publisher confirms) e só
+    então removida do outbox, garantindo entrega at-least-once. Falhas reagendam a
+    mensagem com backoff exponencial. As linhas são reivindicadas com `SKIP LOCKED`, de
+    modo que várias réplicas podem rodar o relay ao mesmo tempo.
+    """
+
+    def __init__(self,
+                 batch_size: int = OUTBOX_BATCH_SIZE,
+                 poll_interval: float = OUTBOX_POLL_INTERVAL,
+                 claim_timeout: float = OUTBOX_CLAIM_TIMEOUT):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.claim_timeout = claim_timeout
+        self._wake_event = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.stats = {
+            "published": 0,
+            "failed": 0,
+            "broker_unavailable": 0,
+        }
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._wake_event = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def wake(self) -> None:
+        """
+        Sinaliza que há mensagens novas, evitando esperar o próximo ciclo de polling.
+        """
+        self._wake_event.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await self.drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"ERRO: [outbox] Falha ao drenar o outbox: {e}")
+                processed = 0
+
+            if processed >= self.batch_size:
+                continue
+
+            try:
+                await asyncio.wait_for(self._wake_event.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake_event.clear()
+
+    async def drain_once(self) -> int:
+        """
+        Publica um lote de mensagens pendentes. Retorna quantas foram processadas.
+
+        As linhas são reivindicadas (`available_at` adiado por `claim_timeout`) em uma
+        transação curta e publicadas depois do commit, sem manter travas nem uma conexão
+        do pool abertas durante a espera pelo broker. Se o processo cair no meio do lote,
+        as mensagens voltam a ficar disponíveis quando a reivindicação expira.
+        """
+        if not rabbitmq_publisher.is_connected:
+            try:
+                await rabbitmq_publisher.start()
+            except Exception as e:
+                self.stats["broker_unavailable"] += 1
+                print(f"AVISO: [outbox] RabbitMQ indisponível, lote adiado: {e}")
+                return 0
+
+        outbox_messages = await self._claim()
+        if not outbox_messages:
+            return 0
+
+        published, failed = [], []
+        for outbox_message in outbox_messages:
+            try:
+                await self._publish(outbox_message)
+                published.append(outbox_message.id)
+                self.stats["published"] += 1
+            except Exception as e:
+                failed.append((outbox_message, e))
+                self.stats["failed"] += 1
+
+        await self._settle(published, failed)
+        return len(outbox_messages)
+
+    async def _claim(self) -> list[OutboxMessage]:
+        now = datetime.now(timezone.utc)
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(OutboxMessage)
+                .filter(OutboxMessage.available_at <= now)
+                .order_by(OutboxMessage.created_at.asc())
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            outbox_messages = result.scalars().all()
+
+            for outbox_message in outbox_messages:
+                outbox_message.available_at = now + timedelta(seconds=self.claim_timeout)
+
+            await db.commit()
+
+        return list(outbox_messages)
+
+    async def _settle(self,
+                      published: list[uuid.UUID],
+                      failed: list[tuple[OutboxMessage, Exception]]) -> None:
+        now = datetime.now(timezone.utc)
+
+        async with AsyncSessionLocal() as db:
+            if published:
+                await db.execute(delete(OutboxMessage).where(OutboxMessage.id.in_(published)))
+
+            for outbox_message, e in failed:
+                attempts = outbox_message.attempts + 1
+                delay = min(OUTBOX_RETRY_MAX_DELAY, OUTBOX_RETRY_BASE_DELAY * 2 ** attempts)
+                await db.execute(
+                    update(OutboxMessage)
+                    .where(OutboxMessage.id == outbox_message.id)
+                    .values(attempts=attempts,
+                            last_error=str(e)[:500],
+                            available_at=now + timedelta(seconds=delay))
+                )
+                print(f"AVISO: [outbox] Falha ao publicar '{outbox_message.routing_key}' "
+                      f"(tentativa {attempts}): {e}. Nova tentativa em {delay:.0f}s.")
+
+            await db.commit()
+
+    async def _publish(self, outbox_message: OutboxMessage) -> None:
+        message = aio_pika.Message(
+            body=json.dumps(outbox_message.payload).encode(),
+            content_type="application/json",
+            message_id=str(outbox_message.id),
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT
+        )
+
+        await rabbitmq_publisher.publish(
+            outbox_message.exchange,
+            aio_pika.ExchangeType(outbox_message.exchange_type),
+            message,
+            routing_key=outbox_message.routing_key
+        )
+        print(f" [outbox] Sent '{outbox_message.routing_key}':'{outbox_message.payload}'")
+
+
+outbox_relay = OutboxRelay()
+
+register_status_provider("outbox_relay", lambda: dict(outbox_relay.stats))
\ No newline at end of file
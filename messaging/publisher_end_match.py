@@ -1,70 +1,28 @@
 import aio_pika
-import json
-import os
 
-RABBITMQ_USER_DEFAULT = "guest"
-RABBITMQ_PASSWORD_DEFAULT = "guest"
-RABBITMQ_HOST_DEFAULT = "rabbitmq"
-RABBITMQ_PORT_DEFAULT = "5672"
-RABBITMQ_VHOST_DEFAULT = "/"
+from sqlalchemy.ext.asyncio import AsyncSession
 
-RABBITMQ_URL = os.getenv("RABBITMQ_URL")
-
-if not RABBITMQ_URL:
-    user = os.getenv("RABBITMQ_USER", RABBITMQ_USER_DEFAULT)
-    password = os.getenv("RABBITMQ_PASSWORD", RABBITMQ_PASSWORD_DEFAULT)
-    host = os.getenv("RABBITMQ_HOST", RABBITMQ_HOST_DEFAULT)
-    port = os.getenv("RABBITMQ_PORT", RABBITMQ_PORT_DEFAULT)
-    vhost = os.getenv("RABBITMQ_VHOST", RABBITMQ_VHOST_DEFAULT)
-
-    if not vhost or vhost == "/":
-        vhost_path = ""
-    elif not vhost.startswith("/"):
-        vhost_path = "/" + vhost
-    else:
-        vhost_path = vhost
-
-    RABBITMQ_URL = f"amqp://{user}:{password}@{host}:{port}{vhost_path}"
-    print(f"INFO: RABBITMQ_URL não estava definida no ambiente. URL montada: {RABBITMQ_URL}")
-else:
-    print(f"INFO: Usando RABBITMQ_URL definida no ambiente: {RABBITMQ_URL}")
+from messaging.models.outbox import OutboxMessage
 
 
 MATCH_COMMENTS_EVENTS_EXCHANGE = "match_comments_events_exchange"
+ROUTING_KEY_MATCH_FINISHED = "match.finished.update"
 
 
-async def publish_match_finished_request(team_data: dict):
-    """
-    Publica uma mensagem indicando que a partida foi finalizada.
+def add_match_finished_to_outbox(db: AsyncSession, team_data: dict) -> OutboxMessage:
     """
-    connection = None
-    try:
-        connection = await aio_pika.connect_robust(RABBITMQ_URL)
+    Registra no outbox a mensagem indicando que a partida foi finalizada.
 
-        async with connection.channel() as channel:
-            exchange = await channel.declare_exchange(
-                MATCH_COMMENTS_EVENTS_EXCHANGE,
-                aio_pika.ExchangeType.DIRECT,
-                durable=True
-            )
-
-            message_body = json.dumps(team_data).encode()
-
-            routing_key = "match.finished.update"
-
-            message = aio_pika.Message(
-                body=message_body,
-                content_type="application/json",
-                delivery_mode=aio_pika.DeliveryMode.PERSISTENT
-            )
+    A mensagem é gravada na mesma transação da alteração da partida; o envio ao
+    RabbitMQ é feito pelo `OutboxRelay` após o commit.
+    """
+    outbox_message = OutboxMessage(
+        exchange=MATCH_COMMENTS_EVENTS_EXCHANGE,
+        exchange_type=aio_pika.ExchangeType.DIRECT.value,
+        routing_key=ROUTING_KEY_MATCH_FINISHED,
+        payload=team_data,
+    )
 
-            await exchange.publish(message, routing_key=routing_key)
-            print(f" [teams_service] Sent '{routing_key}':'{team_data}'")
+    db.add(outbox_message)
 
-    except aio_pika.exceptions.AMQPConnectionError as e:
-        print(f"Erro de conexão com RabbitMQ: {e}")
-    except Exception as e:
-        print(f"Erro ao publicar mensagem: {e}")
-    finally:
-        if connection and not connection.is_closed:
-            await connection.close()
\ No newline at end of file
+    return outbox_message
\ No newline at end of file
@@ -0,0 +1,88 @@
+import asyncio
+import os
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+CONSUMER_RESTART_BACKOFF_INITIAL = float(os.getenv("CONSUMER_RESTART_BACKOFF_INITIAL", "1"))
+CONSUMER_RESTART_BACKOFF_MAX = float(os.getenv("CONSUMER_RESTART_BACKOFF_MAX", "60"))
+CONSUMER_STABLE_AFTER = float(os.getenv("CONSUMER_STABLE_AFTER", "60"))
+
+
+class ConsumerSupervisor:
+    """
+    Mantém uma tarefa de consumo rodando.
+
+    Se a tarefa terminar ou falhar, ela é reiniciada com backoff exponencial
+    (reiniciado após `stable_after` segundos de execução estável). `stop()` cancela
+    a tarefa de forma limpa e `status()` expõe o estado atual.
+    """
+
+    def __init__(self,
+                 name: str,
+                 target: Callable[[], Awaitable[None]],
+                 initial_backoff: float = CONSUMER_RESTART_BACKOFF_INITIAL,
+                 max_backoff: float = CONSUMER_RESTART_BACKOFF_MAX,
+                 stable_after: float = CONSUMER_STABLE_AFTER):
+        self.name = name
+        self.target = target
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.stable_after = stable_after
+        self.state = "stopped"
+        self.restarts = 0
+        self.last_error: str | None = None
+        self.last_started_at: datetime | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.state = "stopped"
+
+        print(f"INFO: [{self.name}] Consumidor encerrado.")
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "restarts": self.restarts,
+            "last_error": self.last_error,
+            "last_started_at": self.last_started_at.isoformat() if self.last_started_at else None,
+        }
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        backoff = self.initial_backoff
+
+        while True:
+            self.state = "running"
+            self.last_started_at = datetime.now(timezone.utc)
+            started = loop.time()
+
+            try:
+                await self.target()
+                self.last_error = "Consumidor terminou inesperadamente"
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+
+            if loop.time() - started >= self.stable_after:
+                backoff = self.initial_backoff
+
+            self.state = "backoff"
+            self.restarts += 1
+            print(f"AVISO: [{self.name}] {self.last_error}. Reiniciando em {backoff:.1f}s (reinício #{self.restarts}).")
+
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
\ No newline at end of file
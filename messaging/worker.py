@@ -0,0 +1,34 @@
+"""
+Worker de mensageria independente da API.
+
+Executa apenas o consumidor de criação de partidas, permitindo escalar réplicas
+de consumo separadamente das réplicas web. Nesse modo, a API deve ser iniciada
+com RUN_CONSUMER_IN_APP=false.
+
+Uso:
+    python -m messaging.worker
+"""
+import asyncio
+import signal
+
+from messaging.consumers import consumer_supervisor
+
+
+async def run_worker() -> None:
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    print("INFO: [worker] Iniciando worker de mensageria.")
+    consumer_supervisor.start()
+
+    await stop_event.wait()
+
+    print("INFO: [worker] Sinal de encerramento recebido.")
+    await consumer_supervisor.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_worker())
\ No newline at end of file
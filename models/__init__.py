@@ -2,6 +2,7 @@ from chats.models.chats import Chat
 from chats.models.messages import Message
 from matches.models.matches import Match
 from comments.models.comments import Comment
+from messaging.models.outbox import OutboxMessage
 
 from sqlalchemy.orm import configure_mappers
 configure_mappers()
\ No newline at end of file
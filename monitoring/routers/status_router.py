@@ -0,0 +1,32 @@
+from fastapi import APIRouter
+
+from shared.metrics import collect_status
+
+router = APIRouter(
+    prefix='/api/v1/status',
+    tags=['Status']
+)
+
+
+@router.get('/', status_code=200)
+async def service_status():
+    """
+    Service Status
+
+    Retorna o estado e as métricas dos componentes internos do processo
+    (consumidor, publicador, pipelines em segundo plano).
+
+    **Exemplo de Resposta:**
+
+    .. code-block:: json
+
+       {
+         "match_creation_consumer": {
+           "state": "running",
+           "restarts": 0,
+           "last_error": null,
+           "last_started_at": "2025-08-10T13:00:00+00:00"
+         }
+       }
+    """
+    return collect_status()
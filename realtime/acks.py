@@ -0,0 +1,33 @@
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from shared.exceptions import NotFound, Conflict
+
+
+def ack_ok(**data) -> dict:
+    return {"status": "ok", **data}
+
+
+def ack_error(exc: Exception) -> dict:
+    """
+    Converte as exceções usadas pelas rotas HTTP no payload de ack dos eventos Socket.IO,
+    mantendo os mesmos códigos de status da API.
+    """
+    if isinstance(exc, HTTPException):
+        error = {"status": "error", "code": exc.status_code, "detail": exc.detail}
+        retry_after = (exc.headers or {}).get("Retry-After")
+        if retry_after:
+            error["retry_after"] = int(retry_after)
+        return error
+
+    if isinstance(exc, NotFound):
+        return {"status": "error", "code": 404, "detail": f"Oops! {exc.name} não encontrado(a)."}
+
+    if isinstance(exc, Conflict):
+        return {"status": "error", "code": 409, "detail": f"{exc.name}! A operação não pode ser realizada."}
+
+    if isinstance(exc, (ValidationError, ValueError)):
+        return {"status": "error", "code": 422, "detail": str(exc)}
+
+    print(f"ERRO: Falha inesperada ao processar evento Socket.IO: {exc}")
+    return {"status": "error", "code": 500, "detail": "Erro interno."}
\ No newline at end of file
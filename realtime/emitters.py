@@ -0,0 +1,234 @@
+import asyncio
+import os
+from abc import ABC, abstractmethod
+from typing import Any
+
+import socketio
+
+SCORE_EMIT_COALESCE_MS = int(os.getenv("SCORE_EMIT_COALESCE_MS", "250"))
+# 0 desativa o modo em lote: cada mensagem gera um `new_message`
+CHAT_BATCH_WINDOW_MS = int(os.getenv("CHAT_BATCH_WINDOW_MS", "0"))
+COMPETITION_EMIT_COALESCE_MS = int(os.getenv("COMPETITION_EMIT_COALESCE_MS", "500"))
+
+
+class RoomEmitWindow(ABC):
+    """
+    Base para emits agrupados por room.
+
+    O primeiro `submit` de uma room abre uma janela de `window_ms`; os payloads
+    recebidos até o fim da janela são combinados por `_merge` e enviados em um único
+    emit montado por `_build`. Com `window_ms <= 0` o emit é imediato.
+    """
+
+    def __init__(self, server: socketio.AsyncServer, event: str, window_ms: int):
+        self.server = server
+        self.event = event
+        self.window = window_ms / 1000
+        self._pending: dict[str, Any] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+        self._flush_tasks: set[asyncio.Task] = set()
+        self.stats = {
+            "submitted": 0,
+            "emitted": 0,
+        }
+
+    @abstractmethod
+    def _merge(self, current: Any, payload: Any) -> Any:
+        """
+        Combina o payload recebido com o estado pendente da room (`None` na primeira vez).
+        """
+
+    @abstractmethod
+    def _build(self, room: str, state: Any) -> Any:
+        """
+        Monta o payload do emit a partir do estado acumulado na janela.
+        """
+
+    async def submit(self, room: str, payload: Any) -> None:
+        self.stats["submitted"] += 1
+        self._pending[room] = self._merge(self._pending.get(room), payload)
+
+        if self.window <= 0:
+            await self.flush(room)
+            return
+
+        if room not in self._timers:
+            loop = asyncio.get_running_loop()
+            self._timers[room] = loop.call_later(self.window, self._schedule_flush, room)
+
+    def _schedule_flush(self, room: str) -> None:
+        self._timers.pop(room, None)
+        task = asyncio.create_task(self.flush(room))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def flush(self, room: str) -> None:
+        timer = self._timers.pop(room, None)
+        if timer is not None:
+            timer.cancel()
+
+        if room not in self._pending:
+            return
+
+        state = self._pending.pop(room)
+
+        try:
+            await self.server.emit(self.event, self._build(room, state), room=room)
+            self.stats["emitted"] += 1
+        except Exception as e:
+            print(f"ERRO: [socketio] Falha ao emitir '{self.event}' para a room {room}: {e}")
+
+    async def flush_all(self) -> None:
+        for room in list(self._pending):
+            await self.flush(room)
+
+    def status(self) -> dict:
+        return {
+            **self.stats,
+            "window_ms": int(self.window * 1000),
+            "pending_rooms": len(self._pending),
+        }
+
+
+class ScoreEmitCoalescer(RoomEmitWindow):
+    """
+    Mantém apenas o placar mais recente de cada room durante a janela e o envia
+    em um único `score_updated`.
+
+    A ordem vem de `matches.version`, enviada também como `seq`: um contador do processo
+    colidiria entre nós quando os emits passam pela fila do Socket.IO. Dentro da janela,
+    um placar com versão menor que a já agendada é descartado; entre janelas (e entre
+    nós) o cliente descarta eventos com versão menor que a já exibida. Nenhum estado
+    por room sobrevive à janela.
+    """
+
+    def __init__(self, server: socketio.AsyncServer, window_ms: int = SCORE_EMIT_COALESCE_MS):
+        super().__init__(server, "score_updated", window_ms)
+        self.stats["stale"] = 0
+
+    def _merge(self, current: dict | None, payload: dict) -> dict:
+        if current is not None and payload["version"] < current["version"]:
+            self.stats["stale"] += 1
+            return current
+        return {**payload, "seq": payload["version"]}
+
+    def _build(self, room: str, state: dict) -> dict:
+        return state
+
+    def status(self) -> dict:
+        return {
+            **super().status(),
+            "coalesced": self.stats["submitted"] - self.stats["emitted"] - len(self._pending),
+        }
+
+
+class ChatMessageBatcher(RoomEmitWindow):
+    """
+    Entrega em lote das mensagens de chat.
+
+    Com a janela ativa, as mensagens de uma room recebidas durante `window_ms` são
+    enviadas em um único evento `new_messages` (lista). Com a janela desativada,
+    cada mensagem é enviada imediatamente como `new_message`, como antes.
+    Registra o tamanho dos lotes e o atraso entre o envio e o broadcast.
+    """
+
+    def __init__(self, server: socketio.AsyncServer, window_ms: int = CHAT_BATCH_WINDOW_MS):
+        super().__init__(server, "new_messages", window_ms)
+        self.stats.update({
+            "messages": 0,
+            "batch_size_max": 0,
+            "delay_total_ms": 0.0,
+            "delay_max_ms": 0.0,
+        })
+
+    def _merge(self, current: list | None, payload: tuple[dict, float]) -> list:
+        if current is None:
+            return [payload]
+        current.append(payload)
+        return current
+
+    def _build(self, room: str, state: list[tuple[dict, float]]) -> list[dict]:
+        now = asyncio.get_running_loop().time()
+
+        self.stats["messages"] += len(state)
+        self.stats["batch_size_max"] = max(self.stats["batch_size_max"], len(state))
+
+        for _, enqueued_at in state:
+            delay_ms = (now - enqueued_at) * 1000
+            self.stats["delay_total_ms"] += delay_ms
+            self.stats["delay_max_ms"] = max(self.stats["delay_max_ms"], delay_ms)
+
+        return [message_data for message_data, _ in state]
+
+    async def submit(self, room: str, message_data: dict) -> None:
+        if self.window <= 0:
+            await self.server.emit("new_message", message_data, room=room)
+            return
+
+        await super().submit(room, (message_data, asyncio.get_running_loop().time()))
+
+    def status(self) -> dict:
+        messages = self.stats["messages"]
+        emitted = self.stats["emitted"]
+        return {
+            "window_ms": int(self.window * 1000),
+            "pending_rooms": len(self._pending),
+            "batches": emitted,
+            "messages": messages,
+            "batch_size_avg": round(messages / emitted, 2) if emitted else 0.0,
+            "batch_size_max": self.stats["batch_size_max"],
+            "delay_avg_ms": round(self.stats["delay_total_ms"] / messages, 2) if messages else 0.0,
+            "delay_max_ms": round(self.stats["delay_max_ms"], 2),
+        }
+
+
+def competition_room(competition_id) -> str:
+    return f"competition:{competition_id}"
+
+
+class CompetitionDeltaBatcher(RoomEmitWindow):
+    """
+    Deltas compactos das partidas de uma competição para a room `competition:{id}`.
+
+    Durante a janela, as alterações de cada partida são combinadas (o campo mais recente
+    vence, exceto quando traz uma `version` menor que a já agendada) e enviadas em um
+    único `competition_updated` com a lista de partidas alteradas e um número de sequência
+    por room. Placar, início e fim das partidas passam por aqui, de modo que um placar de
+    competição não precisa entrar na room de cada partida.
+
+    O `seq` é do processo e só serve para detectar perda de eventos de um mesmo nó; com a
+    fila do Socket.IO, a ordem entre nós é dada pela `version` de cada partida.
+    """
+
+    def __init__(self, server: socketio.AsyncServer, window_ms: int = COMPETITION_EMIT_COALESCE_MS):
+        super().__init__(server, "competition_updated", window_ms)
+        self._sequences: dict[str, int] = {}
+        self.stats["deltas"] = 0
+
+    def _merge(self, current: dict | None, payload: dict) -> dict:
+        current = current if current is not None else {}
+        match_id = payload["match_id"]
+        previous = current.get(match_id, {})
+        if "version" in payload and payload["version"] < previous.get("version", 0):
+            current[match_id] = {**payload, **previous}
+        else:
+            current[match_id] = {**previous, **payload}
+        return current
+
+    def _build(self, room: str, state: dict[str, dict]) -> dict:
+        seq = self._sequences.get(room, 0) + 1
+        self._sequences[room] = seq
+        self.stats["deltas"] += len(state)
+        return {
+            "competition_id": room.removeprefix("competition:"),
+            "seq": seq,
+            "matches": list(state.values()),
+        }
+
+    async def submit_delta(self, competition_id, match_id, **fields) -> None:
+        """
+        Agenda o delta `{match_id, **fields}` para a room da competição.
+        """
+        payload = {"match_id": str(match_id)}
+        payload.update(fields)
+        await self.submit(competition_room(competition_id), payload)
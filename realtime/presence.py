@@ -0,0 +1,155 @@
+import asyncio
+import os
+
+import socketio
+
+PRESENCE_BROADCAST_MS = int(os.getenv("PRESENCE_BROADCAST_MS", "2000"))
+# Máximo de `user_joined` individuais por room a cada intervalo de broadcast; 0 desativa
+PRESENCE_JOIN_NOTIFY_LIMIT = int(os.getenv("PRESENCE_JOIN_NOTIFY_LIMIT", "5"))
+
+# Custo aproximado, em bytes, de uma entrada além da chave (slot do dict, contador, índice por sid).
+_ENTRY_OVERHEAD = 150
+
+
+class RoomPresence:
+    """
+    Contagem de espectadores por room, deduplicada por usuário.
+
+    `join`/`leave` apenas atualizam contadores em memória e marcam a room como alterada;
+    um loop envia a cada `interval_ms` um único evento `presence` por room alterada com o
+    total de espectadores, em vez de um `user_joined` para cada entrada. Os avisos
+    individuais continuam para as primeiras `join_notify_limit` entradas de cada intervalo.
+
+    A contagem é do processo: com vários nós, cada um envia apenas aos próprios clientes
+    (`ignore_queue`) o número de espectadores conectados a ele.
+    """
+
+    def __init__(self,
+                 server: socketio.AsyncServer,
+                 interval_ms: int = PRESENCE_BROADCAST_MS,
+                 join_notify_limit: int = PRESENCE_JOIN_NOTIFY_LIMIT):
+        self.server = server
+        self.interval = interval_ms / 1000
+        self.join_notify_limit = join_notify_limit
+        # room -> {espectador: conexões}; a mesma pessoa em várias abas conta uma vez
+        self._rooms: dict[str, dict[str, int]] = {}
+        self._room_bytes: dict[str, int] = {}
+        # sid -> {room: espectador}, para limpar tudo no disconnect
+        self._sids: dict[str, dict[str, str]] = {}
+        self._dirty: set[str] = set()
+        self._notices: dict[str, int] = {}
+        self._task: asyncio.Task | None = None
+        self.stats = {
+            "joins": 0,
+            "leaves": 0,
+            "broadcasts": 0,
+            "join_notices": 0,
+            "join_notices_suppressed": 0,
+        }
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def join(self, sid: str, room: str, viewer: str) -> bool:
+        """
+        Registra o espectador na room. Retorna True quando um `user_joined` individual
+        deve ser enviado: primeira conexão do espectador e limite do intervalo não atingido.
+        """
+        rooms = self._sids.setdefault(sid, {})
+        if room in rooms:
+            return False
+
+        rooms[room] = viewer
+        viewers = self._rooms.setdefault(room, {})
+        connections = viewers.get(viewer, 0)
+        viewers[viewer] = connections + 1
+        self.stats["joins"] += 1
+
+        if connections:
+            return False
+
+        self._room_bytes[room] = self._room_bytes.get(room, 0) + len(viewer) + _ENTRY_OVERHEAD
+        self._dirty.add(room)
+
+        notices = self._notices.get(room, 0)
+        if notices >= self.join_notify_limit:
+            self.stats["join_notices_suppressed"] += 1
+            return False
+
+        self._notices[room] = notices + 1
+        self.stats["join_notices"] += 1
+        return True
+
+    def leave(self, sid: str) -> None:
+        """
+        Remove a conexão de todas as rooms em que entrou.
+        """
+        for room, viewer in self._sids.pop(sid, {}).items():
+            viewers = self._rooms.get(room)
+            if not viewers or viewer not in viewers:
+                continue
+
+            self.stats["leaves"] += 1
+            viewers[viewer] -= 1
+            if viewers[viewer] > 0:
+                continue
+
+            del viewers[viewer]
+            self._room_bytes[room] -= len(viewer) + _ENTRY_OVERHEAD
+            self._dirty.add(room)
+
+            if not viewers:
+                del self._rooms[room]
+                self._room_bytes.pop(room, None)
+                self._notices.pop(room, None)
+                # Ninguém resta na room para receber o broadcast
+                self._dirty.discard(room)
+
+    def count(self, room: str) -> int:
+        return len(self._rooms.get(room, ()))
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.broadcast()
+
+    async def broadcast(self) -> None:
+        """
+        Envia um `presence` para cada room alterada desde o último ciclo e reabre a
+        cota de `user_joined` individuais.
+        """
+        dirty, self._dirty = self._dirty, set()
+        self._notices.clear()
+
+        for room in dirty:
+            try:
+                await self.server.emit("presence", {"match_id": room, "viewers": self.count(room)},
+                                       room=room, ignore_queue=True)
+                self.stats["broadcasts"] += 1
+            except Exception as e:
+                print(f"ERRO: [presence] Falha ao emitir 'presence' para a room {room}: {e}")
+
+    def status(self) -> dict:
+        return {
+            **self.stats,
+            "interval_ms": int(self.interval * 1000),
+            "join_notify_limit": self.join_notify_limit,
+            "rooms": len(self._rooms),
+            "viewers": sum(len(viewers) for viewers in self._rooms.values()),
+            "connections": len(self._sids),
+            "max_room_viewers": max((len(viewers) for viewers in self._rooms.values()), default=0),
+            "bytes": sum(self._room_bytes.values()),
+            "max_room_bytes": max(self._room_bytes.values(), default=0),
+        }
@@ -0,0 +1,70 @@
+"""
+Benchmark da ingestão de partidas (mensagens `match_created`).
+
+Compara a gravação mensagem a mensagem com a gravação em lote usada pelo
+consumidor e imprime a vazão em partidas ingeridas por segundo.
+
+Uso:
+    SQLALCHEMY_DATABASE_URL=postgresql://... python -m scripts.bench_match_ingestion --matches 2000 --batch-size 100
+
+Com uma URL SQLite as tabelas são criadas automaticamente, o que permite rodar
+o benchmark localmente sem Postgres.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+import models  # noqa: F401  (registra os mapeamentos)
+from services.crud import create_match_comments_in_db, create_matches_in_db_batch
+from shared.database import Base, engine, async_engine
+
+
+def build_messages(total: int) -> list[dict]:
+    competition_id = str(uuid.uuid4())
+    return [
+        {
+            "match_id": str(uuid.uuid4()),
+            "competition_id": competition_id,
+            "team_home_id": str(uuid.uuid4()),
+            "team_away_id": str(uuid.uuid4()),
+            "status": "not-started",
+        }
+        for _ in range(total)
+    ]
+
+
+async def run_single(messages: list[dict]) -> float:
+    start = time.perf_counter()
+    for message in messages:
+        await create_match_comments_in_db(message)
+    return time.perf_counter() - start
+
+
+async def run_batched(messages: list[dict], batch_size: int) -> float:
+    start = time.perf_counter()
+    for i in range(0, len(messages), batch_size):
+        await create_matches_in_db_batch(messages[i:i + batch_size])
+    return time.perf_counter() - start
+
+
+async def main(total: int, batch_size: int) -> None:
+    single_elapsed = await run_single(build_messages(total))
+    batched_elapsed = await run_batched(build_messages(total), batch_size)
+    await async_engine.dispose()
+
+    print(f"\nPartidas por execução: {total}")
+    print(f"{'Uma mensagem por vez':<24}{total / single_elapsed:10.1f} partidas/s ({single_elapsed:.2f}s)")
+    print(f"{f'Lotes de {batch_size}':<24}{total / batched_elapsed:10.1f} partidas/s ({batched_elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--matches", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    if engine.dialect.name == "sqlite":
+        Base.metadata.create_all(engine)
+
+    asyncio.run(main(args.matches, args.batch_size))
@@ -0,0 +1,162 @@
+import os
+import uuid
+from datetime import timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import socket_manager
+from comments.models.comments import Comment
+from comments.schemas.comments import CommentResponse
+from messaging.audit_publisher import generate_log_payload, submit_audit_log
+from shared.http_cache import resource_versions
+from shared.invalidation_bus import invalidation_bus
+from shared.pagination import encode_cursor, decode_cursor
+from shared.singleflight import read_coalescer
+from shared.auth_utils import has_role
+
+# Janela antes do cursor `since` que é relida a cada sincronização (ver `list_match_comments`)
+COMMENTS_SYNC_MARGIN_MS = int(os.getenv("COMMENTS_SYNC_MARGIN_MS", "5000"))
+# Tamanho da página de scrollback e de sincronização quando `limit` não é informado
+COMMENTS_PAGE_SIZE = 50
+
+
+async def create_match_comment(db: AsyncSession,
+                               match_id: uuid.UUID,
+                               body: str,
+                               current_user: dict,
+                               request_object=None,
+                               ip_address: str | None = None) -> Comment:
+    """
+    Grava um comentário da partida, gera o log de auditoria e o transmite para a room.
+    Usado tanto pela rota HTTP quanto pelo evento `send_comment` do Socket.IO.
+    """
+    groups = current_user["groups"]
+
+    if not has_role(groups, "Organizador"):
+        raise HTTPException(
+            status_code=403,
+            detail="Você não tem permissão para criar um comentário."
+        )
+
+    comment = Comment(body=body, match_id=match_id)
+
+    db.add(comment)
+    await invalidation_bus.publish(db, "comments", match_id=match_id)
+    await db.commit()
+
+    comment_data = {
+        'match_id': str(comment.match_id),
+        'comment_id': str(comment.id),
+        'body': comment.body,
+        'created_at': comment.created_at.isoformat() if comment.created_at else None,
+    }
+
+    # Gera o de log de auditoria (comment.created)
+    log_payload = generate_log_payload(
+        event_type="comment.created",
+        service_origin="match_comments_service",
+        entity_type="comment",
+        entity_id=comment.id,
+        operation_type="CREATE",
+        campus_code=current_user.get("campus"),
+        user_registration=current_user.get("user_matricula"),
+        request_object=request_object,
+        new_data=comment_data,
+        ip_address=ip_address,
+    )
+
+    # Publica o log de auditoria
+    await submit_audit_log(log_payload)
+
+    await socket_manager.emit('create_comment', comment_data, room=str(comment.match_id))
+
+    return comment
+
+
+async def list_match_comments(db: AsyncSession,
+                              match_id: uuid.UUID,
+                              since: str | None,
+                              before: str | None,
+                              limit: int | None) -> tuple[list[CommentResponse], dict]:
+    """
+    Página de comentários e os cabeçalhos de cursor correspondentes. Leituras concorrentes
+    idênticas compartilham a mesma consulta. Usado pela rota de listagem e pelo snapshot
+    do `join_chat`.
+
+    - Sem `since`, `before` e `limit`: todos os comentários, em ordem cronológica.
+    - `limit`/`before` (scrollback): os mais recentes primeiro.
+    - `since` (sincronização): alterações após o cursor, em ordem de alteração.
+
+    O `updated_at` vem do relógio da aplicação: uma linha confirmada fora de ordem (ou de
+    um nó com o relógio atrasado) pode ficar atrás de um cursor já entregue. Por isso a
+    sincronização reenvia também as alterações dos `COMMENTS_SYNC_MARGIN_MS` anteriores ao
+    cursor, sem contá-las no `limit` nem avançar o cursor com elas; o cliente as aplica
+    pelo `id`. Atrasos maiores que a margem continuam podendo ser perdidos.
+    """
+    version = resource_versions.etag("comments", match_id)
+
+    async def load():
+        query = select(Comment).filter(Comment.match_id == match_id)  # type: ignore
+        headers = {}
+
+        if since:
+            since_at, since_id = decode_cursor(since)
+            page_size = limit or COMMENTS_PAGE_SIZE
+
+            changed = await db.execute(
+                query
+                .filter(tuple_(Comment.updated_at, Comment.id) > tuple_(since_at, since_id))
+                .order_by(Comment.updated_at.asc(), Comment.id.asc())
+                .limit(page_size)
+            )
+            recheck = await db.execute(
+                query
+                .filter(Comment.updated_at > since_at - timedelta(milliseconds=COMMENTS_SYNC_MARGIN_MS),
+                        tuple_(Comment.updated_at, Comment.id) <= tuple_(since_at, since_id))
+                .order_by(Comment.updated_at.asc(), Comment.id.asc())
+                .limit(page_size)
+            )
+            changed = [CommentResponse.model_validate(comment) for comment in changed.scalars().all()]
+            comments = [CommentResponse.model_validate(comment) for comment in recheck.scalars().all()] + changed
+
+            if changed:
+                headers["X-Sync-Cursor"] = encode_cursor(changed[-1].updated_at, changed[-1].id)
+            else:
+                headers["X-Sync-Cursor"] = since
+
+            return comments, headers
+
+        query = query.filter(Comment.deleted_at.is_(None))
+
+        if limit is None and before is None:
+            query = query.order_by(Comment.created_at.asc(), Comment.id.asc())
+        else:
+            if before:
+                query = query.filter(
+                    tuple_(Comment.created_at, Comment.id) < tuple_(*decode_cursor(before)))
+            query = query.order_by(Comment.created_at.desc(), Comment.id.desc()).limit(limit or COMMENTS_PAGE_SIZE)
+
+        result = await db.execute(query)
+        comments = [CommentResponse.model_validate(comment) for comment in result.scalars().all()]
+
+        if comments and (limit is not None or before is not None):
+            headers["X-Before-Cursor"] = encode_cursor(comments[-1].created_at, comments[-1].id)
+
+        if not before:
+            latest_change = await db.execute(
+                select(Comment.updated_at, Comment.id)
+                .filter(Comment.match_id == match_id)  # type: ignore
+                .order_by(Comment.updated_at.desc(), Comment.id.desc())
+                .limit(1)
+            )
+            latest = latest_change.first()
+
+            if latest:
+                headers["X-Sync-Cursor"] = encode_cursor(latest.updated_at, latest.id)
+
+        return comments, headers
+
+    return await read_coalescer.do(
+        ("comments", str(match_id), since, before, limit, version), load)
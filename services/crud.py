@@ -1,112 +1,168 @@
 import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from chats.models.chats import Chat
 from matches.models.matches import Match
-from shared.dependencies import get_db
+from shared.invalidation_bus import invalidation_bus
+from shared.dependencies import get_async_db
+
+# Tamanho da coluna `matches.status`
+MATCH_STATUS_MAX_LENGTH = 50
 
 
-def create_match_comments_in_db(message_data: dict) -> dict:
+def parse_match_message(message_data: dict) -> dict:
     """
-    Função síncrona para criar Match_Comments no banco de dados.
+    Valida a mensagem de criação de partida e retorna os valores prontos para o banco.
+    Lança ValueError se algum campo obrigatório estiver ausente ou inválido.
     """
-    db_gen = get_db()
-    db = next(db_gen)
+    match_id_str = message_data.get("match_id")
+    competition_id_str = message_data.get("competition_id")
+    team_home_id_str = message_data.get("team_home_id")
+    team_away_id_str = message_data.get("team_away_id")
+    status_str = message_data.get("status")
+
+    if not match_id_str:
+        raise ValueError("'match_id' é obrigatório na mensagem")
+    if not competition_id_str:
+        raise ValueError("'competition_id' é obrigatório na mensagem")
+    if not team_home_id_str:
+        raise ValueError("'team_home_id' é obrigatório na mensagem")
+    if not team_away_id_str:
+        raise ValueError("'team_away_id' é obrigatório na mensagem")
+    if not status_str or not isinstance(status_str, str):
+        raise ValueError("'status' é obrigatório na mensagem")
+    if len(status_str) > MATCH_STATUS_MAX_LENGTH:
+        raise ValueError(f"status '{status_str[:20]}...' excede {MATCH_STATUS_MAX_LENGTH} caracteres")
 
     try:
-        match_id_str = message_data.get("match_id")
-        competition_id_str = message_data.get("competition_id")
-        team_home_id_str = message_data.get("team_home_id")
-        team_away_id_str = message_data.get("team_away_id")
-        status_str = message_data.get("status")
-
-        if not match_id_str:
-            raise ValueError("'match_id' é obrigatório na mensagem")
-        if not competition_id_str:
-            raise ValueError("'competition_id' é obrigatório na mensagem")
-        if not team_home_id_str:
-            raise ValueError("'team_home_id' é obrigatório na mensagem")
-        if not team_away_id_str:
-            raise ValueError("'team_away_id' é obrigatório na mensagem")
+        match_id_for_db = uuid.UUID(match_id_str)
+    except ValueError:
+        raise ValueError(f"match_id'{match_id_str}' não é um UUID válido")
 
-        try:
-            match_id_for_db = uuid.UUID(match_id_str)
-        except ValueError:
-            raise ValueError(f"match_id'{match_id_str}' não é um UUID válido")
+    try:
+        competition_id_for_db = uuid.UUID(competition_id_str)
+    except ValueError:
+        raise ValueError(f"competition_id'{competition_id_str}' não é um UUID válido")
 
-        try:
-            competition_id_for_db = uuid.UUID(competition_id_str)
-        except ValueError:
-            raise ValueError(f"competition_id'{competition_id_str}' não é um UUID válido")
+    try:
+        team_home_id_for_db = uuid.UUID(team_home_id_str)
+    except ValueError:
+        raise ValueError(f"team_home_id '{team_home_id_str}' não é um UUID válido")
 
-        try:
-            team_home_id_for_db = uuid.UUID(team_home_id_str)
-        except ValueError:
-            raise ValueError(f"team_home_id '{team_home_id_str}' não é um UUID válido")
+    try:
+        team_away_id_for_db = uuid.UUID(team_away_id_str)
+    except ValueError:
+        raise ValueError(f"team_away_id '{team_away_id_str}' não é um UUID válido")
+
+    return {
+        "match_id": match_id_for_db,
+        "competition_id": competition_id_for_db,
+        "team_home_id": team_home_id_for_db,
+        "team_away_id": team_away_id_for_db,
+        "score_home": 0,
+        "score_away": 0,
+        "status": status_str,
+    }
+
+
+def _insert_for(db: AsyncSession):
+    """
+    Retorna o `insert` do dialeto em uso, que suporta `ON CONFLICT DO NOTHING`.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite_insert
+    return postgresql_insert
 
-        try:
-            team_away_id_for_db = uuid.UUID(team_away_id_str)
-        except ValueError:
-            raise ValueError(f"team_away_id '{team_away_id_str}' não é um UUID válido")
 
-        print(
-            f"DB_SYNC: Processando match para match_id: {match_id_for_db}, team_home_id: {team_home_id_for_db}, team_away_id: {team_away_id_for_db}, status: {status_str}")
+async def create_matches_in_db_batch(messages_data: list[dict]) -> list[dict]:
+    """
+    Cria, em uma única transação, as partidas e os chats de um lote de mensagens.
+
+    A inserção é idempotente (`INSERT ... ON CONFLICT DO NOTHING`): mensagens
+    repetidas ou reentregues não geram erro nem registros duplicados.
+    """
+    matches_by_id = {}
+    for message_data in messages_data:
+        match_row = parse_match_message(message_data)
+        matches_by_id.setdefault(match_row["match_id"], match_row)
 
+    match_rows = list(matches_by_id.values())
 
-        filters = [
-            Match.match_id == match_id_for_db,
-            Match.team_home_id == team_home_id_for_db,
-            Match.team_away_id == team_away_id_for_db,
+    if not match_rows:
+        return []
+
+    db_gen = get_async_db()
+    db = await anext(db_gen)
+
+    try:
+        insert = _insert_for(db)
+        now = datetime.now(timezone.utc)
+
+        print(f"DB_SYNC: Processando lote com {len(match_rows)} partida(s)...")
+
+        result = await db.execute(
+            insert(Match)
+            .values(match_rows)
+            .on_conflict_do_nothing(index_elements=["match_id"])
+            .returning(Match.match_id)
+        )
+        created_ids = set(result.scalars().all())
+
+        # Partidas novas só afetam as listagens (detalhes inexistentes não ficam em cache).
+        for competition_id in {row["competition_id"] for row in match_rows if row["match_id"] in created_ids}:
+            await invalidation_bus.publish(db, "competition", competition_id=competition_id)
+
+        chat_rows = [
+            {"id": uuid.uuid4(), "match_id": match_row["match_id"], "created_at": now}
+            for match_row in match_rows
         ]
 
-        existing_match: Match = db.query(Match).filter(*filters).first()
-
-        if existing_match:
-            print(
-                f"DB_SYNC: Partida já existe (ID: {existing_match.match_id}). Nenhuma nova partida será criada.")
-            return {
-                "message": "Partida já existente processada como duplicada.",
-                "request_id": existing_match.match_id
-            }
-
-        print(f"DB_SYNC: Criando nova partida...")
-
-        match_creation_data = {
-            "match_id": match_id_for_db,
-            "competition_id": competition_id_for_db,
-            "team_home_id": team_home_id_for_db,
-            "team_away_id": team_away_id_for_db,
-            "score_home": 0,
-            "score_away": 0,
-            "status": status_str,
-        }
-
-        new_match = Match(**match_creation_data)
-
-        db.add(new_match)
-        db.commit()
-        db.refresh(new_match)
-
-        chat = Chat(match_id=new_match.match_id)
-
-        db.add(chat)
-        db.commit()
-        db.refresh(chat)
-
-        print(f"DB_SYNC: Match ID {new_match.match_id}")
-
-        return {
-            "match_id": new_match.match_id,
-            "competition_id": new_match.competition_id,
-            "team_home_id": new_match.team_home_id,
-            "team_away_id": new_match.team_away_id,
-            "status": status_str,
-        }
+        await db.execute(
+            insert(Chat)
+            .values(chat_rows)
+            .on_conflict_do_nothing(index_elements=["match_id"])
+        )
+
+        await db.commit()
+
+        print(f"DB_SYNC: {len(created_ids)} partida(s) criada(s), {len(match_rows) - len(created_ids)} duplicada(s).")
+
+        results = []
+        for match_row in match_rows:
+            if match_row["match_id"] in created_ids:
+                results.append({
+                    "match_id": match_row["match_id"],
+                    "competition_id": match_row["competition_id"],
+                    "team_home_id": match_row["team_home_id"],
+                    "team_away_id": match_row["team_away_id"],
+                    "status": match_row["status"],
+                })
+            else:
+                results.append({
+                    "message": "Partida já existente processada como duplicada.",
+                    "request_id": match_row["match_id"]
+                })
+
+        return results
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"DB_SYNC: Erro ao criar request no banco: {e}")
         raise
     finally:
         try:
-            next(db_gen)
-        except StopIteration:
-            pass
\ No newline at end of file
+            await anext(db_gen)
+        except StopAsyncIteration:
+            pass
+
+
+async def create_match_comments_in_db(message_data: dict) -> dict:
+    """
+    Função assíncrona para criar Match_Comments no banco de dados.
+    """
+    results = await create_matches_in_db_batch([message_data])
+
+    return results[0]
\ No newline at end of file
@@ -0,0 +1,106 @@
+import os
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from matches.models.matches import Match
+from matches.schemas.matches import MatchResponse
+from shared.cache import TTLCache
+from shared.exceptions import NotFound
+from shared.http_cache import resource_versions
+from shared.invalidation_bus import invalidation_bus
+from shared.metrics import register_status_provider
+from shared.singleflight import read_coalescer
+
+# Cache de leitura das partidas (detalhes e páginas de listagem por competição).
+# Com MATCH_CACHE_TTL=0 o cache fica desativado.
+MATCH_CACHE_TTL = float(os.getenv("MATCH_CACHE_TTL", "5"))
+MATCH_CACHE_MAX_SIZE = int(os.getenv("MATCH_CACHE_MAX_SIZE", "2000"))
+MATCH_LIST_CACHE_MAX_SIZE = int(os.getenv("MATCH_LIST_CACHE_MAX_SIZE", "500"))
+
+match_cache = TTLCache("match_details", MATCH_CACHE_MAX_SIZE, MATCH_CACHE_TTL)
+match_list_cache = TTLCache("match_listings", MATCH_LIST_CACHE_MAX_SIZE, MATCH_CACHE_TTL)
+
+register_status_provider("match_cache", match_cache.status)
+register_status_provider("match_list_cache", match_list_cache.status)
+
+
+def invalidate_match(match_id: uuid.UUID | str, competition_id: uuid.UUID | str | None = None) -> None:
+    """
+    Remove do cache os detalhes da partida e as páginas da competição a que ela pertence.
+    Chamada pelo barramento de invalidação após o commit de qualquer escrita na partida.
+    """
+    match_cache.invalidate(str(match_id))
+
+    if competition_id is not None:
+        match_list_cache.invalidate_group(str(competition_id))
+
+
+async def read_match(db: AsyncSession, match_id: uuid.UUID) -> MatchResponse:
+    """
+    Detalhes da partida via cache, agrupando leituras concorrentes da mesma partida.
+    Usado pela rota de detalhes e pelo snapshot do `join_chat`.
+    """
+    version = resource_versions.etag("match", match_id)
+
+    cached = match_cache.get(str(match_id))
+    if cached is not None:
+        return cached
+
+    async def load():
+        generation = match_cache.generation
+        result = await db.execute(select(Match).filter(
+            Match.match_id == match_id))  # type: ignore
+        match: Match = result.scalars().first()
+
+        if not match:
+            raise NotFound("Partida")
+
+        match_response = MatchResponse.model_validate(match)
+        match_cache.set(str(match_id), match_response, generation=generation)
+        return match_response
+
+    return await read_coalescer.do(("match_details", str(match_id), version), load)
+
+
+async def list_competition_matches(db: AsyncSession,
+                                   competition_id: uuid.UUID,
+                                   limit: int,
+                                   offset: int) -> list[MatchResponse]:
+    """
+    Partidas da competição ("em progresso" primeiro, depois por data de início) via cache,
+    agrupando leituras concorrentes. Usado pela listagem e pelo ack do `join_competition`.
+    """
+    version = resource_versions.etag("competition", competition_id)
+
+    cache_key = (str(competition_id), limit, offset)
+    cached = match_list_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    async def load():
+        generation = match_list_cache.generation
+        query = select(Match).filter(Match.competition_id == competition_id)
+        query = query.order_by(
+            (Match.status == "in-progress").desc(),
+            Match.start_time.asc()
+        )
+
+        result = await db.execute(query.offset(offset).limit(limit))
+        matches = [MatchResponse.model_validate(match) for match in result.scalars().all()]
+        match_list_cache.set(cache_key, matches, group=str(competition_id), generation=generation)
+        return matches
+
+    return await read_coalescer.do(("matches",) + cache_key + (version,), load)
+
+
+def clear_match_caches() -> None:
+    match_cache.clear()
+    match_list_cache.clear()
+
+
+# Escritas locais (após o commit) e de outras réplicas/worker chegam pelo barramento de invalidação.
+invalidation_bus.subscribe("match", lambda ids: invalidate_match(ids["match_id"], ids.get("competition_id")))
+invalidation_bus.subscribe("competition", lambda ids: match_list_cache.invalidate_group(ids["competition_id"]))
+invalidation_bus.subscribe_reset(clear_match_caches)
\ No newline at end of file
@@ -0,0 +1,414 @@
+import asyncio
+import glob
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import TextIO
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem lock entre processos
+    fcntl = None
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from chats.models.chats import Chat
+from chats.models.messages import Message
+from services.crud import _insert_for
+from shared.database import AsyncSessionLocal
+from shared.invalidation_bus import NODE_ID, invalidation_bus
+from shared.metrics import register_status_provider
+
+# "sync" grava cada mensagem na própria requisição; "write-behind" responde e transmite
+# imediatamente e grava as mensagens em lote, em segundo plano.
+CHAT_WRITE_MODE = os.getenv("CHAT_WRITE_MODE", "sync").lower()
+CHAT_WRITE_BATCH_SIZE = int(os.getenv("CHAT_WRITE_BATCH_SIZE", "500"))
+CHAT_WRITE_FLUSH_MS = int(os.getenv("CHAT_WRITE_FLUSH_MS", "100"))
+CHAT_WRITE_MAX_PENDING = int(os.getenv("CHAT_WRITE_MAX_PENDING", "20000"))
+# "memory": mensagens pendentes se perdem se o processo cair;
+# "journal": cada mensagem é anexada a um arquivo antes da resposta (sobrevive a queda do processo);
+# "fsync": como "journal", com fsync por mensagem (sobrevive a queda da máquina, mais lento).
+CHAT_WRITE_DURABILITY = os.getenv("CHAT_WRITE_DURABILITY", "journal").lower()
+CHAT_WRITE_JOURNAL_PATH = os.getenv("CHAT_WRITE_JOURNAL_PATH", "chat_write_journal.jsonl")
+
+
+def message_to_row(message: Message) -> dict:
+    return {
+        "id": message.id,
+        "chat_id": message.chat_id,
+        "user_id": message.user_id,
+        "body": message.body,
+        "created_at": message.created_at,
+    }
+
+
+class MessageJournal:
+    """
+    Journal em arquivo das mensagens ainda não gravadas no banco.
+
+    Cada processo escreve nos próprios segmentos (`{path}.{owner}.{n}`, com `owner` único
+    por processo) e mantém um lock exclusivo (`flock`) em cada um até apagá-lo. As
+    mensagens são anexadas ao segmento atual; a cada flush o segmento é selado e um novo é
+    aberto, e os segmentos selados são apagados quando o flush que os contém é confirmado.
+
+    Na inicialização, são reaplicados apenas os segmentos cujo lock pode ser obtido, ou
+    seja, os de processos que já terminaram (a inserção é idempotente pelo `id` da
+    mensagem). Segmentos de outros workers em execução no mesmo diretório são ignorados.
+    """
+
+    def __init__(self, path: str, fsync: bool = False, owner: str = NODE_ID):
+        self.path = path
+        self.fsync = fsync
+        self.owner = owner.replace(os.sep, "_")
+        self._sequence = 0
+        self._file = None
+        # Segmentos selados (próprios ou herdados de processos encerrados), ainda travados
+        self._sealed: list[tuple[str, TextIO]] = []
+
+    def _segment_path(self, sequence: int) -> str:
+        return f"{self.path}.{self.owner}.{sequence}"
+
+    def _parse_segment(self, segment: str) -> tuple[str, int] | None:
+        owner, _, sequence = segment[len(self.path) + 1:].rpartition(".")
+        if not owner or not sequence.isdigit():
+            return None
+        return owner, int(sequence)
+
+    def existing_segments(self) -> list[str]:
+        return [segment for segment in glob.glob(f"{self.path}.*") if self._parse_segment(segment)]
+
+    @staticmethod
+    def _try_lock(f: TextIO) -> bool:
+        if fcntl is None:
+            return True
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    def _open_segment(self, sequence: int) -> TextIO:
+        # Cria e trava com um nome temporário antes de expor o segmento, para que outro
+        # processo em recuperação nunca o veja sem lock.
+        final = self._segment_path(sequence)
+        temporary = f"{final}.tmp"
+        f = open(temporary, "a", encoding="utf-8")
+        if not self._try_lock(f):
+            f.close()
+            raise RuntimeError(f"Segmento do journal em uso por outro processo: {temporary}")
+        os.replace(temporary, final)
+        return f
+
+    def open(self) -> None:
+        self._sealed = []
+        own_sequences = []
+
+        for segment in self.existing_segments():
+            owner, sequence = self._parse_segment(segment)
+            if owner == self.owner:
+                own_sequences.append(sequence)
+
+            try:
+                f = open(segment, encoding="utf-8")
+            except FileNotFoundError:
+                continue
+
+            if self._try_lock(f):
+                self._sealed.append((segment, f))
+            else:
+                # Segmento de outro processo em execução
+                f.close()
+
+        self._sealed.sort(key=lambda item: (self._parse_segment(item[0])[1], item[0]))
+        self._sequence = max(own_sequences) + 1 if own_sequences else 0
+        self._file = self._open_segment(self._sequence)
+
+    def read_rows(self) -> list[dict]:
+        rows = []
+        for segment, _ in self._sealed:
+            with open(segment, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        data = json.loads(line)
+                    except ValueError:
+                        # Última linha incompleta de uma queda durante a escrita.
+                        continue
+                    rows.append({
+                        "id": uuid.UUID(data["id"]),
+                        "chat_id": uuid.UUID(data["chat_id"]),
+                        "user_id": data["user_id"],
+                        "body": data["body"],
+                        "created_at": datetime.fromisoformat(data["created_at"]),
+                    })
+        return rows
+
+    async def append(self, row: dict) -> None:
+        line = json.dumps({
+            "id": str(row["id"]),
+            "chat_id": str(row["chat_id"]),
+            "user_id": row["user_id"],
+            "body": row["body"],
+            "created_at": row["created_at"].isoformat(),
+        }) + "\n"
+        self._file.write(line)
+        self._file.flush()
+
+        if self.fsync:
+            await asyncio.to_thread(os.fsync, self._file.fileno())
+
+    def rotate(self) -> None:
+        # O segmento selado continua aberto (e travado) até ser apagado
+        self._file.flush()
+        self._sealed.append((self._segment_path(self._sequence), self._file))
+        self._sequence += 1
+        self._file = self._open_segment(self._sequence)
+
+    def release_sealed(self) -> None:
+        for segment, f in self._sealed:
+            # Apaga antes de soltar o lock, para que nenhum outro processo o reaplique
+            try:
+                os.remove(segment)
+            except FileNotFoundError:
+                pass
+            f.close()
+        self._sealed = []
+
+    def close(self) -> None:
+        if self._file is not None:
+            if self._file.tell() == 0:
+                # Segmento atual vazio: nada a reaplicar na próxima inicialização
+                os.remove(self._segment_path(self._sequence))
+            self._file.close()
+            self._file = None
+        for _, f in self._sealed:
+            f.close()
+        self._sealed = []
+
+    def size_bytes(self) -> int:
+        own = [segment for segment, _ in self._sealed] + [self._segment_path(self._sequence)]
+        return sum(os.path.getsize(p) for p in own if os.path.exists(p))
+
+
+class MessageWriteBuffer:
+    """
+    Buffer write-behind das mensagens de chat.
+
+    `submit()` guarda a mensagem (já com id e created_at gerados no servidor) e retorna
+    sem esperar o banco; uma tarefa em segundo plano grava o buffer em lote
+    (`executemany`, `ON CONFLICT DO NOTHING`) ao atingir `batch_size` mensagens ou a cada
+    `flush_ms`. Falhas mantêm as mensagens no buffer para a próxima tentativa; mensagens
+    de chats removidos nesse intervalo (partida finalizada) são descartadas.
+
+    Com o buffer cheio (banco indisponível por muito tempo), novas mensagens recebem 503.
+
+    Com vários nós em write-behind, as linhas de nós diferentes são confirmadas fora da
+    ordem de `created_at` (até `flush_ms` de atraso, mais o tempo do flush). Uma leitura
+    com cursor `after` (ou o `messages_after` do `join_chat`) feita nesse intervalo pode
+    avançar além de uma mensagem ainda não gravada por outro nó e nunca recebê-la; a
+    entrega completa fica por conta do broadcast em tempo real. Quem precisa de retomada
+    sem lacunas deve usar o modo "sync".
+    """
+
+    def __init__(self,
+                 mode: str = CHAT_WRITE_MODE,
+                 batch_size: int = CHAT_WRITE_BATCH_SIZE,
+                 flush_ms: int = CHAT_WRITE_FLUSH_MS,
+                 max_pending: int = CHAT_WRITE_MAX_PENDING,
+                 durability: str = CHAT_WRITE_DURABILITY,
+                 journal_path: str = CHAT_WRITE_JOURNAL_PATH):
+        self.enabled = mode == "write-behind"
+        self.batch_size = batch_size
+        self.flush_interval = flush_ms / 1000
+        self.max_pending = max_pending
+        self.durability = durability
+        self.journal = MessageJournal(journal_path, fsync=durability == "fsync") \
+            if durability in ("journal", "fsync") else None
+        self._pending: list[dict] = []
+        self._flush_lock = asyncio.Lock()
+        self._wake_event = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.stats = {
+            "submitted": 0,
+            "rejected_full": 0,
+            "written": 0,
+            "dropped_orphaned": 0,
+            "dropped_invalid": 0,
+            "recovered": 0,
+            "batches": 0,
+            "failed_flushes": 0,
+            "flush_ms_last": None,
+            "flush_ms_max": 0.0,
+        }
+
+    async def start(self) -> None:
+        if not self.enabled or (self._task is not None and not self._task.done()):
+            return
+
+        self._flush_lock = asyncio.Lock()
+        self._wake_event = asyncio.Event()
+
+        if self.journal is not None:
+            self.journal.open()
+            recovered = self.journal.read_rows()
+            if recovered:
+                print(f"INFO: [chat_write] Reaplicando {len(recovered)} mensagem(ns) do journal.")
+                self._pending = recovered + self._pending
+                self.stats["recovered"] += len(recovered)
+            else:
+                self.journal.release_sealed()
+
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        # Espera o flush em andamento terminar antes de cancelar o loop
+        async with self._flush_lock:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        await self.flush()
+        if self._pending:
+            where = "no journal" if self.journal is not None else "em memória e serão perdidas"
+            print(f"CRITICAL: [chat_write] Encerramento com {len(self._pending)} mensagem(ns) pendente(s) {where}.")
+
+        if self.journal is not None:
+            self.journal.close()
+
+    async def submit(self, message: Message) -> None:
+        if len(self._pending) >= self.max_pending:
+            self.stats["rejected_full"] += 1
+            self._wake_event.set()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="O chat está temporariamente indisponível. Tente novamente em instantes.",
+                headers={"Retry-After": "1"},
+            )
+
+        row = message_to_row(message)
+        if self.journal is not None:
+            await self.journal.append(row)
+
+        self._pending.append(row)
+        self.stats["submitted"] += 1
+
+        if len(self._pending) >= self.batch_size:
+            self._wake_event.set()
+
+    def pending_for(self, chat_id: uuid.UUID) -> list[dict]:
+        """
+        Mensagens do chat aceitas mas ainda não gravadas (para leituras do próprio nó).
+        """
+        return [row for row in self._pending if row["chat_id"] == chat_id]
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake_event.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake_event.clear()
+
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"ERRO: [chat_write] Falha inesperada no flush: {e}")
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if not self._pending:
+                return
+
+            if self.journal is not None:
+                self.journal.rotate()
+
+            rows, self._pending = self._pending, []
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+
+            try:
+                await self._write(rows)
+            except asyncio.CancelledError:
+                # Reinserir é seguro: a gravação usa ON CONFLICT DO NOTHING
+                self._pending = rows + self._pending
+                raise
+            except Exception as e:
+                self._pending = rows + self._pending
+                self.stats["failed_flushes"] += 1
+                print(f"ERRO: [chat_write] Falha ao gravar {len(rows)} mensagem(ns); nova tentativa no próximo ciclo: {e}")
+                return
+
+            if self.journal is not None:
+                self.journal.release_sealed()
+
+            elapsed_ms = round((loop.time() - started) * 1000, 2)
+            self.stats["batches"] += 1
+            self.stats["flush_ms_last"] = elapsed_ms
+            self.stats["flush_ms_max"] = max(self.stats["flush_ms_max"], elapsed_ms)
+
+    async def _write(self, rows: list[dict]) -> None:
+        try:
+            await self._insert(rows)
+        except IntegrityError:
+            # Algum chat foi removido (partida finalizada) depois que a mensagem foi aceita.
+            async with AsyncSessionLocal() as db:
+                chat_ids = {row["chat_id"] for row in rows}
+                result = await db.execute(select(Chat.id).filter(Chat.id.in_(chat_ids)))  # type: ignore
+                existing = set(result.scalars().all())
+
+            kept = [row for row in rows if row["chat_id"] in existing]
+            self.stats["dropped_orphaned"] += len(rows) - len(kept)
+            print(f"AVISO: [chat_write] {len(rows) - len(kept)} mensagem(ns) de chats encerrados descartada(s).")
+
+            if not kept:
+                return
+
+            try:
+                await self._insert(kept)
+            except IntegrityError:
+                # Isola as linhas inválidas para que não bloqueiem o buffer indefinidamente.
+                for row in kept:
+                    try:
+                        await self._insert([row])
+                    except IntegrityError as e:
+                        self.stats["dropped_invalid"] += 1
+                        print(f"ERRO: [chat_write] Mensagem {row['id']} descartada: {e}")
+
+    async def _insert(self, rows: list[dict]) -> None:
+        async with AsyncSessionLocal() as db:
+            insert = _insert_for(db)
+            statement = insert(Message).on_conflict_do_nothing(index_elements=["id"])
+
+            for start in range(0, len(rows), self.batch_size):
+                await db.execute(statement, rows[start:start + self.batch_size])
+
+            for chat_id in {row["chat_id"] for row in rows}:
+                await invalidation_bus.publish(db, "messages", chat_id=chat_id)
+
+            await db.commit()
+
+        self.stats["written"] += len(rows)
+
+    def status(self) -> dict:
+        return {
+            **self.stats,
+            "mode": "write-behind" if self.enabled else "sync",
+            "durability": self.durability if self.enabled else None,
+            "pending": len(self._pending),
+            "journal_bytes": self.journal.size_bytes() if self.enabled and self.journal is not None else None,
+        }
+
+
+message_buffer = MessageWriteBuffer()
+
+register_status_provider("chat_write", message_buffer.status)
\ No newline at end of file
@@ -0,0 +1,150 @@
+import uuid
+from datetime import datetime, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import message_broadcaster
+from chats.models.chats import Chat
+from chats.models.messages import Message
+from chats.schemas.chats import ChatResponse
+from chats.schemas.messages import MessageResponse
+from services.message_buffer import message_buffer
+from services.recent_messages import recent_messages
+from shared.auth_utils import has_role
+from shared.exceptions import NotFound
+from shared.http_cache import resource_versions
+from shared.invalidation_bus import invalidation_bus
+from shared.pagination import decode_cursor
+from shared.singleflight import read_coalescer
+
+
+async def create_chat_message(db: AsyncSession,
+                              chat_id: uuid.UUID,
+                              body: str,
+                              current_user: dict,
+                              admission: dict) -> Message:
+    """
+    Grava uma mensagem de chat e a transmite para a room da partida.
+    Usado tanto pela rota HTTP quanto pelo evento `send_message` do Socket.IO.
+
+    No modo write-behind (`CHAT_WRITE_MODE`), id e created_at são gerados aqui e a
+    mensagem vai para o buffer de gravação em lote em vez de ser gravada na requisição.
+    """
+    groups = current_user["groups"]
+    user_id = current_user["user_matricula"]
+
+    if not has_role(groups, "Organizador", "Jogador"):
+        raise HTTPException(
+            status_code=403,
+            detail="Você não tem permissão para criar uma mensagem."
+        )
+
+    message = Message(id=uuid.uuid4(), body=body, chat_id=chat_id, user_id=user_id,
+                      created_at=datetime.now(timezone.utc))
+
+    result = await db.execute(select(Chat).filter(
+        Chat.id == chat_id, Chat.finished_at.is_(None)))  # type: ignore
+    chat: Chat = result.scalars().first()
+
+    if not chat:
+        raise NotFound("Chat")
+
+    if message_buffer.enabled:
+        await message_buffer.submit(message)
+    else:
+        db.add(message)
+        await invalidation_bus.publish(db, "messages", chat_id=chat_id)
+        await db.commit()
+
+    recent_messages.add(message)
+    if message_buffer.enabled:
+        # O flush só avança a versão depois de gravar; a mensagem já é servida pela memória
+        resource_versions.bump("messages", chat_id)
+
+    message_data = {
+        'chat_id': str(message.chat_id),
+        'message_id': str(message.id),
+        'body': message.body,
+        'user_id': message.user_id,
+        'created_at': message.created_at.isoformat() if message.created_at else None,
+    }
+
+    if admission["broadcast"]:
+        await message_broadcaster.submit(str(chat.match_id), message_data)
+
+    return message
+
+
+async def read_chat_for_match(db: AsyncSession, match_id: uuid.UUID) -> ChatResponse:
+    """
+    Chat da partida, agrupando leituras concorrentes. Lança NotFound se não existir.
+    """
+    version = resource_versions.etag("chat", match_id)
+
+    async def load():
+        result = await db.execute(select(Chat).filter(
+            Chat.match_id == match_id))  # type: ignore
+        chat: Chat = result.scalars().first()
+
+        if not chat:
+            raise NotFound("Chat")
+
+        return ChatResponse.model_validate(chat)
+
+    return await read_coalescer.do(("chat", str(match_id), version), load)
+
+
+async def list_chat_messages(db: AsyncSession,
+                             chat_id: uuid.UUID,
+                             before: str | None,
+                             after: str | None,
+                             limit: int) -> list[MessageResponse]:
+    """
+    Página de mensagens em ordem cronológica, servida pelo anel de mensagens recentes
+    quando possível. Usado pela rota de listagem e pelo snapshot do `join_chat`.
+    """
+    version = resource_versions.etag("messages", chat_id)
+    before_key = decode_cursor(before) if before else None
+    after_key = decode_cursor(after) if after else None
+
+    messages = recent_messages.read(chat_id, before_key, after_key, limit)
+
+    if messages is None:
+        async def load():
+            result = await db.execute(select(Chat).filter(
+                Chat.id == chat_id, Chat.finished_at.is_(None)))  # type: ignore
+            chat: Chat = result.scalars().first()
+
+            if not chat:
+                raise NotFound("Chat")
+
+            await recent_messages.load(db, chat.id)
+            cached = recent_messages.read(chat.id, before_key, after_key, limit)
+            if cached is not None:
+                return cached
+
+            sort_key = tuple_(Message.created_at, Message.id)
+            query = select(Message).filter(Message.chat_id == chat.id)  # type: ignore
+
+            if after_key:
+                query = query.filter(sort_key > tuple_(*after_key))
+                query = query.order_by(Message.created_at.asc(), Message.id.asc())
+            else:
+                if before_key:
+                    query = query.filter(sort_key < tuple_(*before_key))
+                query = query.order_by(Message.created_at.desc(), Message.id.desc())
+
+            result = await db.execute(query.limit(limit))
+            page = [MessageResponse.model_validate(message) for message in result.scalars().all()]
+
+            if not after_key:
+                page.reverse()
+
+            return page
+
+        messages = await read_coalescer.do(
+            ("messages", str(chat_id), before, after, limit, version), load)
+
+    return messages
\ No newline at end of file
@@ -0,0 +1,219 @@
+import os
+import uuid
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from chats.models.messages import Message
+from chats.schemas.messages import MessageResponse
+from services.message_buffer import message_buffer
+from shared.invalidation_bus import invalidation_bus
+from shared.metrics import register_status_provider
+
+RECENT_MESSAGES_PER_CHAT = int(os.getenv("RECENT_MESSAGES_PER_CHAT", "200"))
+RECENT_MESSAGES_MAX_BYTES_PER_CHAT = int(os.getenv("RECENT_MESSAGES_MAX_BYTES_PER_CHAT", "65536"))
+RECENT_MESSAGES_MAX_CHATS = int(os.getenv("RECENT_MESSAGES_MAX_CHATS", "1000"))
+
+# Custo aproximado, em bytes, de uma entrada além do texto (tupla, UUID, datetime).
+_ENTRY_OVERHEAD = 200
+
+
+def _sort_key(created_at: datetime, message_id: uuid.UUID) -> tuple[datetime, uuid.UUID]:
+    # SQLite devolve datetimes sem fuso; o servidor sempre grava em UTC.
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return created_at, message_id
+
+
+class ChatRing:
+    """
+    Últimas mensagens de um chat, em ordem cronológica, como tuplas compactas
+    `(chave, user_id, body, created_at)`. `complete` indica que não existem mensagens
+    mais antigas que as do anel, ou seja, o chat inteiro cabe nele.
+    """
+
+    def __init__(self, chat_id: uuid.UUID, max_messages: int, max_bytes: int):
+        self.chat_id = chat_id
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.complete = True
+        self.bytes = 0
+        self._keys: list[tuple] = []
+        self._entries: list[tuple] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, message_id: uuid.UUID, user_id: str, body: str, created_at: datetime) -> None:
+        key = _sort_key(created_at, message_id)
+        index = bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            return
+
+        self._keys.insert(index, key)
+        self._entries.insert(index, (key, user_id, body, created_at))
+        self.bytes += len(body.encode()) + len(user_id) + _ENTRY_OVERHEAD
+
+        while self._entries and (len(self._entries) > self.max_messages or self.bytes > self.max_bytes):
+            _, old_user_id, old_body, _ = self._entries.pop(0)
+            self._keys.pop(0)
+            self.bytes -= len(old_body.encode()) + len(old_user_id) + _ENTRY_OVERHEAD
+            self.complete = False
+
+    def read(self, before: tuple | None, after: tuple | None, limit: int) -> list[MessageResponse] | None:
+        """
+        Retorna a página pedida ou None se o anel não garante a página completa
+        (a consulta deve ir ao banco).
+        """
+        if after:
+            after = _sort_key(*after)
+            if not self.complete and (not self._keys or after < self._keys[0]):
+                return None
+            start = bisect_right(self._keys, after)
+            page = self._entries[start:start + limit]
+        elif before:
+            end = bisect_left(self._keys, _sort_key(*before))
+            if end < limit and not self.complete:
+                return None
+            page = self._entries[max(0, end - limit):end]
+        else:
+            if len(self._entries) < limit and not self.complete:
+                return None
+            page = self._entries[-limit:]
+
+        return [
+            MessageResponse(id=key[1], chat_id=self.chat_id, user_id=user_id, body=body, created_at=created_at)
+            for key, user_id, body, created_at in page
+        ]
+
+
+class RecentMessages:
+    """
+    Anéis de mensagens recentes dos chats ativos, para que leituras do final do histórico
+    (`get_messages`, entrada no chat) não consultem o banco.
+
+    O anel é carregado do banco no primeiro acesso e mantido por `add()` a cada mensagem
+    criada neste nó. Mensagens criadas em outros nós chegam pelo barramento de invalidação
+    e descartam o anel, recarregado no próximo acesso. Os chats menos acessados saem por
+    LRU e os de partidas finalizadas são removidos com `evict()`.
+    """
+
+    def __init__(self,
+                 max_messages: int = RECENT_MESSAGES_PER_CHAT,
+                 max_bytes: int = RECENT_MESSAGES_MAX_BYTES_PER_CHAT,
+                 max_chats: int = RECENT_MESSAGES_MAX_CHATS):
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.max_chats = max_chats
+        self._rings: OrderedDict[uuid.UUID, ChatRing] = OrderedDict()
+        self._loading: dict[uuid.UUID, list[tuple]] = {}
+        # Chats invalidados durante a própria carga: o resultado da consulta já está velho
+        self._stale_loads: set[uuid.UUID] = set()
+        self.stats = {"hits": 0, "misses": 0, "loads": 0, "evictions": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_messages > 0 and self.max_chats > 0
+
+    def read(self, chat_id: uuid.UUID, before: tuple | None, after: tuple | None,
+             limit: int) -> list[MessageResponse] | None:
+        ring = self._rings.get(chat_id)
+        page = ring.read(before, after, limit) if ring is not None else None
+
+        if page is None:
+            self.stats["misses"] += 1
+            return None
+
+        self._rings.move_to_end(chat_id)
+        self.stats["hits"] += 1
+        return page
+
+    def add(self, message: Message) -> None:
+        entry = (message.id, message.user_id, message.body, message.created_at)
+
+        if message.chat_id in self._loading:
+            self._loading[message.chat_id].append(entry)
+
+        ring = self._rings.get(message.chat_id)
+        if ring is not None:
+            ring.add(*entry)
+
+    async def load(self, db: AsyncSession, chat_id: uuid.UUID) -> None:
+        """
+        Carrega o anel a partir do banco (e do buffer write-behind, se ativo).
+        Mensagens criadas durante a consulta são incorporadas ao final.
+        """
+        if not self.enabled or chat_id in self._rings or chat_id in self._loading:
+            return
+
+        self._loading[chat_id] = []
+        try:
+            result = await db.execute(
+                select(Message.id, Message.user_id, Message.body, Message.created_at)
+                .filter(Message.chat_id == chat_id)  # type: ignore
+                .order_by(Message.created_at.desc(), Message.id.desc())
+                .limit(self.max_messages + 1)
+            )
+            rows = result.all()
+        except BaseException:
+            del self._loading[chat_id]
+            self._stale_loads.discard(chat_id)
+            raise
+
+        if chat_id in self._stale_loads:
+            self._stale_loads.discard(chat_id)
+            del self._loading[chat_id]
+            return
+
+        ring = ChatRing(chat_id, self.max_messages, self.max_bytes)
+        # Uma linha a mais que a capacidade faz o anel descartá-la e marcar `complete=False`.
+        for row in reversed(rows):
+            ring.add(row.id, row.user_id, row.body, row.created_at)
+
+        for row in message_buffer.pending_for(chat_id):
+            ring.add(row["id"], row["user_id"], row["body"], row["created_at"])
+        for entry in self._loading.pop(chat_id):
+            ring.add(*entry)
+
+        self._rings[chat_id] = ring
+        self.stats["loads"] += 1
+
+        while len(self._rings) > self.max_chats:
+            self._rings.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def evict(self, chat_id: uuid.UUID | str) -> None:
+        chat_id = uuid.UUID(str(chat_id))
+        if chat_id in self._loading:
+            self._stale_loads.add(chat_id)
+        if self._rings.pop(chat_id, None) is not None:
+            self.stats["evictions"] += 1
+
+    def clear(self) -> None:
+        self._rings.clear()
+        self._stale_loads.update(self._loading)
+
+    def status(self) -> dict:
+        total_bytes = sum(ring.bytes for ring in self._rings.values())
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "chats": len(self._rings),
+            "messages": sum(len(ring) for ring in self._rings.values()),
+            "bytes": total_bytes,
+            "max_chat_bytes": max((ring.bytes for ring in self._rings.values()), default=0),
+            "max_bytes_per_chat": self.max_bytes,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else None,
+        }
+
+
+recent_messages = RecentMessages()
+
+register_status_provider("recent_messages", recent_messages.status)
+
+# Mensagens de outros nós (ou chat encerrado por outro nó) invalidam o anel local.
+invalidation_bus.subscribe("messages", lambda ids: recent_messages.evict(ids["chat_id"]), remote_only=True)
+invalidation_bus.subscribe_reset(recent_messages.clear)
\ No newline at end of file
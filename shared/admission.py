@@ -0,0 +1,216 @@
+import math
+import os
+import random
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from fastapi import Depends, HTTPException, status
+
+from auth import get_current_user
+from shared.auth_utils import has_role
+from shared.metrics import register_status_provider
+
+CHAT_ROOM_RATE = float(os.getenv("CHAT_ROOM_RATE", "20"))
+CHAT_ROOM_BURST = float(os.getenv("CHAT_ROOM_BURST", "40"))
+CHAT_USER_RATE = float(os.getenv("CHAT_USER_RATE", "1"))
+CHAT_USER_BURST = float(os.getenv("CHAT_USER_BURST", "5"))
+CHAT_MAX_IN_FLIGHT = int(os.getenv("CHAT_MAX_IN_FLIGHT", "200"))
+CHAT_DEGRADED_SECONDS = float(os.getenv("CHAT_DEGRADED_SECONDS", "10"))
+CHAT_SHED_MODE = os.getenv("CHAT_SHED_MODE", "reject")  # "reject" ou "sample"
+# Fração das mensagens de uma room degradada que passa por completo (aceita e transmitida)
+CHAT_SAMPLE_RATE = float(os.getenv("CHAT_SAMPLE_RATE", "0.2"))
+CHAT_ADMISSION_MAX_KEYS = int(os.getenv("CHAT_ADMISSION_MAX_KEYS", "50000"))
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated_at")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = now
+
+    def take(self, now: float) -> float:
+        """
+        Consome um token. Retorna 0 se havia token disponível ou, caso contrário,
+        quantos segundos faltam para o próximo.
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+
+        return (1 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """
+    Controle de admissão para o envio de mensagens de chat.
+
+    Cada room e cada usuário têm um token bucket, e há um limite global de
+    requisições em andamento. Quando uma room estoura seu orçamento, o excedente é
+    descartado (modo `reject`: 429 com `Retry-After`) ou gravado sem broadcast garantido
+    (modo `sample`), e a room entra em modo degradado até `degraded_seconds` após o último
+    estouro. Enquanto degradada, mesmo com orçamento disponível, só uma amostra
+    (`sample_rate`) das mensagens passa por completo: no modo `reject` as demais recebem
+    429, no modo `sample` são gravadas mas não transmitidas. Isso evita que a room
+    alterne entre normal e sobrecarregada a cada reposição do bucket.
+    """
+
+    def __init__(self,
+                 room_rate: float = CHAT_ROOM_RATE,
+                 room_burst: float = CHAT_ROOM_BURST,
+                 user_rate: float = CHAT_USER_RATE,
+                 user_burst: float = CHAT_USER_BURST,
+                 max_in_flight: int = CHAT_MAX_IN_FLIGHT,
+                 degraded_seconds: float = CHAT_DEGRADED_SECONDS,
+                 shed_mode: str = CHAT_SHED_MODE,
+                 sample_rate: float = CHAT_SAMPLE_RATE,
+                 max_keys: int = CHAT_ADMISSION_MAX_KEYS):
+        self.room_rate = room_rate
+        self.room_burst = room_burst
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.max_in_flight = max_in_flight
+        self.degraded_seconds = degraded_seconds
+        self.shed_mode = shed_mode
+        self.sample_rate = sample_rate
+        self.max_keys = max_keys
+        self.in_flight = 0
+        self._room_buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+        self._user_buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+        self._degraded_until: dict[str, float] = {}
+        self.stats = {
+            "admitted": 0,
+            "shed_global": 0,
+            "shed_user": 0,
+            "shed_room": 0,
+            "shed_room_degraded": 0,
+            "broadcast_sampled_out": 0,
+            "degraded_activations": 0,
+        }
+
+    def _bucket(self, buckets: OrderedDict, key: str, rate: float, capacity: float, now: float) -> TokenBucket:
+        bucket = buckets.get(key)
+
+        if bucket is None:
+            bucket = TokenBucket(rate, capacity, now)
+            buckets[key] = bucket
+            if len(buckets) > self.max_keys:
+                buckets.popitem(last=False)
+        else:
+            buckets.move_to_end(key)
+
+        return bucket
+
+    def _reject(self, counter: str, retry_after: float, detail: str):
+        self.stats[counter] += 1
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    def is_degraded(self, room: str, now: float | None = None) -> bool:
+        now = time.monotonic() if now is None else now
+        until = self._degraded_until.get(room)
+
+        if until is None:
+            return False
+        if until <= now:
+            del self._degraded_until[room]
+            return False
+        return True
+
+    def admit(self, room: str, user_id: str) -> dict:
+        """
+        Decide se a mensagem é aceita. Lança HTTP 429 quando deve ser descartada;
+        caso contrário retorna `{"broadcast": bool}` e conta a requisição como em andamento
+        (libere com `release()`).
+        """
+        now = time.monotonic()
+
+        if self.in_flight >= self.max_in_flight:
+            self._reject("shed_global", 1, "Serviço sobrecarregado. Tente novamente em instantes.")
+
+        user_wait = self._bucket(self._user_buckets, user_id, self.user_rate, self.user_burst, now).take(now)
+        if user_wait:
+            self._reject("shed_user", user_wait, "Você está enviando mensagens rápido demais.")
+
+        broadcast = True
+        room_bucket = self._bucket(self._room_buckets, room, self.room_rate, self.room_burst, now)
+        room_wait = room_bucket.take(now)
+        degraded = self.is_degraded(room, now)
+
+        if room_wait:
+            if not degraded:
+                self.stats["degraded_activations"] += 1
+                print(f"AVISO: [admission] Chat {room} entrou em modo degradado ({self.shed_mode}).")
+            self._degraded_until[room] = now + self.degraded_seconds
+
+            if self.shed_mode != "sample":
+                self._reject("shed_room", room_wait, "O chat está recebendo mensagens demais. Tente novamente em instantes.")
+
+            degraded = True
+
+        if degraded and random.random() >= self.sample_rate:
+            if self.shed_mode != "sample":
+                # A mensagem descartada não consome o orçamento da room
+                room_bucket.tokens += 1
+                self._reject("shed_room_degraded", self._degraded_until[room] - now,
+                             "O chat está recebendo mensagens demais. Tente novamente em instantes.")
+
+            broadcast = False
+            self.stats["broadcast_sampled_out"] += 1
+
+        self.in_flight += 1
+        self.stats["admitted"] += 1
+
+        return {"broadcast": broadcast}
+
+    def release(self) -> None:
+        self.in_flight = max(0, self.in_flight - 1)
+
+    @contextmanager
+    def admission_for(self, room: str, current_user: dict):
+        """
+        Aplica `admit()`/`release()` em volta do bloco. Organizadores nunca são descartados.
+        Usado pela rota HTTP e pelo evento `send_message` do Socket.IO.
+        """
+        if has_role(current_user["groups"], "Organizador"):
+            yield {"broadcast": True}
+            return
+
+        admission = self.admit(room, current_user["user_matricula"])
+        try:
+            yield admission
+        finally:
+            self.release()
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        return {
+            **self.stats,
+            "shed_mode": self.shed_mode,
+            "in_flight": self.in_flight,
+            "degraded_rooms": sum(1 for until in self._degraded_until.values() if until > now),
+        }
+
+
+chat_admission = AdmissionController()
+
+register_status_provider("chat_admission", chat_admission.status)
+
+
+async def admit_chat_message(chat_id: uuid.UUID,
+                             current_user: dict = Depends(get_current_user)):
+    """
+    Dependência de admissão para `create_message`. Organizadores nunca são descartados.
+    """
+    with chat_admission.admission_for(str(chat_id), current_user) as admission:
+        yield admission
\ No newline at end of file
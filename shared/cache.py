@@ -0,0 +1,108 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class TTLCache:
+    """
+    Cache LRU em memória com expiração por TTL, para leituras muito repetidas.
+
+    Cada entrada pode pertencer a um grupo (ex.: a competição de uma página de listagem),
+    permitindo invalidar todas as entradas do grupo de uma vez.
+
+    Para evitar que uma leitura iniciada antes de uma escrita grave um valor antigo
+    depois da invalidação, capture `generation` antes de ir ao banco e passe-o em `set()`:
+    se houve qualquer invalidação no meio tempo, o valor é descartado.
+    """
+
+    def __init__(self, name: str, max_size: int, ttl: float):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.generation = 0
+
+        self._entries: OrderedDict[Hashable, tuple[float, Any, Hashable | None]] = OrderedDict()
+        self._groups: dict[Hashable, set] = {}
+
+        self.stats = {"hits": 0, "misses": 0, "sets": 0, "stale_sets_skipped": 0,
+                      "evictions": 0, "invalidations": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    def get(self, key: Hashable) -> Any | None:
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.stats["misses"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, group: Hashable | None = None,
+            generation: int | None = None) -> None:
+        if not self.enabled:
+            return
+
+        if generation is not None and generation != self.generation:
+            self.stats["stale_sets_skipped"] += 1
+            return
+
+        self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl, value, group)
+        if group is not None:
+            self._groups.setdefault(group, set()).add(key)
+        self.stats["sets"] += 1
+
+        while len(self._entries) > self.max_size:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats["evictions"] += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        self.generation += 1
+        self.stats["invalidations"] += 1
+        self._remove(key)
+
+    def invalidate_group(self, group: Hashable) -> None:
+        self.generation += 1
+        self.stats["invalidations"] += 1
+        for key in list(self._groups.get(group, ())):
+            self._remove(key)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+        self._groups.clear()
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        group = entry[2]
+        if group is not None:
+            keys = self._groups.get(group)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._groups[group]
+
+    def status(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else None,
+        }
\ No newline at end of file
@@ -0,0 +1,67 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+
+
+class BoundedDBExecutor:
+    """
+    Executor dedicado e limitado para trabalho de banco disparado em segundo plano.
+
+    No máximo `max_concurrency` operações rodam ao mesmo tempo; as demais aguardam
+    na fila. Assim, rajadas do consumidor ocupam uma fatia fixa do pool de conexões
+    e nunca disputam todas as conexões com as requisições HTTP. Expõe a profundidade
+    da fila e o tempo de espera.
+    """
+
+    def __init__(self, name: str, max_concurrency: int):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.waiting = 0
+        self.running = 0
+        self.stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "wait_time_total_ms": 0.0,
+            "wait_time_max_ms": 0.0,
+        }
+
+    async def run(self, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        queued_at = loop.time()
+
+        self.stats["submitted"] += 1
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        wait_ms = (loop.time() - queued_at) * 1000
+        self.stats["wait_time_total_ms"] += wait_ms
+        self.stats["wait_time_max_ms"] = max(self.stats["wait_time_max_ms"], wait_ms)
+
+        self.running += 1
+        try:
+            result = await func(*args, **kwargs)
+            self.stats["completed"] += 1
+            return result
+        except Exception:
+            self.stats["failed"] += 1
+            raise
+        finally:
+            self.running -= 1
+            self._semaphore.release()
+
+    def status(self) -> dict:
+        finished = self.stats["completed"] + self.stats["failed"]
+        return {
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self.waiting,
+            "running": self.running,
+            "submitted": self.stats["submitted"],
+            "completed": self.stats["completed"],
+            "failed": self.stats["failed"],
+            "wait_time_avg_ms": round(self.stats["wait_time_total_ms"] / finished, 2) if finished else 0.0,
+            "wait_time_max_ms": round(self.stats["wait_time_max_ms"], 2),
+        }
\ No newline at end of file
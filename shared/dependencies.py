@@ -1,4 +1,4 @@
-from shared.database import SessionLocal
+from shared.database import SessionLocal, AsyncSessionLocal
 
 
 def get_db():
@@ -6,4 +6,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
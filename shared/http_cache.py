@@ -0,0 +1,108 @@
+import itertools
+import os
+import uuid
+from collections import OrderedDict
+
+from fastapi import Request, Response
+
+from shared.invalidation_bus import invalidation_bus
+from shared.metrics import register_status_provider
+
+# max-age curto permite que proxies reversos absorvam rajadas de leitura sem servir
+# dados muito antigos; depois disso revalidam com If-None-Match.
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "1"))
+RESOURCE_VERSIONS_MAX_KEYS = int(os.getenv("RESOURCE_VERSIONS_MAX_KEYS", "10000"))
+
+
+class ResourceVersions:
+    """
+    Versões em memória dos recursos públicos de leitura, usadas para gerar ETags sem
+    consultar o banco. Cada escrita (local ou de outra réplica, via barramento de
+    invalidação) avança a versão do recurso.
+
+    As versões vêm de um contador global: uma chave removida pelo limite de tamanho volta
+    com o maior valor já removido (`_floor`), nunca repetindo uma versão anterior a uma
+    escrita. O `epoch` muda a cada processo, então ETags de outra réplica ou de antes de
+    um restart nunca coincidem por acaso.
+    """
+
+    def __init__(self, max_keys: int = RESOURCE_VERSIONS_MAX_KEYS):
+        self.max_keys = max_keys
+        self._counter = itertools.count(1)
+        self._versions: OrderedDict[tuple, int] = OrderedDict()
+        self._floor = 0
+        self.epoch = uuid.uuid4().hex[:8]
+        self.stats = {"bumps": 0, "not_modified": 0, "full_responses": 0}
+
+    def bump(self, kind: str, key) -> None:
+        scope = (kind, str(key))
+        self._versions.pop(scope, None)
+        self._versions[scope] = next(self._counter)
+        self.stats["bumps"] += 1
+
+        while len(self._versions) > self.max_keys:
+            _, version = self._versions.popitem(last=False)
+            self._floor = max(self._floor, version)
+
+    def etag(self, kind: str, key) -> str:
+        version = self._versions.get((kind, str(key)), self._floor)
+        return f'"{self.epoch}-{kind}-{version}"'
+
+    def reset(self) -> None:
+        self._versions.clear()
+        self._floor = 0
+        self.epoch = uuid.uuid4().hex[:8]
+
+    def status(self) -> dict:
+        return {**self.stats, "keys": len(self._versions), "max_age": HTTP_CACHE_MAX_AGE}
+
+
+resource_versions = ResourceVersions()
+
+register_status_provider("http_cache", resource_versions.status)
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def conditional_get(request: Request, response: Response, kind: str, key) -> Response | None:
+    """
+    Define `ETag`/`Cache-Control` na resposta e, se o cliente já tem a versão atual
+    (`If-None-Match`), retorna a resposta 304 que a rota deve devolver sem ir ao banco.
+    A versão é lida antes da consulta e, sem `await` no meio, é a mesma que os serviços de
+    leitura usam na chave do `read_coalescer`: a consulta que produz o corpo foi iniciada
+    sob essa versão, de modo que o ETag nunca é mais novo que o corpo.
+    """
+    etag = resource_versions.etag(kind, key)
+    cache_control = f"public, max-age={HTTP_CACHE_MAX_AGE}, must-revalidate"
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        resource_versions.stats["not_modified"] += 1
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+    resource_versions.stats["full_responses"] += 1
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    return None
+
+
+def _on_match_changed(ids: dict) -> None:
+    resource_versions.bump("match", ids["match_id"])
+    resource_versions.bump("chat", ids["match_id"])
+    if "competition_id" in ids:
+        resource_versions.bump("competition", ids["competition_id"])
+
+
+invalidation_bus.subscribe("match", _on_match_changed)
+invalidation_bus.subscribe("competition", lambda ids: resource_versions.bump("competition", ids["competition_id"]))
+invalidation_bus.subscribe("comments", lambda ids: resource_versions.bump("comments", ids["match_id"]))
+invalidation_bus.subscribe("messages", lambda ids: resource_versions.bump("messages", ids["chat_id"]))
+invalidation_bus.subscribe_reset(resource_versions.reset)
\ No newline at end of file
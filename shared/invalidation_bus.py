@@ -0,0 +1,225 @@
+import asyncio
+import json
+import os
+import socket
+import time
+import uuid
+from typing import Callable
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from messaging.supervisor import ConsumerSupervisor
+from shared.database import ASYNC_SQLALCHEMY_DATABASE_URL
+from shared.metrics import register_status_provider
+
+# "auto" usa Postgres LISTEN/NOTIFY quando o banco é Postgres e o barramento em memória
+# (somente este processo) nos demais casos, como no SQLite local/testes.
+INVALIDATION_BUS_BACKEND = os.getenv("INVALIDATION_BUS_BACKEND", "auto")
+INVALIDATION_CHANNEL = os.getenv("INVALIDATION_CHANNEL", "match_comments_invalidation")
+NODE_ID = os.getenv("NODE_ID") or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+def resolve_backend(backend: str, database_url: str | None) -> str:
+    if backend != "auto":
+        return backend
+    if database_url and database_url.startswith("postgresql"):
+        return "postgres"
+    return "memory"
+
+
+class InMemoryHub:
+    """
+    Substituto do NOTIFY para testes: entrega os eventos a todos os barramentos
+    registrados no mesmo processo (cada um simulando um nó).
+    """
+
+    def __init__(self):
+        self.listeners: list[Callable[[str], None]] = []
+
+    def notify(self, payload: str) -> None:
+        loop = asyncio.get_running_loop()
+        for listener in list(self.listeners):
+            loop.call_soon(listener, payload)
+
+
+memory_hub = InMemoryHub()
+
+
+class InvalidationBus:
+    """
+    Barramento de invalidação entre réplicas do serviço.
+
+    As rotas de escrita chamam `publish()` **antes** do commit: no Postgres o evento é
+    enviado com `pg_notify` na mesma transação e só chega aos outros nós se ela for
+    confirmada. Cada nó escuta o canal com uma conexão asyncpg dedicada e repassa os
+    eventos aos handlers registrados com `subscribe()`, ignorando os que ele mesmo gerou:
+    no nó de origem os handlers são chamados logo após o commit da sessão (e descartados
+    em caso de rollback).
+
+    Quando a conexão de escuta cai, eventos podem ter sido perdidos: ao reconectar,
+    os handlers de `subscribe_reset()` são chamados para descartar os caches inteiros.
+    """
+
+    def __init__(self,
+                 backend: str = INVALIDATION_BUS_BACKEND,
+                 channel: str = INVALIDATION_CHANNEL,
+                 node_id: str = NODE_ID,
+                 hub: InMemoryHub = memory_hub):
+        self.backend = resolve_backend(backend, ASYNC_SQLALCHEMY_DATABASE_URL)
+        self.channel = channel
+        self.node_id = node_id
+        self.hub = hub
+        self._handlers: dict[str, list[tuple[Callable[[dict], None], bool]]] = {}
+        self._reset_handlers: list[Callable[[], None]] = []
+        self._listener = ConsumerSupervisor("invalidation_bus", self._listen)
+        self._started = False
+        self.stats = {
+            "published": 0,
+            "received": 0,
+            "own_skipped": 0,
+            "handler_errors": 0,
+            "resets": 0,
+            "delay_ms_last": None,
+            "delay_ms_max": 0.0,
+            "delay_ms_total": 0.0,
+        }
+
+    def subscribe(self, kind: str, handler: Callable[[dict], None], remote_only: bool = False) -> None:
+        """
+        Registra um handler para eventos do tipo `kind`. Com `remote_only`, o handler só
+        recebe escritas feitas em outros nós (o nó de origem já atualizou o próprio estado).
+        """
+        self._handlers.setdefault(kind, []).append((handler, remote_only))
+
+    def subscribe_reset(self, handler: Callable[[], None]) -> None:
+        self._reset_handlers.append(handler)
+
+    async def publish(self, db: AsyncSession, kind: str, **ids) -> None:
+        event = {
+            "kind": kind,
+            "ids": {key: str(value) for key, value in ids.items() if value is not None},
+            "origin": self.node_id,
+            "ts": time.time(),
+        }
+
+        if self.backend == "postgres":
+            await db.execute(text("SELECT pg_notify(:channel, :payload)"),
+                             {"channel": self.channel, "payload": json.dumps(event)})
+
+        db.info.setdefault("invalidation_events", []).append((self, event))
+
+    def _committed(self, event: dict) -> None:
+        self._dispatch(event, remote=False)
+
+        if self.backend == "memory":
+            self.hub.notify(json.dumps(event))
+        elif self.backend != "postgres":
+            return
+
+        self.stats["published"] += 1
+
+    def start(self) -> None:
+        if self._started:
+            return
+        self._started = True
+
+        if self.backend == "postgres":
+            self._listener.start()
+        elif self.backend == "memory":
+            self.hub.listeners.append(self._deliver)
+
+    async def stop(self) -> None:
+        if not self._started:
+            return
+        self._started = False
+
+        if self.backend == "postgres":
+            await self._listener.stop()
+        elif self._deliver in self.hub.listeners:
+            self.hub.listeners.remove(self._deliver)
+
+    async def _listen(self) -> None:
+        import asyncpg
+
+        dsn = ASYNC_SQLALCHEMY_DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1)
+        connection = await asyncpg.connect(dsn)
+        closed = asyncio.Event()
+
+        try:
+            connection.add_termination_listener(lambda _: closed.set())
+            await connection.add_listener(self.channel, lambda conn, pid, channel, payload: self._deliver(payload))
+            print(f"INFO: [invalidation_bus] Escutando o canal '{self.channel}' (nó {self.node_id}).")
+
+            self._reset()
+            await closed.wait()
+            raise ConnectionError("Conexão de escuta encerrada")
+        finally:
+            if not connection.is_closed():
+                await connection.close()
+
+    def _reset(self) -> None:
+        self.stats["resets"] += 1
+        for handler in self._reset_handlers:
+            try:
+                handler()
+            except Exception as e:
+                self.stats["handler_errors"] += 1
+                print(f"ERRO: [invalidation_bus] Falha ao limpar cache: {e}")
+
+    def _deliver(self, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            print(f"AVISO: [invalidation_bus] Evento inválido descartado: {payload!r}")
+            return
+
+        if event.get("origin") == self.node_id:
+            self.stats["own_skipped"] += 1
+            return
+
+        delay_ms = max(0.0, (time.time() - float(event.get("ts", time.time()))) * 1000)
+        self.stats["received"] += 1
+        self.stats["delay_ms_last"] = round(delay_ms, 2)
+        self.stats["delay_ms_total"] += delay_ms
+        self.stats["delay_ms_max"] = max(self.stats["delay_ms_max"], round(delay_ms, 2))
+
+        self._dispatch(event, remote=True)
+
+    def _dispatch(self, event: dict, remote: bool) -> None:
+        for handler, remote_only in self._handlers.get(event.get("kind"), ()):
+            if remote_only and not remote:
+                continue
+            try:
+                handler(event.get("ids", {}))
+            except Exception as e:
+                self.stats["handler_errors"] += 1
+                print(f"ERRO: [invalidation_bus] Falha ao aplicar invalidação {event.get('kind')}: {e}")
+
+    def status(self) -> dict:
+        received = self.stats["received"]
+        stats = {key: value for key, value in self.stats.items() if key != "delay_ms_total"}
+        return {
+            **stats,
+            "backend": self.backend,
+            "node_id": self.node_id,
+            "delay_ms_avg": round(self.stats["delay_ms_total"] / received, 2) if received else None,
+            "listener": self._listener.status() if self.backend == "postgres" else None,
+        }
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_committed_events(session: Session) -> None:
+    for bus, pending in session.info.pop("invalidation_events", ()):
+        bus._committed(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_events(session: Session) -> None:
+    session.info.pop("invalidation_events", None)
+
+
+invalidation_bus = InvalidationBus()
+
+register_status_provider("invalidation_bus", invalidation_bus.status)
\ No newline at end of file
@@ -0,0 +1,20 @@
+from typing import Callable
+
+_status_providers: dict[str, Callable[[], dict]] = {}
+
+
+def register_status_provider(name: str, provider: Callable[[], dict]) -> None:
+    """
+    Registra uma função que retorna o estado/métricas de um componente do processo.
+    """
+    _status_providers[name] = provider
+
+
+def collect_status() -> dict:
+    status = {}
+    for name, provider in _status_providers.items():
+        try:
+            status[name] = provider()
+        except Exception as e:
+            status[name] = {"error": str(e)}
+    return status
\ No newline at end of file
@@ -0,0 +1,30 @@
+import base64
+import uuid
+from datetime import datetime
+
+from fastapi import HTTPException
+
+
+def encode_cursor(created_at: datetime, item_id: uuid.UUID) -> str:
+    """
+    Gera um cursor opaco a partir da chave de ordenação (created_at, id).
+    """
+    raw = f"{created_at.isoformat()}|{item_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """
+    Converte um cursor opaco de volta para a tupla (created_at, id).
+    Lança HTTP 400 caso o cursor seja inválido.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        created_at_str, item_id_str = raw.split("|", 1)
+        return datetime.fromisoformat(created_at_str), uuid.UUID(item_id_str)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=400,
+            detail="Cursor de paginação inválido."
+        )
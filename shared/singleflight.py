@@ -0,0 +1,69 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+from shared.metrics import register_status_provider
+
+
+class _LeaderCancelled(Exception):
+    pass
+
+
+class SingleFlight:
+    """
+    Agrupa leituras idênticas concorrentes: enquanto a primeira requisição (líder) de uma
+    chave está consultando o banco, as demais aguardam e recebem o mesmo resultado
+    (ou a mesma exceção), em vez de executar cada uma a sua própria consulta.
+
+    O resultado é compartilhado entre as requisições e não deve ser modificado.
+    Se o líder for cancelado (cliente desconectou), quem estava aguardando tenta de novo.
+
+    A chave deve incluir a versão do recurso (`resource_versions.etag`) lida antes da
+    consulta: assim uma leitura que chega depois do commit de uma escrita nunca se junta
+    a uma consulta iniciada antes dele, e o ETag enviado é sempre a versão sob a qual o
+    líder leu. Pelo mesmo motivo, só o líder grava o resultado em cache, com a `generation`
+    capturada no início da própria consulta.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self.stats = {"leaders": 0, "shared": 0, "errors": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        while key in self._calls:
+            self.stats["shared"] += 1
+            try:
+                return await asyncio.shield(self._calls[key])
+            except _LeaderCancelled:
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.stats["leaders"] += 1
+
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except Exception as e:
+            self.stats["errors"] += 1
+            future.set_exception(e)
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def status(self) -> dict:
+        return {**self.stats, "in_flight": len(self._calls)}
+
+
+# Compartilhado pelas rotas GET mais acessadas (partidas, comentários, chats e mensagens).
+read_coalescer = SingleFlight("reads")
+
+register_status_provider("read_coalescer", read_coalescer.status)
\ No newline at end of file
@@ -0,0 +1,94 @@
+import pytest
+from fastapi import HTTPException
+
+import shared.admission as admission
+from shared.admission import AdmissionController
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(admission.time, "monotonic", clock)
+    return clock
+
+
+def controller(**overrides) -> AdmissionController:
+    options = dict(room_rate=1, room_burst=2, user_rate=100, user_burst=100, max_in_flight=10,
+                   degraded_seconds=10, shed_mode="reject", sample_rate=0.5)
+    options.update(overrides)
+    return AdmissionController(**options)
+
+
+def admit(control: AdmissionController, user: str = "u") -> dict | int:
+    try:
+        result = control.admit("room", user)
+    except HTTPException as e:
+        return e.status_code
+    control.release()
+    return result
+
+
+def test_user_bucket_and_global_limit(clock):
+    control = controller(room_burst=100, user_rate=1, user_burst=1, max_in_flight=1)
+
+    assert admit(control, "a") == {"broadcast": True}
+    assert admit(control, "a") == 429
+
+    control.admit("room", "b")
+    assert admit(control, "c") == 429
+    assert control.stats["shed_global"] == 1
+
+
+def test_degraded_room_keeps_shedding_for_the_whole_period(clock, monkeypatch):
+    control = controller()
+    draws = iter([0.9, 0.1, 0.9])
+    monkeypatch.setattr(admission.random, "random", lambda: next(draws))
+
+    assert admit(control) == {"broadcast": True}
+    assert admit(control) == {"broadcast": True}
+    assert admit(control) == 429
+    assert control.is_degraded("room")
+
+    # O bucket se recompôs, mas a room continua degradada: só a amostra passa
+    clock.now += 5
+    assert admit(control) == 429
+    assert admit(control) == {"broadcast": True}
+    assert admit(control) == 429
+    assert control.stats["shed_room_degraded"] == 2
+
+    # Passado o período sem novos estouros, a room volta ao normal
+    clock.now += 11
+    assert not control.is_degraded("room")
+    assert admit(control) == {"broadcast": True}
+
+
+def test_sample_mode_stores_everything_but_samples_broadcasts(clock, monkeypatch):
+    control = controller(shed_mode="sample")
+    draws = iter([0.9, 0.1, 0.9])
+    monkeypatch.setattr(admission.random, "random", lambda: next(draws))
+
+    assert admit(control) == {"broadcast": True}
+    assert admit(control) == {"broadcast": True}
+    assert admit(control) == {"broadcast": False}
+
+    clock.now += 5
+    assert admit(control) == {"broadcast": True}
+    assert admit(control) == {"broadcast": False}
+    assert control.stats["broadcast_sampled_out"] == 2
+
+
+def test_organizers_are_never_shed(clock):
+    control = controller(room_burst=1, user_burst=1, user_rate=0.001)
+    organizer = {"groups": ["Organizador"], "user_matricula": "1"}
+
+    for _ in range(5):
+        with control.admission_for("room", organizer) as result:
+            assert result == {"broadcast": True}
@@ -0,0 +1,53 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from comments.models.comments import Comment
+from shared.database import AsyncSessionLocal
+from shared.http_cache import resource_versions
+
+pytestmark = pytest.mark.anyio
+
+
+async def _add_comments(match_id: uuid.UUID, *times: datetime) -> list[uuid.UUID]:
+    comments = [Comment(match_id=match_id, body=f"lance {i}", created_at=at, updated_at=at)
+                for i, at in enumerate(times)]
+    async with AsyncSessionLocal() as db:
+        db.add_all(comments)
+        await db.commit()
+    resource_versions.bump("comments", match_id)
+    return [comment.id for comment in comments]
+
+
+async def test_listing_without_parameters_returns_every_comment_in_order(client, match):
+    match_id = uuid.UUID(match["match_id"])
+    start = datetime.now(timezone.utc) - timedelta(hours=1)
+    ids = await _add_comments(match_id, *(start + timedelta(seconds=i) for i in range(60)))
+
+    async with client:
+        everything = await client.get(f"/api/v1/matches/{match_id}/comments/")
+        page = await client.get(f"/api/v1/matches/{match_id}/comments/", params={"limit": 10})
+
+    assert [item["id"] for item in everything.json()] == [str(i) for i in ids]
+    assert "x-sync-cursor" in everything.headers
+    assert [item["id"] for item in page.json()] == [str(i) for i in reversed(ids[-10:])]
+    assert "x-before-cursor" in page.headers
+
+
+async def test_sync_redelivers_changes_committed_behind_the_cursor(client, match):
+    match_id = uuid.UUID(match["match_id"])
+    now = datetime.now(timezone.utc)
+    url = f"/api/v1/matches/{match_id}/comments/"
+
+    async with client:
+        await _add_comments(match_id, now)
+        cursor = (await client.get(url)).headers["x-sync-cursor"]
+
+        # Gravado por outro nó com o relógio 1s atrasado, confirmado depois da leitura
+        [late] = await _add_comments(match_id, now - timedelta(seconds=1))
+        synced = await client.get(url, params={"since": cursor})
+
+    assert str(late) in [item["id"] for item in synced.json()]
+    # Nada novo depois do cursor: ele não avança nem recua
+    assert synced.headers["x-sync-cursor"] == cursor
@@ -0,0 +1,53 @@
+import pytest
+
+from realtime.emitters import CompetitionDeltaBatcher, RoomEmitWindow, ScoreEmitCoalescer
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeServer:
+    def __init__(self):
+        self.emitted = []
+
+    async def emit(self, event, data, room=None, **kwargs):
+        self.emitted.append((event, room, data))
+
+
+async def test_score_seq_is_the_match_version_and_stale_scores_are_dropped():
+    server = FakeServer()
+    emitter = ScoreEmitCoalescer(server, window_ms=1000)
+
+    await emitter.submit("m1", {"score_home": 1, "version": 3})
+    # Atualização que perdeu a corrida com a versão 3 (ex.: a resposta do banco chegou depois)
+    await emitter.submit("m1", {"score_home": 0, "version": 2})
+    await emitter.flush_all()
+
+    assert [data for _, _, data in server.emitted] == [{"score_home": 1, "version": 3, "seq": 3}]
+    assert emitter.stats["stale"] == 1
+
+    # Nada da room fica guardado depois do emit, nem se a partida termina em outro nó
+    assert emitter.status()["pending_rooms"] == 0
+    assert not emitter._timers
+
+
+async def test_competition_delta_keeps_the_newest_version_of_each_match():
+    server = FakeServer()
+    batcher = CompetitionDeltaBatcher(server, window_ms=1000)
+
+    await batcher.submit_delta("c1", "m1", score_home=2, version=5)
+    await batcher.submit_delta("c1", "m1", score_home=1, version=4)
+    await batcher.submit_delta("c1", "m1", status="finished")
+    await batcher.flush_all()
+
+    [(_, room, data)] = server.emitted
+    assert room == "competition:c1"
+    assert data["matches"] == [{"match_id": "m1", "score_home": 2, "version": 5, "status": "finished"}]
+
+
+def test_emit_window_subclasses_must_implement_merge_and_build():
+    class Incomplete(RoomEmitWindow):
+        def _merge(self, current, payload):
+            return payload
+
+    with pytest.raises(TypeError):
+        Incomplete(FakeServer(), "event", 0)
@@ -0,0 +1,82 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from chats.models.chats import Chat
+from conftest import SlowSession, auth_headers
+from services.message_buffer import message_buffer
+from services.match_cache import match_cache, read_match
+from services.messages import create_chat_message
+from shared.database import AsyncSessionLocal
+from shared.http_cache import resource_versions
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_if_none_match_returns_304_until_the_next_write(client, match):
+    url = f"/api/v1/matches/{match['match_id']}"
+
+    async with client:
+        first = await client.get(url)
+        etag = first.headers["etag"]
+
+        cached = await client.get(url, headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+
+        await client.patch(f"{url}/update-score", json={"score_home": 1, "score_away": 0},
+                           headers=auth_headers())
+
+        changed = await client.get(url, headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+        assert changed.json()["score_home"] == 1
+
+
+async def test_etag_is_never_newer_than_the_body(client, match):
+    match_id = uuid.UUID(match["match_id"])
+    match_cache.clear()
+
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async with AsyncSessionLocal() as db:
+        leader = asyncio.create_task(read_match(SlowSession(db, started, release), match_id))
+        await started.wait()
+
+        try:
+            async with client:
+                await client.patch(f"/api/v1/matches/{match_id}/update-score",
+                                   json={"score_home": 3, "score_away": 1}, headers=auth_headers())
+                follower = await asyncio.wait_for(client.get(f"/api/v1/matches/{match_id}"), timeout=5)
+        finally:
+            release.set()
+        await leader
+
+    # Um ETag pós-escrita só pode acompanhar um corpo pós-escrita
+    assert follower.headers["etag"] == resource_versions.etag("match", match_id)
+    assert follower.json()["score_home"] == 3
+
+
+async def test_write_behind_message_changes_the_etag_before_the_flush(client, match, monkeypatch):
+    monkeypatch.setattr(message_buffer, "enabled", True)
+    monkeypatch.setattr(message_buffer, "journal", None)
+    monkeypatch.setattr(message_buffer, "_pending", [])
+
+    async with AsyncSessionLocal() as db:
+        chat_id = (await db.execute(select(Chat.id).filter(
+            Chat.match_id == uuid.UUID(match["match_id"])))).scalar()
+
+    url = f"/api/v1/chat/{chat_id}/messages/"
+    async with client:
+        etag = (await client.get(url)).headers["etag"]
+
+        async with AsyncSessionLocal() as db:
+            message = await create_chat_message(db, chat_id, "oi",
+                                                {"user_matricula": "123", "groups": ["Jogador"]},
+                                                {"broadcast": False})
+
+        changed = await client.get(url, headers={"If-None-Match": etag})
+
+    assert changed.status_code == 200
+    assert [item["id"] for item in changed.json()] == [str(message.id)]
@@ -0,0 +1,109 @@
+import asyncio
+import json
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+import services.crud as crud
+from matches.models.matches import Match
+import messaging.consumers as consumers
+from messaging.consumers import MatchIngestionBatcher
+from shared.database import AsyncSessionLocal
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeMessage:
+    routing_key = "match_created"
+
+    def __init__(self, data: dict):
+        self.body = json.dumps(data).encode()
+        self.outcome = None
+
+    async def ack(self):
+        self.outcome = "ack"
+
+    async def reject(self, requeue=False):
+        self.outcome = f"reject(requeue={requeue})"
+
+    async def nack(self, requeue=True):
+        self.outcome = f"nack(requeue={requeue})"
+
+
+def match_message(**overrides) -> dict:
+    data = {"match_id": str(uuid.uuid4()), "competition_id": str(uuid.uuid4()),
+            "team_home_id": str(uuid.uuid4()), "team_away_id": str(uuid.uuid4()),
+            "status": "not-started"}
+    data.update(overrides)
+    return data
+
+
+def test_parse_requires_status():
+    with pytest.raises(ValueError):
+        crud.parse_match_message(match_message(status=None))
+
+    with pytest.raises(ValueError):
+        crud.parse_match_message(match_message(status="x" * 51))
+
+
+async def test_invalid_message_is_rejected_before_batching():
+    batcher = MatchIngestionBatcher(batch_size=10, batch_interval_ms=10_000)
+    message = FakeMessage(match_message(status=None))
+
+    await batcher.add(message)
+
+    assert message.outcome == "reject(requeue=False)"
+
+
+async def test_rows_refused_by_the_database_do_not_block_the_batch(monkeypatch):
+    # Simula uma mensagem que passa na validação, mas que o banco recusa (NOT NULL em status).
+    parse = crud.parse_match_message
+
+    def parse_without_status_check(data):
+        return {**parse({**data, "status": data.get("status") or "-"}), "status": data.get("status")}
+
+    monkeypatch.setattr(crud, "parse_match_message", parse_without_status_check)
+    monkeypatch.setattr(consumers, "parse_match_message", parse_without_status_check)
+
+    good = [FakeMessage(match_message()) for _ in range(3)]
+    bad = FakeMessage(match_message(status=None))
+
+    batcher = MatchIngestionBatcher(batch_size=10, batch_interval_ms=10_000)
+    for message in [good[0], bad, *good[1:]]:
+        await batcher.add(message)
+    await batcher.flush()
+
+    assert [message.outcome for message in good] == ["ack"] * 3
+    assert bad.outcome == "reject(requeue=False)"
+
+    async with AsyncSessionLocal() as db:
+        ids = [uuid.UUID(json.loads(message.body)["match_id"]) for message in good]
+        result = await db.execute(select(Match.match_id).filter(Match.match_id.in_(ids)))
+        assert len(result.all()) == 3
+
+
+async def test_stop_waits_for_the_flush_started_by_the_timer(monkeypatch):
+    writing, release = asyncio.Event(), asyncio.Event()
+
+    async def slow_run(fn, *args):
+        writing.set()
+        await release.wait()
+        return args[0]
+
+    monkeypatch.setattr(consumers.consumer_db_executor, "run", slow_run)
+
+    batcher = MatchIngestionBatcher(batch_size=10, batch_interval_ms=1)
+    message = FakeMessage(match_message())
+    await batcher.add(message)
+    await asyncio.wait_for(writing.wait(), timeout=5)
+    assert len(batcher._flush_tasks) == 1
+
+    stopping = asyncio.create_task(batcher.stop())
+    await asyncio.sleep(0.01)
+    assert not stopping.done()
+
+    release.set()
+    await asyncio.wait_for(stopping, timeout=5)
+    assert message.outcome == "ack"
+    assert not batcher._flush_tasks
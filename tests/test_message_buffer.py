@@ -0,0 +1,138 @@
+import asyncio
+import os
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select
+
+from chats.models.chats import Chat
+from chats.models.messages import Message
+from services.message_buffer import MessageJournal, MessageWriteBuffer
+from shared.database import AsyncSessionLocal
+
+pytestmark = pytest.mark.anyio
+
+
+def message_row(chat_id=None) -> dict:
+    return {"id": uuid.uuid4(), "chat_id": chat_id or uuid.uuid4(), "user_id": "123",
+            "body": "oi", "created_at": datetime.now(timezone.utc)}
+
+
+async def test_live_segments_of_other_workers_are_not_replayed(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    row = message_row()
+
+    worker_a = MessageJournal(path, owner="a")
+    worker_a.open()
+    await worker_a.append(row)
+
+    worker_b = MessageJournal(path, owner="b")
+    worker_b.open()
+    assert worker_b.read_rows() == []
+
+    # O flush de B não pode apagar o segmento que A ainda está usando
+    worker_b.rotate()
+    worker_b.release_sealed()
+    assert os.path.exists(worker_a._segment_path(worker_a._sequence))
+
+    # A cai sem gravar: o próximo processo herda o segmento
+    worker_a._file.close()
+    worker_c = MessageJournal(path, owner="c")
+    worker_c.open()
+    assert [recovered["id"] for recovered in worker_c.read_rows()] == [row["id"]]
+
+    worker_c.release_sealed()
+    assert not os.path.exists(worker_a._segment_path(worker_a._sequence))
+
+    worker_b.close()
+    worker_c.close()
+
+
+async def test_restarted_process_replays_its_own_segments(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    rows = [message_row(), message_row()]
+
+    journal = MessageJournal(path, owner="a")
+    journal.open()
+    await journal.append(rows[0])
+    journal.rotate()
+    await journal.append(rows[1])
+    journal.close()
+
+    restarted = MessageJournal(path, owner="a")
+    restarted.open()
+    assert [row["id"] for row in restarted.read_rows()] == [row["id"] for row in rows]
+    assert restarted._sequence == 2
+    restarted.close()
+
+
+async def test_write_behind_flush_persists_and_releases_the_journal(tmp_path, match):
+    async with AsyncSessionLocal() as db:
+        chat_id = (await db.execute(select(Chat.id).filter(
+            Chat.match_id == uuid.UUID(match["match_id"])))).scalar()
+
+    buffer = MessageWriteBuffer(mode="write-behind", flush_ms=60_000,
+                                journal_path=str(tmp_path / "journal.jsonl"))
+    await buffer.start()
+
+    message = Message(**message_row(chat_id))
+    await buffer.submit(message)
+    assert buffer.pending_for(chat_id)[0]["id"] == message.id
+
+    await buffer.flush()
+    await buffer.stop()
+
+    async with AsyncSessionLocal() as db:
+        stored = await db.get(Message, message.id)
+    assert stored is not None
+    assert buffer.status()["pending"] == 0
+    assert buffer.journal.existing_segments() == []
+
+
+async def test_stop_during_a_flush_waits_for_the_batch(monkeypatch):
+    buffer = MessageWriteBuffer(mode="write-behind", flush_ms=60_000, batch_size=3, durability="memory")
+    writing, release = asyncio.Event(), asyncio.Event()
+    written = []
+
+    async def slow_insert(rows):
+        writing.set()
+        await release.wait()
+        written.extend(rows)
+
+    monkeypatch.setattr(buffer, "_insert", slow_insert)
+    await buffer.start()
+
+    for _ in range(3):
+        await buffer.submit(Message(**message_row()))
+    await asyncio.wait_for(writing.wait(), timeout=5)
+
+    stopping = asyncio.create_task(buffer.stop())
+    await asyncio.sleep(0.01)
+    release.set()
+    await asyncio.wait_for(stopping, timeout=5)
+
+    assert len(written) == 3
+    assert buffer.stats["batches"] == 1
+    assert buffer.status()["pending"] == 0
+
+
+async def test_cancelled_flush_puts_the_batch_back(monkeypatch):
+    buffer = MessageWriteBuffer(mode="write-behind", durability="memory")
+    writing = asyncio.Event()
+
+    async def hanging_insert(rows):
+        writing.set()
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(buffer, "_insert", hanging_insert)
+    for _ in range(2):
+        await buffer.submit(Message(**message_row()))
+
+    flushing = asyncio.create_task(buffer.flush())
+    await asyncio.wait_for(writing.wait(), timeout=5)
+    flushing.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await flushing
+
+    assert buffer.status()["pending"] == 2
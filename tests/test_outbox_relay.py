@@ -0,0 +1,97 @@
+import pytest
+from sqlalchemy import delete, select
+
+from messaging.broker import RabbitMQPublisher, rabbitmq_publisher
+from messaging.outbox_relay import OutboxRelay
+from messaging.publisher_end_match import add_match_finished_to_outbox
+from messaging.models.outbox import OutboxMessage
+from shared.database import AsyncSessionLocal
+
+pytestmark = pytest.mark.anyio
+
+
+async def _seed_outbox(count: int) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(OutboxMessage))
+        for i in range(count):
+            add_match_finished_to_outbox(db, {"n": i})
+        await db.commit()
+
+
+async def _outbox_rows() -> list[OutboxMessage]:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(OutboxMessage).order_by(OutboxMessage.created_at.asc()))
+        return list(result.scalars().all())
+
+
+@pytest.fixture
+def broker_connected(monkeypatch):
+    monkeypatch.setattr(RabbitMQPublisher, "is_connected", property(lambda self: True))
+
+
+async def test_rows_are_claimed_and_committed_before_publishing(monkeypatch, broker_connected):
+    await _seed_outbox(2)
+    seen_during_publish = []
+
+    async def fake_publish(self, outbox_message):
+        # Outra sessão já enxerga a reivindicação: nenhuma transação fica aberta durante o envio
+        rows = await _outbox_rows()
+        seen_during_publish.append([row.available_at > row.created_at for row in rows])
+        if outbox_message.payload["n"] == 1:
+            raise RuntimeError("broker caiu")
+
+    monkeypatch.setattr(OutboxRelay, "_publish", fake_publish)
+
+    relay = OutboxRelay(claim_timeout=60)
+    assert await relay.drain_once() == 2
+
+    assert seen_during_publish == [[True, True], [True, True]]
+
+    rows = await _outbox_rows()
+    assert [row.payload["n"] for row in rows] == [1]
+    assert rows[0].attempts == 1
+    assert rows[0].last_error == "broker caiu"
+    assert relay.stats["published"] == 1
+    assert relay.stats["failed"] == 1
+
+
+async def test_claimed_rows_are_skipped_until_the_claim_expires(monkeypatch, broker_connected):
+    await _seed_outbox(1)
+    published = []
+
+    async def fake_publish(self, outbox_message):
+        published.append(outbox_message.id)
+
+    async def crash_before_settle(self, published, failed):
+        raise RuntimeError("processo caiu")
+
+    monkeypatch.setattr(OutboxRelay, "_publish", fake_publish)
+
+    crashed = OutboxRelay(claim_timeout=60)
+    monkeypatch.setattr(crashed, "_settle", crash_before_settle.__get__(crashed))
+    with pytest.raises(RuntimeError):
+        await crashed.drain_once()
+
+    # Outra réplica não republica a mensagem enquanto a reivindicação vale
+    assert await OutboxRelay().drain_once() == 0
+    assert len(published) == 1
+    assert len(await _outbox_rows()) == 1
+
+
+async def test_broker_unavailable_does_not_touch_the_outbox(monkeypatch):
+    await _seed_outbox(1)
+    [before] = await _outbox_rows()
+
+    async def refused():
+        raise ConnectionError("connection refused")
+
+    monkeypatch.setattr(RabbitMQPublisher, "is_connected", property(lambda self: False))
+    monkeypatch.setattr(rabbitmq_publisher, "start", refused)
+
+    relay = OutboxRelay()
+    assert await relay.drain_once() == 0
+    assert relay.stats["broker_unavailable"] == 1
+
+    [after] = await _outbox_rows()
+    assert after.attempts == 0
+    assert after.available_at == before.available_at
@@ -0,0 +1,105 @@
+import pytest
+
+from realtime.presence import RoomPresence
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeServer:
+    def __init__(self):
+        self.emitted = []
+
+    async def emit(self, event, data, room=None, **kwargs):
+        self.emitted.append((event, room, data))
+
+
+async def test_viewers_are_deduplicated_and_broadcast_once_per_interval():
+    server = FakeServer()
+    presence = RoomPresence(server, interval_ms=1000, join_notify_limit=2)
+
+    notices = [presence.join(f"s{i}", "room", f"user:{i % 3}") for i in range(6)]
+    assert notices == [True, True, False, False, False, False]
+    assert presence.count("room") == 3
+
+    await presence.broadcast()
+    await presence.broadcast()
+    assert server.emitted == [("presence", "room", {"match_id": "room", "viewers": 3})]
+
+    # A cota de avisos individuais reabre a cada intervalo
+    assert presence.join("s9", "room", "user:9") is True
+
+
+async def test_leave_cleans_up_rooms_and_memory():
+    presence = RoomPresence(FakeServer(), interval_ms=1000, join_notify_limit=5)
+
+    presence.join("a", "room", "user:1")
+    presence.join("b", "room", "user:1")
+    presence.leave("a")
+    assert presence.count("room") == 1
+
+    presence.leave("b")
+    status = presence.status()
+    assert (status["rooms"], status["viewers"], status["connections"], status["bytes"]) == (0, 0, 0, 0)
+
+
+async def test_join_chat_deduplicates_authenticated_users(monkeypatch):
+    import main
+
+    sessions = {"tab-1": {"user": {"user_matricula": "20231"}},
+                "tab-2": {"user": {"user_matricula": "20231"}},
+                "anon": {"user": None}}
+    server = FakeServer()
+
+    async def enter_room(sid, room):
+        pass
+
+    async def get_session(sid):
+        return sessions[sid]
+
+    async def snapshot(*args):
+        return {"status": "ok"}
+
+    presence = RoomPresence(server, interval_ms=1000, join_notify_limit=10)
+    monkeypatch.setattr(main, "presence", presence)
+    monkeypatch.setattr(main, "_join_snapshot", snapshot)
+    monkeypatch.setattr(main.socket_manager, "enter_room", enter_room)
+    monkeypatch.setattr(main.socket_manager, "get_session", get_session)
+    monkeypatch.setattr(main.socket_manager, "emit", server.emit)
+
+    match_id = "00000000-0000-0000-0000-000000000001"
+    for sid in sessions:
+        await main.handle_join_chat(sid, {"match_id": match_id, "user_id": sid})
+
+    assert presence.count(match_id) == 2
+    assert sum(event == "user_joined" for event, _, _ in server.emitted) == 2
+
+
+async def test_join_chat_for_an_unknown_match_leaves_the_room(monkeypatch):
+    import main
+
+    rooms = set()
+    server = FakeServer()
+
+    async def enter_room(sid, room):
+        rooms.add((sid, room))
+
+    async def leave_room(sid, room):
+        rooms.discard((sid, room))
+
+    async def get_session(sid):
+        return {"user": None}
+
+    presence = RoomPresence(server, interval_ms=1000, join_notify_limit=10)
+    monkeypatch.setattr(main, "presence", presence)
+    monkeypatch.setattr(main.socket_manager, "enter_room", enter_room)
+    monkeypatch.setattr(main.socket_manager, "leave_room", leave_room)
+    monkeypatch.setattr(main.socket_manager, "get_session", get_session)
+    monkeypatch.setattr(main.socket_manager, "emit", server.emit)
+
+    match_id = "00000000-0000-0000-0000-0000000000ff"
+    ack = await main.handle_join_chat("s1", {"match_id": match_id})
+
+    assert ack["code"] == 404
+    assert rooms == set()
+    assert presence.count(match_id) == 0
+    assert server.emitted == []
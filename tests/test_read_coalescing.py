@@ -0,0 +1,122 @@
+import asyncio
+import uuid
+
+import pytest
+
+from conftest import SlowSession, auth_headers
+from services.match_cache import match_cache, read_match
+from shared.cache import TTLCache
+from shared.database import AsyncSessionLocal
+from shared.singleflight import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_followers_share_the_leader_result():
+    flight = SingleFlight("test")
+    calls = 0
+    release = asyncio.Event()
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return calls
+
+    tasks = [asyncio.create_task(flight.do("key", load)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*tasks) == [1] * 5
+    assert flight.status() == {"leaders": 1, "shared": 4, "errors": 0, "in_flight": 0}
+
+
+async def test_followers_retry_when_the_leader_is_cancelled():
+    flight = SingleFlight("test")
+    release = asyncio.Event()
+
+    async def load():
+        await release.wait()
+        return "ok"
+
+    leader = asyncio.create_task(flight.do("key", load))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.do("key", load))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await follower == "ok"
+    assert leader.cancelled()
+
+
+async def test_errors_reach_every_follower():
+    flight = SingleFlight("test")
+
+    async def load():
+        await asyncio.sleep(0)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(*[flight.do("key", load) for _ in range(3)], return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.status()["in_flight"] == 0
+
+
+def test_cache_skips_values_read_before_an_invalidation():
+    cache = TTLCache("test", max_size=10, ttl=60)
+
+    generation = cache.generation
+    cache.invalidate("key")
+    cache.set("key", "stale", generation=generation)
+    assert cache.get("key") is None
+
+    cache.set("key", "fresh", generation=cache.generation)
+    assert cache.get("key") == "fresh"
+
+
+def test_cache_group_invalidation_and_lru_bound():
+    cache = TTLCache("test", max_size=2, ttl=60)
+
+    cache.set("a", 1, group="g")
+    cache.set("b", 2, group="g")
+    cache.set("c", 3)
+    assert cache.get("a") is None
+
+    cache.invalidate_group("g")
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+async def test_read_after_commit_does_not_join_an_older_flight(client, match):
+    match_id = uuid.UUID(match["match_id"])
+    match_cache.clear()
+
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async with AsyncSessionLocal() as db:
+        leader = asyncio.create_task(read_match(SlowSession(db, started, release), match_id))
+        await started.wait()
+
+        try:
+            async with client:
+                response = await client.patch(f"/api/v1/matches/{match_id}/update-score",
+                                              json={"score_home": 2, "score_away": 0},
+                                              headers=auth_headers())
+                assert response.status_code == 204
+
+                # Antes da correção, esta leitura se juntava à consulta do líder (e ficava presa nela)
+                follower = await asyncio.wait_for(client.get(f"/api/v1/matches/{match_id}"), timeout=5)
+                assert follower.json()["score_home"] == 2
+        finally:
+            release.set()
+
+        assert (await leader).score_home == 0
+
+    cached = match_cache.get(str(match_id))
+    assert cached is None or cached.score_home == 2
+
+    async with AsyncSessionLocal() as db:
+        assert (await read_match(db, match_id)).score_home == 2
@@ -0,0 +1,97 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from chats.models.messages import Message
+from services.recent_messages import ChatRing, RecentMessages
+from conftest import SlowSession
+from shared.database import AsyncSessionLocal
+
+pytestmark = pytest.mark.anyio
+
+T0 = datetime(2025, 8, 10, 14, 0, tzinfo=timezone.utc)
+
+
+def fill(ring: ChatRing, count: int) -> list[tuple]:
+    keys = []
+    for i in range(count):
+        message_id, created_at = uuid.uuid4(), T0 + timedelta(seconds=i)
+        ring.add(message_id, "123", f"m{i}", created_at)
+        keys.append((created_at, message_id))
+    return keys
+
+
+def bodies(page) -> list[str]:
+    return [message.body for message in page]
+
+
+def test_ring_pages_in_order_and_ignores_duplicates():
+    ring = ChatRing(uuid.uuid4(), max_messages=10, max_bytes=10_000)
+    keys = fill(ring, 5)
+    ring.add(keys[2][1], "123", "m2", keys[2][0])
+
+    assert len(ring) == 5
+    assert bodies(ring.read(None, None, 3)) == ["m2", "m3", "m4"]
+    assert bodies(ring.read(keys[2], None, 10)) == ["m0", "m1"]
+    assert bodies(ring.read(None, keys[2], 10)) == ["m3", "m4"]
+
+
+def test_ring_bounded_by_count_and_bytes_falls_back_to_the_database():
+    ring = ChatRing(uuid.uuid4(), max_messages=3, max_bytes=10_000)
+    keys = fill(ring, 5)
+
+    assert bodies(ring.read(None, None, 3)) == ["m2", "m3", "m4"]
+    # O anel perdeu mensagens antigas: páginas que passam do início precisam do banco
+    assert ring.read(None, None, 4) is None
+    assert ring.read(keys[3], None, 2) is None
+    assert ring.read(None, keys[0], 10) is None
+
+    small = ChatRing(uuid.uuid4(), max_messages=100, max_bytes=500)
+    fill(small, 10)
+    assert small.bytes <= 500 and not small.complete
+
+
+async def test_messages_added_during_load_are_kept(match):
+    from sqlalchemy import select
+    from chats.models.chats import Chat
+
+    async with AsyncSessionLocal() as db:
+        chat_id = (await db.execute(select(Chat.id).filter(
+            Chat.match_id == uuid.UUID(match["match_id"])))).scalar()
+
+    ring = RecentMessages(max_messages=10, max_chats=10)
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async with AsyncSessionLocal() as db:
+        loading = asyncio.create_task(ring.load(SlowSession(db, started, release), chat_id))
+        await started.wait()
+        ring.add(Message(id=uuid.uuid4(), chat_id=chat_id, user_id="123", body="live", created_at=T0))
+        release.set()
+        await loading
+
+    assert bodies(ring.read(chat_id, None, None, 10)) == ["live"]
+
+
+async def test_eviction_during_load_discards_the_stale_ring(match):
+    from sqlalchemy import select
+    from chats.models.chats import Chat
+
+    async with AsyncSessionLocal() as db:
+        chat_id = (await db.execute(select(Chat.id).filter(
+            Chat.match_id == uuid.UUID(match["match_id"])))).scalar()
+
+    ring = RecentMessages(max_messages=10, max_chats=10)
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async with AsyncSessionLocal() as db:
+        loading = asyncio.create_task(ring.load(SlowSession(db, started, release), chat_id))
+        await started.wait()
+        # Mensagem gravada por outro nó enquanto a consulta estava em andamento
+        ring.evict(chat_id)
+        release.set()
+        await loading
+
+    assert ring.read(chat_id, None, None, 10) is None
+    assert ring.status()["chats"] == 0
@@ -0,0 +1,39 @@
+import time
+
+import pytest
+from jose import jwt
+
+pytestmark = pytest.mark.anyio
+
+
+def session_for(exp: float) -> dict:
+    token = jwt.encode({"matricula": "123", "campus": "CN", "groups": ["Organizador"], "exp": int(exp)},
+                       "test-secret", algorithm="HS256")
+    return {"user": {"user_matricula": "123", "campus": "CN", "groups": ["Organizador"]},
+            "token": token, "ip": "127.0.0.1"}
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    import main
+
+    sessions = {}
+
+    async def get_session(sid):
+        return sessions[sid]
+
+    monkeypatch.setattr(main.socket_manager, "get_session", get_session)
+    return sessions
+
+
+async def test_writes_are_refused_once_the_connection_token_expires(sessions):
+    import main
+
+    sessions["expired"] = session_for(time.time() - 10)
+    sessions["valid"] = session_for(time.time() + 3600)
+
+    for handler, data in ((main.handle_send_message, {"chat_id": "x", "body": "oi"}),
+                          (main.handle_send_comment, {"match_id": "x", "body": "gol"})):
+        assert (await handler("expired", data))["code"] == 401
+        # Token válido passa da autenticação e falha só na validação do id
+        assert (await handler("valid", data))["code"] == 422
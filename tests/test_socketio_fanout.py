@@ -0,0 +1,141 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+import socketio
+from socketio.async_pubsub_manager import AsyncPubSubManager
+
+from realtime.emitters import ScoreEmitCoalescer
+from realtime.presence import RoomPresence
+
+pytestmark = pytest.mark.anyio
+
+
+class InMemoryPubSub:
+    """
+    Substituto local da fila do Socket.IO (RabbitMQ/Redis): cada nó assina e recebe
+    todas as mensagens publicadas, inclusive as próprias, como em um exchange fanout.
+    """
+
+    def __init__(self):
+        self._queues: list[asyncio.Queue] = []
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue()
+        self._queues.append(queue)
+        return queue
+
+    def publish(self, message: str) -> None:
+        for queue in self._queues:
+            queue.put_nowait(message)
+
+
+class InMemoryManager(AsyncPubSubManager):
+    name = "memory"
+
+    def __init__(self, pubsub: InMemoryPubSub):
+        super().__init__(channel="match_comments_socketio")
+        self.pubsub = pubsub
+        self.queue = pubsub.subscribe()
+
+    async def _publish(self, data):
+        self.pubsub.publish(json.dumps(data))
+
+    async def _listen(self):
+        while True:
+            yield await self.queue.get()
+
+
+class PollingClient:
+    """
+    Cliente Socket.IO mínimo sobre o transporte polling do engine.io, falando com o
+    ASGIApp do nó sem abrir sockets.
+    """
+
+    def __init__(self, server: socketio.AsyncServer, name: str):
+        self.http = httpx.AsyncClient(transport=httpx.ASGITransport(socketio.ASGIApp(server)),
+                                      base_url=f"http://{name}")
+        self.params = {"EIO": 4, "transport": "polling"}
+        self._ack_id = 0
+
+    async def connect(self) -> None:
+        response = await self.http.get("/socket.io/", params=self.params)
+        self.params["sid"] = json.loads(response.text[1:])["sid"]
+        await self.http.post("/socket.io/", params=self.params, content="40")
+        assert (await self._poll())[0].startswith("40")
+
+    async def call(self, event: str, *args):
+        self._ack_id += 1
+        await self.http.post("/socket.io/", params=self.params,
+                             content=f"42{self._ack_id}{json.dumps([event, *args])}")
+        [packet] = await self._poll()
+        assert packet.startswith(f"43{self._ack_id}")
+        return json.loads(packet[len(f"43{self._ack_id}"):])
+
+    async def receive(self) -> list[tuple[str, object]]:
+        return [tuple(json.loads(packet[2:])) for packet in await self._poll()]
+
+    async def _poll(self) -> list[str]:
+        response = await asyncio.wait_for(self.http.get("/socket.io/", params=self.params), timeout=5)
+        return response.text.split("\x1e")
+
+    async def close(self) -> None:
+        await self.http.aclose()
+
+
+@pytest.fixture
+async def nodes():
+    pubsub = InMemoryPubSub()
+    servers = [socketio.AsyncServer(async_mode="asgi", client_manager=InMemoryManager(pubsub))
+               for _ in range(2)]
+
+    for server in servers:
+        async def join(sid, room, server=server):
+            await server.enter_room(sid, room)
+            return "ok"
+
+        server.on("join", join)
+
+    clients = []
+    for name, server in zip("ab", servers):
+        client = PollingClient(server, name)
+        await client.connect()
+        assert await client.call("join", "m1") == ["ok"]
+        clients.append(client)
+
+    yield servers, clients
+
+    for client in clients:
+        await client.close()
+    for server in servers:
+        await server.shutdown()
+
+
+async def test_room_emit_reaches_clients_on_every_node_once(nodes):
+    (server_a, _), (client_a, client_b) = nodes
+    emitter = ScoreEmitCoalescer(server_a, window_ms=0)
+
+    await emitter.submit("m1", {"score_home": 1, "version": 2})
+
+    expected = [("score_updated", {"score_home": 1, "version": 2, "seq": 2})]
+    assert await client_a.receive() == expected
+    assert await client_b.receive() == expected
+
+    # O nó de origem não recebe de volta, pela fila, o emit que já entregou localmente
+    await server_a.emit("marker", {}, room="m1")
+    assert await client_a.receive() == [("marker", {})]
+    assert await client_b.receive() == [("marker", {})]
+
+
+async def test_presence_stays_on_the_node_that_counts_it(nodes):
+    (_, server_b), (client_a, client_b) = nodes
+    presence = RoomPresence(server_b)
+    presence.join("sid-b", "m1", "user:1")
+
+    await presence.broadcast()
+    # Passa pela fila depois do `presence`: se ele tivesse sido publicado, chegaria antes
+    await server_b.emit("marker", {}, room="m1")
+
+    assert await client_b.receive() == [("presence", {"match_id": "m1", "viewers": 1}), ("marker", {})]
+    assert await client_a.receive() == [("marker", {})]